@@ -0,0 +1,188 @@
+import os
+import pathlib
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from .file_tools import (
+    MAX_WRITE_BYTES,
+    _commit_temp,
+    _discard_temp,
+    _locked_paths,
+    _make_parents,
+    _remove_created_dirs,
+    _stage_temp,
+    _validate_durability,
+    _validate_write_permissions,
+)
+from .line_cache import line_cache
+
+MAX_BULK_FILES = 1000
+_STAGE_WORKERS = 16
+
+
+@dataclass
+class _FileWrite:
+    target: pathlib.Path
+    content: str
+    mode: Optional[int]
+    tmp_path: str = ""
+    backup: str = ""
+
+
+def _parse_mode(mode: Optional[str]) -> Optional[int]:
+    if mode is None or mode == "":
+        return None
+    value = int(str(mode), 8)
+    if not 0 <= value <= 0o7777:
+        raise ValueError(mode)
+    return value
+
+
+def _validate_spec(spec: dict, overwrite: bool, seen: set) -> Tuple[Optional[_FileWrite], Optional[str]]:
+    path, content = spec.get("path"), spec.get("content", "")
+    if not path or not isinstance(content, str):
+        return None, "Error: Each file needs a path and string content."
+    abs_fp = pathlib.Path(path).expanduser().resolve()
+    if abs_fp in seen:
+        return None, f"Error: Duplicate path: {abs_fp}"
+    seen.add(abs_fp)
+    try:
+        mode = _parse_mode(spec.get("mode"))
+    except ValueError:
+        return None, f"Error: Invalid mode {spec.get('mode')!r}; expected octal like '644'."
+    perm_err = _validate_write_permissions(abs_fp, content, overwrite)
+    if perm_err:
+        return None, perm_err
+    return _FileWrite(abs_fp, content, mode), None
+
+
+def _validate_all(files: Sequence[dict], overwrite: bool) -> Tuple[List[_FileWrite], Optional[str]]:
+    """Validates every file before anything is written; errors name the offending entry."""
+    if not files:
+        return [], "Error: No files given."
+    if len(files) > MAX_BULK_FILES:
+        return [], f"Error: Too many files (>{MAX_BULK_FILES})."
+    writes: List[_FileWrite] = []
+    seen: set = set()
+    for idx, spec in enumerate(files):
+        write, err = _validate_spec(spec, overwrite, seen)
+        if err or write is None:
+            return [], f"Error: File {idx}: {(err or '').removeprefix('Error: ')}"
+        writes.append(write)
+    if sum(len(w.content.encode("utf-8")) for w in writes) > MAX_WRITE_BYTES:
+        return [], "Error: Total content too large (>10MB)."
+    return writes, None
+
+
+def _stage(write: _FileWrite, durability: str, created: List[pathlib.Path]) -> Optional[BaseException]:
+    try:
+        _make_parents(write.target.parent, created)
+        write.tmp_path = _stage_temp(write.target, [write.content], durability)
+        if write.mode is not None:
+            os.chmod(write.tmp_path, write.mode)
+        return None
+    except Exception as e:
+        return e
+
+
+def _backup_link(target: pathlib.Path) -> str:
+    backup = str(target.with_name(f".{target.name}.{uuid.uuid4().hex}.bak"))
+    os.link(target, backup)
+    return backup
+
+
+def _rollback(writes: List[_FileWrite], done: List[_FileWrite], created: Sequence[pathlib.Path]):
+    for write in writes:
+        if write.tmp_path:
+            _discard_temp(write.tmp_path)
+    for write in reversed(done):
+        if write.backup:
+            os.replace(write.backup, write.target)
+            line_cache.invalidate(write.target)
+            write.backup = ""
+        else:
+            os.unlink(write.target)
+    for write in writes:
+        if write.backup:
+            _discard_temp(write.backup)
+    _remove_created_dirs(created)
+
+
+def _commit_all(writes: List[_FileWrite], overwrite: bool, durability: str, created: Sequence[pathlib.Path]):
+    """
+    Renames every staged file into place. Existing targets are first hard-linked to a backup
+    name, so on any failure the already committed files are restored (or removed if new).
+    """
+    done: List[_FileWrite] = []
+    try:
+        for write in writes:
+            if overwrite and os.path.lexists(write.target):
+                write.backup = _backup_link(write.target)
+            _commit_temp(write.tmp_path, write.target, durability, exclusive=not overwrite)
+            write.tmp_path = ""
+            done.append(write)
+    except BaseException:
+        _rollback(writes, done, created)
+        raise
+    for write in done:
+        if write.backup:
+            _discard_temp(write.backup)
+
+
+def _commit_each(writes: List[_FileWrite], overwrite: bool, durability: str) -> List[str]:
+    failures = []
+    for write in writes:
+        try:
+            _commit_temp(write.tmp_path, write.target, durability, exclusive=not overwrite)
+        except Exception as e:
+            failures.append(f"- {write.target}: {type(e).__name__}: {e}")
+        write.tmp_path = ""
+    return failures
+
+
+def write_files(
+    files: Sequence[dict],
+    overwrite: bool = True,
+    all_or_nothing: bool = True,
+    durability: str = "none",
+) -> str:
+    """
+    Write many files in one call. `files` is a list of {path, content, mode} where `mode` is an
+    optional octal permission string (e.g. "755").
+
+    - Every entry is validated (same guards as write_file) before anything is written, and the
+      total content may not exceed 10MB. Parent directories are created (and removed again
+      if an all-or-nothing write is rolled back).
+    - Files are staged as temp files in parallel, then renamed into place. With `all_or_nothing`
+      (default) any failure restores every file already committed; otherwise each file is
+      committed independently and failures are listed.
+    """
+    try:
+        writes, err = _validate_all(files, overwrite)
+        err = err or _validate_durability(durability)
+        if err:
+            return err
+        created: List[pathlib.Path] = []
+        with ThreadPoolExecutor(max_workers=min(_STAGE_WORKERS, len(writes))) as pool:
+            stage_errors = list(pool.map(lambda w: _stage(w, durability, created), writes))
+        failed = [(w, e) for w, e in zip(writes, stage_errors) if e is not None]
+        if failed and all_or_nothing:
+            _rollback(writes, [], created)
+            write, e = failed[0]
+            return f"Error: No files written; staging {write.target} failed: {type(e).__name__}: {e}"
+        staged = [w for w in writes if w.tmp_path]
+        failures = [f"- {w.target}: {type(e).__name__}: {e}" for w, e in failed]
+        with _locked_paths([w.target for w in staged]):
+            if all_or_nothing:
+                _commit_all(staged, overwrite, durability, created)
+            else:
+                failures += _commit_each(staged, overwrite, durability)
+        if failures:
+            return f"Error: Wrote {len(writes) - len(failures)} of {len(writes)} files. Failed:\n" + "\n".join(failures)
+        total = sum(len(w.content.encode("utf-8")) for w in writes)
+        return f"Success: Wrote {len(writes)} files ({total} bytes)."
+    except Exception as e:
+        prefix = "No files written; " if all_or_nothing else ""
+        return f"Error: {prefix}Unexpected error in write_files: {type(e).__name__}: {e}"
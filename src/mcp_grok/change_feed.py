@@ -0,0 +1,272 @@
+import collections
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .ignore_rules import ALWAYS_IGNORED_DIRS, is_excluded
+from .tree_cache import TreeCache, iter_tree, parent_ignore_rules
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+# Events for the same path arriving within this window are merged; a busy tree is still
+# flushed at least every _MAX_COALESCE_DELAY seconds.
+_COALESCE_SECONDS = 0.05
+_MAX_COALESCE_DELAY = 1.0
+_MAX_EVENTS = 10000
+MAX_POLL_TIMEOUT = 30.0
+
+# (previous kind, new kind) -> merged kind; None drops the path (created then deleted).
+_MERGE = {
+    ("created", "modified"): "created",
+    ("created", "deleted"): None,
+    ("deleted", "created"): "modified",
+    ("modified", "created"): "modified",
+}
+
+
+class ChangeEvent(NamedTuple):
+    seq: int
+    kind: str
+    path: str
+
+
+class _Inotify:
+    """Minimal inotify binding through ctypes (Linux only)."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def rm_watch(self, wd: int):
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(buf):
+            wd, mask, _, name_len = _EVENT_HEADER.unpack_from(buf, pos)
+            pos += _EVENT_HEADER.size
+            name = os.fsdecode(buf[pos:pos + name_len].rstrip(b"\0"))
+            pos += name_len
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _event_kind(mask: int) -> str:
+    if mask & (IN_CREATE | IN_MOVED_TO):
+        return "created"
+    if mask & (IN_DELETE | IN_MOVED_FROM):
+        return "deleted"
+    return "modified"
+
+
+class ChangeFeed:
+    """Watches directory trees with inotify and keeps a bounded, coalesced, sequence-numbered log of changes."""
+
+    def __init__(self, tree_cache: TreeCache, max_events: int = _MAX_EVENTS):
+        self.tree_cache = tree_cache
+        self.error: Optional[str] = None
+        self._inotify: Optional[_Inotify] = None
+        self._wd_paths: Dict[int, str] = {}
+        self._watched: Dict[str, int] = {}
+        self._roots: Set[str] = set()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._events: "collections.deque[ChangeEvent]" = collections.deque(maxlen=max_events)
+        self._seq = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def available(self) -> bool:
+        return self._inotify is not None
+
+    def start(self) -> bool:
+        """Starts the watcher thread; returns False (and sets `error`) if inotify is unavailable."""
+        if self._inotify is not None:
+            return True
+        try:
+            self._inotify = _Inotify()
+        except (OSError, AttributeError) as e:
+            self.error = f"{type(e).__name__}: {e}"
+            logging.getLogger(__name__).warning("File change feed disabled: %s", self.error)
+            return False
+        self._thread = threading.Thread(target=self._run, name="mcp-grok-change-feed", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def watch(self, root: str):
+        """Watches `root` and its non-ignored subdirectories."""
+        root = os.path.realpath(root)
+        if self._inotify is None or root in self._roots:
+            return
+        self._roots.add(root)
+        self._watch_tree(root)
+
+    def _watch_dir(self, dir_path: str):
+        with self._lock:
+            if dir_path in self._watched or self._inotify is None:
+                return
+            try:
+                wd = self._inotify.add_watch(dir_path, _WATCH_MASK)
+            except OSError as e:
+                logging.getLogger(__name__).debug("Cannot watch %s: %s", dir_path, e)
+                return
+            self._watched[dir_path] = wd
+            self._wd_paths[wd] = dir_path
+
+    def _watch_tree(self, root: str):
+        if os.path.basename(root) in ALWAYS_IGNORED_DIRS:
+            return
+        self._watch_dir(root)
+        for rel_path, entry in iter_tree(self.tree_cache, root):
+            if entry.is_dir:
+                self._watch_dir(os.path.join(root, rel_path))
+
+    def _watch_new_dir(self, path: str):
+        """Extends a recursive watch to a new directory, unless its root's .gitignore chain ignores it."""
+        root = max((r for r in list(self._roots) if path.startswith(os.path.join(r, ""))), key=len, default=None)
+        if root is None:
+            return
+        rel_path = os.path.relpath(path, root).replace(os.sep, "/")
+        try:
+            rules = parent_ignore_rules(self.tree_cache, root, rel_path)
+        except OSError:
+            return
+        if is_excluded(rel_path, True, rules):
+            return
+        self._watch_dir(path)
+        for sub_path, entry in iter_tree(self.tree_cache, root, start=rel_path):
+            if entry.is_dir:
+                self._watch_dir(os.path.join(root, sub_path))
+
+    def _handle(self, wd: int, mask: int, name: str, pending: Dict[str, str]):
+        if mask & IN_IGNORED:
+            with self._lock:
+                self._watched.pop(self._wd_paths.pop(wd, ""), None)
+            return
+        dir_path = self._wd_paths.get(wd)
+        if dir_path is None:
+            return
+        path = os.path.join(dir_path, name) if name else dir_path
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+            self._watch_new_dir(path)
+        kind = _event_kind(mask)
+        previous = pending.get(path)
+        merged = kind if previous is None else _MERGE.get((previous, kind), kind)
+        if merged is None:
+            pending.pop(path, None)
+        else:
+            pending[path] = merged
+
+    def _run(self):
+        assert self._inotify is not None
+        poller = select.poll()
+        poller.register(self._inotify.fd, select.POLLIN)
+        pending: Dict[str, str] = {}
+        first_pending = 0.0
+        while not self._stop.is_set():
+            ready = poller.poll(int(_COALESCE_SECONDS * 1000) if pending else 1000)
+            if ready and self._inotify is not None:
+                if not pending:
+                    first_pending = time.monotonic()
+                for wd, mask, name in self._inotify.read_events():
+                    if mask & IN_Q_OVERFLOW:
+                        pending[""] = "overflow"
+                    else:
+                        self._handle(wd, mask, name, pending)
+                if time.monotonic() - first_pending < _MAX_COALESCE_DELAY:
+                    continue
+            if pending:
+                self._publish(pending)
+                pending = {}
+
+    def _publish(self, pending: Dict[str, str]):
+        with self._cond:
+            batch = []
+            for path in sorted(pending):
+                self._seq += 1
+                batch.append(ChangeEvent(self._seq, pending[path], path))
+            self._events.extend(batch)
+            self._cond.notify_all()
+
+    def events_since(
+        self, since: int, root: Optional[str] = None, timeout: float = 0.0
+    ) -> Tuple[int, List[ChangeEvent], bool]:
+        """
+        Returns (cursor, events after `since` under `root`, whether older events were dropped).
+        With a timeout, waits up to that many seconds for something newer than `since`.
+        """
+        prefix = os.path.join(os.path.realpath(root), "") if root else ""
+        with self._cond:
+            if timeout > 0:
+                self._cond.wait_for(lambda: self._seq > since, min(timeout, MAX_POLL_TIMEOUT))
+            oldest = self._events[0].seq if self._events else self._seq + 1
+            dropped = since + 1 < oldest and since < self._seq
+            events = [
+                e for e in self._events
+                if e.seq > since and (e.kind == "overflow" or e.path.startswith(prefix))
+            ]
+            return self._seq, events, dropped
+
+
+def format_changes(cursor: int, events: List[ChangeEvent], dropped: bool, root: str) -> str:
+    """Formats poll results as `Cursor: N` followed by `kind path` lines relative to `root`."""
+    out = [f"Cursor: {cursor}"]
+    if dropped or any(e.kind == "overflow" for e in events):
+        out.append("Warning: some changes were dropped; rescan the project.")
+    root = os.path.realpath(root)
+    for event in events:
+        if event.kind != "overflow":
+            out.append(f"{event.kind} {os.path.relpath(event.path, root)}")
+    return "\n".join(out)
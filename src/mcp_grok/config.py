@@ -6,6 +6,9 @@ from typing import List, Optional
 
 import datetime
 
+# Per-project search indexes live in this hidden directory under projects_dir.
+INDEX_DIR_NAME = '.mcp-grok-index'
+
 
 @dataclass
 class Config:
@@ -36,6 +39,10 @@ class Config:
     def proxy_log(self):
         return os.path.expanduser(f'~/.mcp-grok/{self.log_timestamp}_{self.port}_proxy.log')
 
+    @property
+    def index_dir(self):
+        return os.path.join(self.projects_dir, INDEX_DIR_NAME)
+
 
 # The canonical singleton Config instance for codebase-wide import
 config = Config()
@@ -0,0 +1,241 @@
+import collections
+import difflib
+import os
+import pathlib
+import stat
+from typing import Deque, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .file_tools import _normalize_etag, _read_source
+from .line_cache import line_cache
+
+DEFAULT_DIFF_BYTES = 64 * 1024
+MAX_DIFF_BYTES = 1024 * 1024
+MAX_DIFF_CONTEXT = 50
+# Lines buffered from each side to resynchronize after a difference.
+_DIFF_WINDOW = 2000
+
+
+class _Equal(NamedTuple):
+    a_start: int
+    b_start: int
+    count: int
+    head: List[str]
+    tail: Deque[str]
+
+
+class _Change(NamedTuple):
+    a_start: int
+    b_start: int
+    removed: List[str]
+    added: List[str]
+
+
+class _LineStream:
+    """Line iterator with push-back and a running line number."""
+
+    def __init__(self, lines: Iterable[str]):
+        self._iter = iter(lines)
+        self._pending: Deque[str] = collections.deque()
+        self.lineno = 0
+
+    def peek(self) -> Optional[str]:
+        if not self._pending:
+            line = next(self._iter, None)
+            if line is None:
+                return None
+            self._pending.append(line)
+        return self._pending[0]
+
+    def take(self, count: int) -> List[str]:
+        lines = []
+        while len(lines) < count and self.peek() is not None:
+            lines.append(self._pending.popleft())
+        self.lineno += len(lines)
+        return lines
+
+    def push_back(self, lines: List[str]):
+        self._pending.extendleft(reversed(lines))
+        self.lineno -= len(lines)
+
+
+def _skip_equal(a: _LineStream, b: _LineStream, context: int) -> Optional[_Equal]:
+    """Consumes the run of identical lines, keeping only what hunks may need as context."""
+    run = _Equal(a.lineno, b.lineno, 0, [], collections.deque(maxlen=context))
+    count = 0
+    while a.peek() is not None and a.peek() == b.peek():
+        line = a.take(1)[0]
+        b.take(1)
+        if count < 2 * context:
+            run.head.append(line)
+        run.tail.append(line)
+        count += 1
+    return run._replace(count=count) if count else None
+
+
+def _diff_window(a: _LineStream, b: _LineStream) -> Iterator[_Change]:
+    """
+    Diffs the next window of both streams, which start with differing lines, and yields the
+    changes up to the first matching block; everything from there on is pushed back. A window
+    without any matching line is reported as one change.
+    """
+    a_start, b_start = a.lineno, b.lineno
+    a_lines, b_lines = a.take(_DIFF_WINDOW), b.take(_DIFF_WINDOW)
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a_lines, b_lines, autojunk=False).get_opcodes():
+        if tag == "equal":
+            a.push_back(a_lines[i1:])
+            b.push_back(b_lines[j1:])
+            return
+        yield _Change(a_start + i1, b_start + j1, a_lines[i1:i2], b_lines[j1:j2])
+
+
+def _diff_chunks(a_lines: Iterable[str], b_lines: Iterable[str], context: int) -> Iterator[Union[_Equal, _Change]]:
+    """Streams alternating runs of equal and changed lines, holding at most one window per side."""
+    a, b = _LineStream(a_lines), _LineStream(b_lines)
+    while a.peek() is not None or b.peek() is not None:
+        equal = _skip_equal(a, b, context)
+        if equal is not None:
+            yield equal
+        yield from _diff_window(a, b)
+
+
+def _hunk_range(start: int, count: int) -> str:
+    first = start + 1 if count else start
+    return f"{first}" if count == 1 else f"{first},{count}"
+
+
+class _HunkWriter:
+    """Groups changes into unified diff hunks with `context` lines around them."""
+
+    def __init__(self, context: int):
+        self.context = context
+        self.lines: List[str] = []
+        # Encoded size of `lines`, so callers can stop before a hunk outgrows the output budget.
+        self.nbytes = 0
+        self.a_start = self.b_start = self.a_count = self.b_count = 0
+        self.leading: List[str] = []
+
+    def equal(self, run: _Equal) -> List[str]:
+        out: List[str] = []
+        if self.lines:
+            if run.count <= 2 * self.context:
+                self._context_lines(run.head)
+                return out
+            self._context_lines(run.head[:self.context])
+            out = self.flush()
+        self.leading = list(run.tail)
+        return out
+
+    def change(self, change: _Change):
+        if not self.lines:
+            self.a_start = change.a_start - len(self.leading)
+            self.b_start = change.b_start - len(self.leading)
+            self.a_count = self.b_count = 0
+            self.lines, self.nbytes = [""], 0
+            self._context_lines(self.leading)
+        self._add([f"-{line}" for line in change.removed] + [f"+{line}" for line in change.added])
+        self.a_count += len(change.removed)
+        self.b_count += len(change.added)
+
+    def _add(self, lines: List[str]):
+        self.lines += lines
+        self.nbytes += sum(len(line.encode("utf-8")) + 1 for line in lines)
+
+    def _context_lines(self, lines: List[str]):
+        self._add([f" {line}" for line in lines])
+        self.a_count += len(lines)
+        self.b_count += len(lines)
+
+    def flush(self) -> List[str]:
+        if not self.lines:
+            return []
+        self.lines[0] = f"@@ -{_hunk_range(self.a_start, self.a_count)} +{_hunk_range(self.b_start, self.b_count)} @@"
+        hunk, self.lines, self.leading, self.nbytes = self.lines, [], [], 0
+        return hunk
+
+
+def _cut(lines: List[str], max_bytes: int) -> str:
+    """Joins the leading lines that fit in `max_bytes`."""
+    size = 0
+    for count, line in enumerate(lines):
+        size += len(line.encode("utf-8")) + 1
+        if size > max_bytes:
+            return "\n".join(lines[:count])
+    return "\n".join(lines)
+
+
+def unified_diff(
+    a_lines: Iterable[str], b_lines: Iterable[str], a_label: str, b_label: str, context: int = 3,
+    max_bytes: int = DEFAULT_DIFF_BYTES,
+) -> Tuple[str, bool]:
+    """
+    Unified diff of two line streams, computed incrementally: identical runs are skipped
+    line by line and differences are resolved within a bounded window. Stops reading once the
+    output, including the hunk still being built, exceeds `max_bytes`. Returns (diff,
+    truncated); the diff is empty if both match.
+    """
+    writer = _HunkWriter(context)
+    out = [f"--- {a_label}", f"+++ {b_label}"]
+    size = sum(len(line) + 1 for line in out)
+    for chunk in _diff_chunks(a_lines, b_lines, context):
+        hunk = writer.equal(chunk) if isinstance(chunk, _Equal) else writer.change(chunk)
+        for line in hunk or []:
+            out.append(line)
+            size += len(line.encode("utf-8")) + 1
+        if size + writer.nbytes > max_bytes:
+            return _cut(out + writer.flush(), max_bytes), True
+    out += writer.flush()
+    return ("\n".join(out) if len(out) > 2 else ""), False
+
+
+def _file_lines(path: str):
+    """Returns (lines, etag, error) for a text (or compressed text) file."""
+    abs_fp = pathlib.Path(path).expanduser().resolve()
+    try:
+        st = os.stat(abs_fp)
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
+        return None, None, f"Error: File does not exist or is not a file: {abs_fp}"
+    return _read_source(abs_fp, st, want_etag=True, stream_large=True)
+
+
+def _base_lines(path: str, other_path: Optional[str], base_hash: Optional[str]):
+    """Returns (lines, label, error) for the old side of the diff."""
+    if (other_path is None) == (base_hash is None):
+        return None, None, "Error: Pass exactly one of other_path or base_hash."
+    if base_hash is not None:
+        cached = line_cache.version(_normalize_etag(base_hash))
+        if cached is None:
+            return None, None, f"Error: Content {base_hash} is no longer cached; diff against a path instead."
+        return cached.lines, f"{path}@{cached.etag}", None
+    lines, _, err = _file_lines(other_path)  # type: ignore[arg-type]
+    return lines, other_path, err
+
+
+def diff(
+    path: str,
+    other_path: Optional[str] = None,
+    base_hash: Optional[str] = None,
+    context: int = 3,
+    max_bytes: int = DEFAULT_DIFF_BYTES,
+) -> str:
+    """
+    Unified diff from `other_path` (or from the cached content with ETag `base_hash`, as
+    returned by read_file) to `path`. The first line is the current ETag of `path`.
+    """
+    try:
+        base, base_label, err = _base_lines(path, other_path, base_hash)
+        if err:
+            return err
+        lines, etag, err = _file_lines(path)
+        if err:
+            return err
+        context = min(MAX_DIFF_CONTEXT, max(0, context))
+        max_bytes = min(MAX_DIFF_BYTES, max(1024, max_bytes))
+        text, truncated = unified_diff(base, lines, base_label, path, context, max_bytes)  # type: ignore[arg-type]
+        if not text:
+            return f"ETag: {etag}\nNo differences."
+        suffix = f"\n...[diff truncated at {max_bytes} bytes]..." if truncated else ""
+        return f"ETag: {etag}\n{text}{suffix}"
+    except Exception as e:
+        return f"Error: Unexpected error in diff: {type(e).__name__}: {e}"
@@ -0,0 +1,143 @@
+import mimetypes
+import os
+import stat
+from typing import BinaryIO, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from .project_resources import resolve_project_file
+
+DOWNLOAD_ROUTE = "/download/{project}/{path:path}"
+_ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+_READ_CHUNK = 1024 * 1024
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a single `bytes=` Range header into an inclusive (start, end) pair. Returns None when
+    the whole file should be sent (no header, multiple or malformed ranges); raises
+    RangeNotSatisfiable when the range lies outside the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not sep or (not first and not last):
+            return None
+        if not first:
+            suffix = int(last)
+            if suffix <= 0 or size == 0:
+                raise RangeNotSatisfiable(header)
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except RangeNotSatisfiable:
+        raise
+    except ValueError:
+        return None
+    if last and start > end:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+class FileRangeResponse(Response):
+    """
+    Sends `length` bytes of an open file from `start`. Uses the ASGI zero-copy send extension
+    (sendfile in the server) when available, otherwise streams with os.pread in a worker thread.
+    """
+
+    def __init__(self, f: BinaryIO, start: int, length: int, status_code: int, headers: dict, send_body: bool = True):
+        super().__init__(status_code=status_code, headers={**headers, "content-length": str(length)})
+        self.file = f
+        self.start = start
+        self.length = length
+        self.send_body = send_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if not self.send_body or self.length == 0:
+                await send({"type": "http.response.body", "body": b""})
+            elif _ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                await send({"type": _ZEROCOPY_EXTENSION, "file": self.file, "offset": self.start, "count": self.length})
+            else:
+                await self._stream(send)
+        finally:
+            self.file.close()
+
+    async def _stream(self, send: Send):
+        fd = self.file.fileno()
+        offset, remaining = self.start, self.length
+        while remaining > 0:
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, min(_READ_CHUNK, remaining), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b""})
+
+
+def _open_regular_file(abs_path: str) -> Tuple[Optional[BinaryIO], int]:
+    """
+    Opens `abs_path` if it is a regular file; returns (file, size) or (None, HTTP status).
+    O_NONBLOCK keeps a FIFO (or a device) from blocking the event loop in open().
+    """
+    try:
+        fd = os.open(abs_path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+    except PermissionError:
+        return None, 403
+    except OSError:
+        return None, 404
+    st = os.fstat(fd)
+    if not stat.S_ISREG(st.st_mode):
+        os.close(fd)
+        return None, 404
+    return os.fdopen(fd, "rb", buffering=0), st.st_size
+
+
+def make_download_endpoint(project_manager):
+    """
+    Builds the handler for GET/HEAD `/download/<project>/<path>`: streams a project file as-is,
+    with single-range `Range` support. Paths are resolved like project resources and may not
+    leave the project directory.
+    """
+
+    async def download(request: Request) -> Response:
+        project = request.path_params["project"]
+        if not project_manager.valid_project_name(project):
+            return PlainTextResponse(f"Error: Invalid project name: {project}", status_code=404)
+        try:
+            abs_path = resolve_project_file(project_manager, project, request.path_params["path"])
+        except ValueError as e:
+            return PlainTextResponse(f"Error: {e}", status_code=404)
+        f, size = _open_regular_file(abs_path)
+        if f is None:
+            return PlainTextResponse(f"Error: Cannot open file: {request.path_params['path']}", status_code=size)
+        headers = {
+            "accept-ranges": "bytes",
+            "content-type": mimetypes.guess_type(abs_path)[0] or "application/octet-stream",
+        }
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except RangeNotSatisfiable:
+            f.close()
+            return Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+        send_body = request.method != "HEAD"
+        if byte_range is None:
+            return FileRangeResponse(f, 0, size, 200, headers, send_body)
+        start, end = byte_range
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+        return FileRangeResponse(f, start, end - start + 1, 206, headers, send_body)
+
+    return download
@@ -0,0 +1,194 @@
+import collections
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Deque, List, NamedTuple, Optional, Sequence, Tuple
+
+# Per-file bounds: older revisions are dropped first.
+MAX_REVISIONS_PER_FILE = 100
+MAX_JOURNAL_BYTES = 4 * 1024 * 1024
+MAX_JOURNALS = 256
+# Bound across all files: the least recently edited files lose their history first.
+MAX_TOTAL_JOURNAL_BYTES = 64 * 1024 * 1024
+_COMPARE_BLOCK = 64 * 1024
+
+Fingerprint = Tuple[int, int, int]
+
+
+class Splice(NamedTuple):
+    """`inserted` sits at `offset` in the current file; applying the splice puts `removed` back."""
+
+    offset: int
+    removed: bytes
+    inserted: bytes
+
+
+@dataclass
+class Revision:
+    """
+    A reverse delta: applying `splices` to the current file (empty if not `source_exists`) yields
+    the other version, which is deleted instead of written if not `target_exists`.
+    """
+
+    splices: Tuple[Splice, ...]
+    source_exists: bool = True
+    target_exists: bool = True
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(s.removed) + len(s.inserted) for s in self.splices)
+
+
+@dataclass
+class _Journal:
+    undo: Deque[Revision] = field(default_factory=collections.deque)
+    redo: List[Revision] = field(default_factory=list)
+    # Delta bytes held by both stacks.
+    nbytes: int = 0
+    # File state after the last recorded, undone or redone edit; revisions only apply to it.
+    state: Optional[Fingerprint] = None
+
+    def clear(self):
+        self.undo.clear()
+        self.redo.clear()
+        self.nbytes = 0
+
+    def clear_redo(self):
+        self.nbytes -= sum(r.nbytes for r in self.redo)
+        self.redo.clear()
+
+    def trim(self):
+        while self.undo and (len(self.undo) > MAX_REVISIONS_PER_FILE or self.nbytes > MAX_JOURNAL_BYTES):
+            self.nbytes -= self.undo.popleft().nbytes
+
+
+def fingerprint(path) -> Optional[Fingerprint]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _common_prefix(a: memoryview, b: memoryview) -> int:
+    """Length of the common prefix, compared a block at a time."""
+    limit = min(len(a), len(b))
+    pos = 0
+    while pos < limit:
+        step = min(_COMPARE_BLOCK, limit - pos)
+        if a[pos:pos + step] != b[pos:pos + step]:
+            while a[pos] == b[pos]:
+                pos += 1
+            return pos
+        pos += step
+    return limit
+
+
+def diff_splice(old: bytes, new: bytes) -> Tuple[Splice, ...]:
+    """Reverse delta of a whole-content rewrite: one splice spanning the changed middle."""
+    if old == new:
+        return ()
+    old_view, new_view = memoryview(old), memoryview(new)
+    prefix = _common_prefix(old_view, new_view)
+    suffix = _common_prefix(old_view[prefix:][::-1], new_view[prefix:][::-1])
+    return (Splice(prefix, old[prefix:len(old) - suffix], new[prefix:len(new) - suffix]),)
+
+
+class EditJournal:
+    """
+    Bounded per-file undo/redo journals of reverse deltas. Revisions only apply to the file state
+    the journal last saw; outside changes discard the file's history.
+    """
+
+    def __init__(self, max_journals: int = MAX_JOURNALS, max_total_bytes: int = MAX_TOTAL_JOURNAL_BYTES):
+        self.max_journals = max_journals
+        self.max_total_bytes = max_total_bytes
+        self._journals: "collections.OrderedDict[str, _Journal]" = collections.OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._nbytes
+
+    def _journal(self, path: str) -> _Journal:
+        journal = self._journals.get(path)
+        if journal is None:
+            journal = self._journals[path] = _Journal()
+        self._journals.move_to_end(path)
+        return journal
+
+    def _account(self, journal: _Journal, before: int):
+        """Adds the journal's growth since `before` bytes to the total, then evicts the least recently used journals."""
+        self._nbytes += journal.nbytes - before
+        while len(self._journals) > 1 and (
+            len(self._journals) > self.max_journals or self._nbytes > self.max_total_bytes
+        ):
+            self._nbytes -= self._journals.popitem(last=False)[1].nbytes
+
+    def record(self, path, splices: Sequence[Splice], before: Optional[Fingerprint], existed: bool):
+        """Records an edit from state `before` to the current state; clears redo (and undo, if `before` is unknown)."""
+        path = str(path)
+        after = fingerprint(path)
+        revision = Revision(tuple(splices), after is not None, existed)
+        with self._lock:
+            journal = self._journal(path)
+            nbytes = journal.nbytes
+            self._record(journal, revision, before, after, existed)
+            self._account(journal, nbytes)
+
+    @staticmethod
+    def _record(
+        journal: _Journal, revision: Revision, before: Optional[Fingerprint], after: Optional[Fingerprint], existed: bool
+    ):
+        if journal.state != before:
+            journal.clear()
+        journal.state = after
+        if not revision.splices and existed:
+            return
+        journal.clear_redo()
+        if revision.nbytes > MAX_JOURNAL_BYTES:
+            journal.clear()
+            return
+        journal.undo.append(revision)
+        journal.nbytes += revision.nbytes
+        journal.trim()
+
+    def peek(self, path, redo: bool = False) -> Tuple[Optional[Revision], Optional[Fingerprint]]:
+        """Returns the next revision to undo (or redo) and the file state it applies to."""
+        with self._lock:
+            journal = self._journals.get(str(path))
+            if journal is None:
+                return None, None
+            stack = journal.redo if redo else journal.undo
+            return (stack[-1] if stack else None), journal.state
+
+    def replace_top(self, path, applied: Revision, inverse: Revision, state: Optional[Fingerprint], redo: bool = False):
+        """Moves the just-applied revision to the other stack as its inverse; `state` is the new file state."""
+        with self._lock:
+            journal = self._journal(str(path))
+            source, target = (journal.redo, journal.undo) if redo else (journal.undo, journal.redo)
+            if not source or source[-1] is not applied:
+                return
+            nbytes = journal.nbytes
+            source.pop()
+            target.append(inverse)
+            journal.state = state
+            journal.nbytes += inverse.nbytes - applied.nbytes
+            journal.trim()
+            self._account(journal, nbytes)
+
+    def discard(self, path):
+        with self._lock:
+            journal = self._journals.pop(str(path), None)
+            if journal is not None:
+                self._nbytes -= journal.nbytes
+
+    def depth(self, path) -> Tuple[int, int]:
+        with self._lock:
+            journal = self._journals.get(str(path))
+            return (len(journal.undo), len(journal.redo)) if journal else (0, 0)
+
+
+edit_journal = EditJournal()
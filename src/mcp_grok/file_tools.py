@@ -1,5 +1,267 @@
+import collections
+import contextlib
+import functools
+import base64
+import bz2
+import gzip
+import hashlib
+import io
+import itertools
+import lzma
+import os
 import pathlib
-from typing import Optional
+import re
+import shutil
+import stat
+import tempfile
+import threading
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .edit_journal import MAX_JOURNAL_BYTES, Splice, diff_splice, edit_journal, fingerprint
+from .line_cache import CachedText, line_cache
+
+MAX_WRITE_BYTES = 10 * 1024 * 1024
+MAX_READ_FILE_BYTES = 10 * 1024 * 1024
+SYSTEM_PREFIXES = ["/bin", "/sbin", "/lib", "/etc", "/usr", "/var", "/dev", "/proc", "/sys", "/boot", "/root"]
+DURABILITY_LEVELS = ("none", "file", "dir")
+OCCURRENCE_POLICIES = ("unique", "first", "last", "all")
+Writer = Callable[..., None]
+LineOp = Tuple[int, int, str]
+_COPY_CHUNK = 1024 * 1024
+MAX_READ_CONTEXT_LINES = 50
+MAX_READ_BYTES = 4 * 1024 * 1024
+# Headers of compressed files read_file decompresses on the fly. bz2 is matched up to its
+# block (or end-of-stream) magic, since plain text may well start with "BZh".
+_COMPRESSION_OPENERS = (
+    (re.compile(rb"\x1f\x8b"), gzip.open),
+    (re.compile(rb"BZh[1-9](?:1AY&SY|\x17rE8P\x90)"), bz2.open),
+    (re.compile(rb"\xfd7zXZ\x00"), lzma.open),
+)
+_COMPRESSION_SNIFF_BYTES = 10
+_DECOMPRESS_ERRORS = (OSError, EOFError, lzma.LZMAError)
+
+
+# Striped per-path write locks: every write to a given path takes the same lock,
+# so concurrent writes are serialized without an unbounded lock table.
+_PATH_LOCK_STRIPES = 64
+_path_locks = [threading.Lock() for _ in range(_PATH_LOCK_STRIPES)]
+
+
+def _path_lock_index(abs_fp: pathlib.Path) -> int:
+    return hash(str(abs_fp)) % _PATH_LOCK_STRIPES
+
+
+def _path_lock(abs_fp: pathlib.Path) -> threading.Lock:
+    return _path_locks[_path_lock_index(abs_fp)]
+
+
+@contextlib.contextmanager
+def _locked_paths(paths: Iterable[pathlib.Path]):
+    """
+    Holds the per-path locks of several files, always taken in stripe order so that
+    multi-file writers cannot deadlock each other.
+    """
+    with contextlib.ExitStack() as stack:
+        for idx in sorted({_path_lock_index(p) for p in paths}):
+            stack.enter_context(_path_locks[idx])
+        yield
+
+
+def _validate_durability(durability: str) -> Optional[str]:
+    if durability not in DURABILITY_LEVELS:
+        return f"Error: Invalid durability {durability!r}; expected one of {', '.join(DURABILITY_LEVELS)}."
+    return None
+
+
+def _fsync_dir(dir_path: pathlib.Path):
+    fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_umask() -> int:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        probe = os.path.join(tmp_dir, "probe")
+        os.close(os.open(probe, os.O_CREAT | os.O_WRONLY, 0o777))
+        return 0o777 & ~stat.S_IMODE(os.stat(probe).st_mode)
+
+
+def _process_umask() -> int:
+    """
+    The umask new files get, read without os.umask(), whose set-and-restore would briefly
+    apply a umask of 0 to files other threads create.
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    return _probe_umask()
+
+
+def _copy_file_attributes(abs_fp: pathlib.Path, tmp_path: str):
+    """
+    Gives the temp file the permissions (and, if allowed, ownership) of the file it replaces.
+    """
+    try:
+        st = abs_fp.stat()
+    except FileNotFoundError:
+        os.chmod(tmp_path, 0o666 & ~_process_umask())
+        return
+    os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+    with contextlib.suppress(PermissionError):
+        os.chown(tmp_path, st.st_uid, st.st_gid)
+
+
+def _stage_temp_with(abs_fp: pathlib.Path, fill: Callable[[BinaryIO], None], durability: str = "none") -> str:
+    """
+    Creates a temp file next to `abs_fp` (same permissions), lets `fill` write its bytes
+    and returns its path.
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{abs_fp.name}.", suffix=".tmp", dir=abs_fp.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            fill(f)
+            f.flush()
+            if durability != "none":
+                os.fsync(f.fileno())
+        _copy_file_attributes(abs_fp, tmp_path)
+    except BaseException:
+        _discard_temp(tmp_path)
+        raise
+    return tmp_path
+
+
+def _stage_temp(abs_fp: pathlib.Path, chunks: Iterable[str], durability: str = "none") -> str:
+    return _stage_temp_with(abs_fp, lambda f: f.writelines(chunk.encode("utf-8") for chunk in chunks), durability)
+
+
+def _discard_temp(tmp_path: str):
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(tmp_path)
+
+
+def _make_parents(path: pathlib.Path, created: List[pathlib.Path]):
+    """mkdir -p that records the directories it created, so a rollback can remove them."""
+    missing = []
+    while not os.path.lexists(path):
+        missing.append(path)
+        path = path.parent
+    for dir_path in reversed(missing):
+        try:
+            dir_path.mkdir()
+        except FileExistsError:
+            continue  # created concurrently by another entry (or a file, which fails below)
+        created.append(dir_path)
+
+
+def _remove_created_dirs(created: Sequence[pathlib.Path]):
+    """Removes directories recorded by _make_parents, deepest first, if they are empty again."""
+    for dir_path in sorted(created, key=lambda p: len(p.parts), reverse=True):
+        with contextlib.suppress(OSError):
+            dir_path.rmdir()
+
+
+def _commit_temp(tmp_path: str, abs_fp: pathlib.Path, durability: str = "none", exclusive: bool = False):
+    """
+    Renames a staged temp file over `abs_fp`. With `exclusive=True` the rename is done
+    via link() and fails if the target exists. The temp file is removed on failure.
+    """
+    try:
+        if exclusive:
+            os.link(tmp_path, abs_fp)
+            os.unlink(tmp_path)
+        else:
+            os.replace(tmp_path, abs_fp)
+    except BaseException:
+        _discard_temp(tmp_path)
+        raise
+    line_cache.invalidate(abs_fp)
+    if durability == "dir":
+        _fsync_dir(abs_fp.parent)
+
+
+def _atomic_write(abs_fp: pathlib.Path, chunks: Iterable[str], durability: str = "none", exclusive: bool = False):
+    """
+    Writes `chunks` to a temp file in the target directory, then renames it over `abs_fp`,
+    so readers see either the old or the new content, never a partial file.
+    """
+    _commit_temp(_stage_temp(abs_fp, chunks, durability), abs_fp, durability, exclusive)
+
+
+def _write_output(
+    abs_fp: pathlib.Path,
+    chunks: Iterable[str],
+    atomic: bool = False,
+    durability: str = "none",
+    exclusive: bool = False,
+):
+    """
+    Writes `chunks` to `abs_fp`, either atomically (temp file + rename) or in place.
+    `durability`: "none" (no fsync), "file" (fsync the file) or "dir" (also fsync the directory).
+    """
+    if atomic:
+        _atomic_write(abs_fp, chunks, durability, exclusive)
+        return
+    with open(abs_fp, "x" if exclusive else "w", encoding="utf-8") as f:
+        f.writelines(chunks)
+        if durability != "none":
+            f.flush()
+            os.fsync(f.fileno())
+    line_cache.invalidate(abs_fp)
+    if durability == "dir":
+        _fsync_dir(abs_fp.parent)
+
+
+def _write_journaled(abs_fp: pathlib.Path, chunks: Iterable[str], **kwargs):
+    """
+    _write_output for whole-content writes that also journals the reverse delta (the changed
+    middle between old and new content). Previous content over 10MB is not journaled.
+    """
+    text = "".join(chunks)
+    before = fingerprint(abs_fp)
+    old: Optional[bytes] = b""
+    if before is not None:
+        old = abs_fp.read_bytes() if before[1] <= MAX_WRITE_BYTES else None
+    _write_output(abs_fp, [text], **kwargs)
+    _record_edit(abs_fp, None if old is None else list(diff_splice(old, text.encode("utf-8"))), before, before is not None)
+
+
+def _file_etag(abs_fp: pathlib.Path) -> str:
+    """
+    Returns a strong validator (content hash) for the file, suitable for `if_none_match`.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(abs_fp, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _normalize_etag(etag: str) -> str:
+    return etag.strip().removeprefix("W/").strip('"')
+
+
+def _check_expected_hash(abs_fp: pathlib.Path, expected_hash: Optional[str]) -> Optional[str]:
+    """
+    Optimistic-concurrency precondition; returns error string or None if the write may proceed.
+    """
+    if expected_hash is None:
+        return None
+    if not abs_fp.is_file():
+        return f"Error: Precondition failed: file does not exist: {abs_fp}"
+    current = _file_etag(abs_fp)
+    if _normalize_etag(expected_hash) != current:
+        return (
+            f"Error: Precondition failed: file changed since read "
+            f"(expected_hash mismatch). Current hash: {current}"
+        )
+    return None
 
 
 def _is_binary_file(abs_fp: pathlib.Path) -> Optional[str]:
@@ -16,29 +278,188 @@ def _is_binary_file(abs_fp: pathlib.Path) -> Optional[str]:
     return None
 
 
-def _read_text_lines(abs_fp: pathlib.Path, start: int, max_lines: int):
+def _compression_opener(head: bytes) -> Optional[Callable[..., Any]]:
+    for magic, opener in _COMPRESSION_OPENERS:
+        if magic.match(head):
+            return opener
+    return None
+
+
+def _sniff_compression(abs_fp: pathlib.Path) -> Optional[Callable[..., Any]]:
+    with open(abs_fp, "rb") as f:
+        return _compression_opener(f.read(_COMPRESSION_SNIFF_BYTES))
+
+
+def _iter_compressed_lines(abs_fp: pathlib.Path, opener: Callable[..., Any]) -> Iterable[str]:
+    """Decompresses lazily: only as much input is inflated as the consumer pulls lines."""
+    with opener(abs_fp, "rt", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            yield line.rstrip("\n\r")
+
+
+def _open_compressed(abs_fp: pathlib.Path, opener: Callable[..., Any], want_etag: bool):
+    """(lines, etag, error) for a compressed file; None if it does not decompress, i.e. is plain text after all."""
+    try:
+        with opener(abs_fp, "rb") as f:
+            sample = f.read(512)
+    except _DECOMPRESS_ERRORS:
+        return None
+    if b"\0" in sample:
+        return None, None, "Error: File appears to be binary (after decompression)."
+    return _iter_compressed_lines(abs_fp, opener), _file_etag(abs_fp) if want_etag else None, None
+
+
+def _load_text(abs_fp: pathlib.Path, st: os.stat_result, sniff: bool = True) -> Union[CachedText, str, None]:
+    """
+    Returns the decoded lines (and ETag) of a text file, from the line cache when the file is
+    unchanged since it was cached; otherwise reads it once, checks it is not binary and caches it.
+    Returns None for gzip/bz2/xz files (unless `sniff` is False), which are streamed instead.
+    """
+    cached = line_cache.get(str(abs_fp), st)
+    if cached is not None:
+        return cached
+    try:
+        with open(abs_fp, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+    except Exception as e:
+        return f"Error: Could not read file: {type(e).__name__}: {e}"
+    if sniff and _compression_opener(data[:_COMPRESSION_SNIFF_BYTES]) is not None:
+        return None
+    if b"\0" in data[:512]:
+        return "Error: File appears to be binary."
+    return line_cache.put(str(abs_fp), st, data)
+
+
+def _iter_file_lines(abs_fp: pathlib.Path) -> Iterable[str]:
+    with open(abs_fp, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            yield line.rstrip("\n\r")
+
+
+class _MatchWindow:
     """
-    Reads lines from a file, starting at line start, up to max_lines. Returns (lines, truncated, error) tuple.
+    Collects matching lines plus `context` lines around them, grep-style: `N:text` for matches,
+    `N-text` for context, `--` between non-adjacent regions. Only `context` lines are buffered.
     """
-    content_lines = []
-    lines_read = 0
-    truncated = False
+
+    def __init__(self, matcher: re.Pattern, context: int, max_lines: int):
+        self.matcher = matcher
+        self.max_lines = max_lines
+        self.lines: List[str] = []
+        self.truncated = False
+        self._before: collections.deque = collections.deque(maxlen=context)
+        self._context = context
+        self._after = 0
+        self._last: Optional[int] = None
+
+    def _emit(self, idx: int, text: str, sep: str):
+        if self._last is not None and idx > self._last + 1:
+            self.lines.append("--")
+        self.lines.append(f"{idx}{sep}{text}")
+        self._last = idx
+
+    def feed(self, idx: int, text: str) -> bool:
+        """Processes one line; returns False once `max_lines` is reached and more output is pending."""
+        matched = self.matcher.search(text) is not None
+        if (matched or self._after) and len(self.lines) >= self.max_lines:
+            self.truncated = True
+            return False
+        if matched:
+            for before_idx, before_text in self._before:
+                self._emit(before_idx, before_text, "-")
+            self._before.clear()
+            self._emit(idx, text, ":")
+            self._after = self._context
+        elif self._after:
+            self._emit(idx, text, "-")
+            self._after -= 1
+        else:
+            self._before.append((idx, text))
+        return True
+
+
+def _grep_lines(lines: Iterable[str], start: int, max_lines: int, matcher: re.Pattern, context: int):
+    """
+    Scans `lines` once from line `start`, keeping only matching regions. Returns a
+    (lines, truncated, error) tuple.
+    """
+    window = _MatchWindow(matcher, context, max_lines)
     try:
-        with open(abs_fp, "r", encoding="utf-8", errors="replace") as f:
-            for idx, line in enumerate(f):
-                if idx < start:
-                    continue
-                if lines_read >= max_lines:
-                    truncated = True
-                    break
-                content_lines.append(line.rstrip("\n\r"))
-                lines_read += 1
-        return content_lines, truncated, None
+        for idx, line in enumerate(lines):
+            if idx >= start and not window.feed(idx, line):
+                break
     except Exception as e:
         return [], False, f"Error: Could not read file: {type(e).__name__}: {e}"
+    return window.lines or ["No matches found."], window.truncated, None
 
 
-def read_file(file_path: str, limit: int = 2000, offset: int = 0) -> str:
+def _select_lines(lines: Union[Sequence[str], Iterable[str]], start: int, max_lines: int, pattern: Optional[str],
+                  context: int):
+    """
+    Pages through `lines`, or greps them with `pattern`. `lines` is a cached sequence or a
+    streaming iterator; an iterator is only consumed up to the end of the requested window.
+    """
+    if pattern is None:
+        if isinstance(lines, Sequence):
+            return list(lines[start:start + max_lines]), len(lines) > start + max_lines, None
+        try:
+            window = list(itertools.islice(lines, start, start + max_lines + 1))
+        except _DECOMPRESS_ERRORS as e:
+            return [], False, f"Error: Could not decompress file: {type(e).__name__}: {e}"
+        return window[:max_lines], len(window) > max_lines, None
+    try:
+        matcher = re.compile(pattern)
+    except re.error as e:
+        return [], False, f"Error: Invalid regex: {e}"
+    return _grep_lines(lines, start, max_lines, matcher, min(MAX_READ_CONTEXT_LINES, max(0, context)))
+
+
+def _read_source(abs_fp: pathlib.Path, st: os.stat_result, want_etag: bool, stream_large: bool):
+    """
+    Returns (lines, etag, error). Files up to 10MB come decoded from the line cache; gzip, bz2
+    and xz files are decompressed as a stream; other larger files (only readable with a
+    pattern, i.e. `stream_large`) are streamed line by line.
+    """
+    small = st.st_size <= MAX_READ_FILE_BYTES
+    text = _load_text(abs_fp, st) if small else None
+    if text is None:
+        opener = _sniff_compression(abs_fp)
+        compressed = _open_compressed(abs_fp, opener, want_etag) if opener is not None else None
+        if compressed is not None:
+            return compressed
+        if opener is not None and small:
+            text = _load_text(abs_fp, st, sniff=False)
+    if isinstance(text, CachedText):
+        return text.lines, text.etag if want_etag else None, None
+    if isinstance(text, str):
+        return None, None, text
+    if not stream_large:
+        return None, None, "Error: File too large (>10MB)."
+    binary_check = _is_binary_file(abs_fp)
+    if binary_check:
+        return None, None, binary_check
+    return _iter_file_lines(abs_fp), _file_etag(abs_fp) if want_etag else None, None
+
+
+def _format_read_output(content_lines, truncated, etag):
+    out = "\n".join(content_lines)
+    if truncated:
+        out += "\n...[output truncated]..."
+    if etag is not None:
+        return f"ETag: {etag}\n{out.strip()}"
+    return out.strip()
+
+
+def read_file(
+    file_path: str,
+    limit: int = 2000,
+    offset: int = 0,
+    if_none_match: Optional[str] = None,
+    include_etag: bool = False,
+    pattern: Optional[str] = None,
+    context: int = 0,
+) -> str:
     """
     Read and return up to `limit` lines from `file_path`, starting at line `offset`,
     anywhere on the filesystem. Returns file content as text, or an error string if
@@ -46,87 +467,239 @@ def read_file(file_path: str, limit: int = 2000, offset: int = 0) -> str:
     - Files anywhere on the system can be accessed (subject to server process permissions).
     - `limit` (max lines): default 2000, hard capped at 5000. Offset must be >= 0.
     - Reading directories is blocked. Large/binary file detection is enforced.
+
+    Conditional reads:
+    - If `include_etag=True` or `if_none_match` is given, the output starts with an
+      `ETag: <hash>` line (content hash of the whole file) followed by the content.
+    - If `if_none_match` equals the current ETag, only `Not Modified: ETag <hash>` is
+      returned instead of the content.
+
+    Filtered reads:
+    - With a regex `pattern`, only matching lines from `offset` on are returned, each with
+      `context` lines (max 50) around it, as `N:text` (match) / `N-text` (context) with 0-based
+      line numbers and `--` between regions; `limit` caps the output lines. The file is scanned
+      in one streaming pass, so the 10MB size limit does not apply.
+
+    Compressed files:
+    - gzip, bz2 and xz files (detected by magic bytes) are decompressed on the fly; offsets,
+      limits and patterns apply to the decompressed lines, and decompression stops after the
+      requested window. The 10MB limit does not apply; the ETag hashes the compressed file.
+
+    Decoded files are kept in a bounded in-memory LRU cache, validated on each read by one
+    stat (inode, size, mtime); writes made through these tools drop the cached entry.
     """
     try:
         abs_fp = pathlib.Path(file_path).expanduser().resolve()
-        if not abs_fp.exists() or not abs_fp.is_file():
+        try:
+            st: Optional[os.stat_result] = os.stat(abs_fp)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
             return f"Error: File does not exist or is not a file: {abs_fp}"
-        if abs_fp.stat().st_size > 10 * 1024 * 1024:
-            return "Error: File too large (>10MB)."
-        # Try to determine if binary
-        binary_check = _is_binary_file(abs_fp)
-        if binary_check:
-            return binary_check
-        # Read text lines
+        lines, etag, read_err = _read_source(abs_fp, st, include_etag or if_none_match is not None, pattern is not None)
+        if read_err:
+            return read_err
+        if etag is not None and if_none_match is not None and _normalize_etag(if_none_match) == etag:
+            return f"Not Modified: ETag {etag}"
         max_lines = min(5000, max(1, limit))
         start = max(0, offset)
-        content_lines, truncated, read_err = _read_text_lines(abs_fp, start, max_lines)
+        content_lines, truncated, read_err = _select_lines(lines, start, max_lines, pattern, context)
         if read_err:
             return read_err
-        if content_lines is None:
-            content_lines = []
-        out = "\n".join(content_lines)
-        if truncated:
-            out += "\n...[output truncated]..."
-
-        return out.strip()
+        return _format_read_output(content_lines, truncated, etag)
     except Exception as e:
         return f"Error: Unexpected error in read_file: {type(e).__name__}: {e}"
 
 
-def _write_replace_lines(abs_fp, content, replace_lines_start, replace_lines_end):
+def read_bytes(file_path: str, offset: int = 0, length: int = 1024 * 1024) -> Union[Dict[str, Any], str]:
+    """
+    Read up to `length` raw bytes (max 4MB) of any file, binary or not, starting at byte `offset`.
+    Returns a dict with the base64 `data`, the `offset` and `length` actually read, the file's
+    total `size` and `eof`, or an error string. Only the requested range is read (os.pread),
+    so large files can be fetched chunk by chunk and transfers resumed at any offset.
+    """
+    try:
+        abs_fp = pathlib.Path(file_path).expanduser().resolve()
+        if not abs_fp.is_file():
+            return f"Error: File does not exist or is not a file: {abs_fp}"
+        if offset < 0 or length < 0:
+            return "Error: offset and length must be >= 0."
+        fd = os.open(abs_fp, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            data = os.pread(fd, min(length, MAX_READ_BYTES), offset) if offset < size else b""
+        finally:
+            os.close(fd)
+        return {
+            "path": str(abs_fp),
+            "offset": offset,
+            "length": len(data),
+            "size": size,
+            "eof": offset + len(data) >= size,
+            "data": base64.b64encode(data).decode("ascii"),
+        }
+    except Exception as e:
+        return f"Error: Unexpected error in read_bytes: {type(e).__name__}: {e}"
+
+
+def _copy_lines(src, dst, count: int) -> int:
+    """
+    Moves up to `count` lines from buffered binary `src` to `dst` (or skips them if `dst` is None)
+    a buffer at a time. Returns the number of lines that existed, counting a final line without
+    a trailing newline.
+    """
+    done = 0
+    pending = False
+    while done < count:
+        buf = src.peek(_COPY_CHUNK)
+        if not buf:
+            return done + pending
+        end = 0
+        while done < count:
+            idx = buf.find(b"\n", end)
+            if idx < 0:
+                pending = pending or end < len(buf)
+                end = len(buf)
+                break
+            end = idx + 1
+            done += 1
+            pending = False
+        data = src.read(end)
+        if dst is not None:
+            dst.write(data)
+    return done
+
+
+class _BoundedSink:
+    """Collects skipped bytes for the edit journal, giving up once `limit` is exceeded."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.buf = io.BytesIO()
+        self.overflow = False
+
+    def write(self, data: bytes):
+        if not self.overflow:
+            self.overflow = self.buf.tell() + len(data) > self.limit
+            self.buf.write(b"" if self.overflow else data)
+
+    def take(self) -> bytes:
+        data = self.buf.getvalue()
+        self.buf = io.BytesIO()
+        return data
+
+
+def _splice_lines(src, dst, ops: List[LineOp]) -> Optional[List[Splice]]:
+    """
+    Copies `src` to `dst`, applying sorted, non-overlapping (start, end, content) splices.
+    Positions beyond EOF are padded with empty lines. Returns the reverse delta, or None if
+    the replaced text is too large to journal.
+    """
+    pos = 0
+    removed = _BoundedSink(MAX_JOURNAL_BYTES)
+    splices = []
+    for start, end, content in ops:
+        have = _copy_lines(src, dst, start - pos)
+        offset = dst.tell()
+        inserted = b"\n" * max(0, start - pos - have) + content.encode("utf-8")
+        _copy_lines(src, removed, end - start)
+        dst.write(inserted)
+        splices.append(Splice(offset, removed.take(), inserted))
+        pos = end
+    shutil.copyfileobj(src, dst, _COPY_CHUNK)
+    return None if removed.overflow else splices
+
+
+def _record_edit(abs_fp: pathlib.Path, splices: Optional[List[Splice]], before, existed: bool):
+    if splices is None:
+        edit_journal.discard(abs_fp)
+    else:
+        edit_journal.record(abs_fp, splices, before, existed)
+
+
+def _stream_line_edits(abs_fp: pathlib.Path, ops: List[LineOp], durability: str = "none"):
+    """
+    Rewrites `abs_fp` with `ops` applied by streaming it into a temp file that replaces the original.
+    Peak memory is bounded by the copy buffer and the new content, not by the file size.
+    A missing file is treated as empty. The reverse delta goes to the edit journal.
+    """
+    before = fingerprint(abs_fp)
+    existed = abs_fp.is_file()
+    splices: List[Optional[List[Splice]]] = []
+    with contextlib.ExitStack() as stack:
+        if existed:
+            src = stack.enter_context(open(abs_fp, "rb", buffering=_COPY_CHUNK))
+        else:
+            src = io.BufferedReader(io.BytesIO(b""))
+        tmp_path = _stage_temp_with(abs_fp, lambda dst: splices.append(_splice_lines(src, dst, ops)), durability)
+    _commit_temp(tmp_path, abs_fp, durability)
+    _record_edit(abs_fp, splices[0], before, existed)
+
+
+def _write_replace_lines(abs_fp, content, replace_lines_start, replace_lines_end, durability: str = "none"):
     try:
-        with open(abs_fp, "r", encoding="utf-8") as f:
-            old_lines = f.readlines()
         start = int(replace_lines_start)
         end = int(replace_lines_end)
         if start < 0 or end < 0 or end < start:
             return "Error: Invalid line range requested."
-        content_is_empty = content == ""
-        lines_before = old_lines[:start] if start < len(old_lines) else old_lines
-        lines_after = old_lines[end:] if end < len(old_lines) else []
-        if start > len(old_lines):
-            lines_before = old_lines + ["\n"] * (start - len(old_lines))
-        if content_is_empty:
-            new_lines = lines_before + lines_after
-        else:
-            content_lines = content.splitlines(keepends=True)
-            new_lines = lines_before + content_lines + lines_after
-        with open(abs_fp, "w", encoding="utf-8") as f:
-            f.writelines(new_lines)
-        action = "Deleted" if content_is_empty else "replaced"
+        _stream_line_edits(abs_fp, [(start, end, content)], durability)
+        action = "Deleted" if content == "" else "replaced"
         return f"Success: Lines {start}:{end} {action} in {abs_fp}"
     except Exception as e:
         return f"Error: Failed to replace lines: {type(e).__name__}: {e}"
 
 
-def _write_insert_at_line(abs_fp, content, insert_at_line):
+def _write_insert_at_line(abs_fp, content, insert_at_line, durability: str = "none"):
     try:
-        if abs_fp.exists() and abs_fp.is_file():
-            with open(abs_fp, "r", encoding="utf-8") as f:
-                old_lines = f.readlines()
-        else:
-            old_lines = []
         insert_at = max(0, int(insert_at_line or 0))
-        content_lines = content.splitlines(keepends=True)
-        if insert_at > len(old_lines):
-            lines_before = old_lines + ["\n"] * (insert_at - len(old_lines))
-        else:
-            lines_before = old_lines[:insert_at]
-        lines_after = old_lines[insert_at:] if insert_at <= len(old_lines) else []
-        new_lines = lines_before + content_lines + lines_after
-        with open(abs_fp, "w", encoding="utf-8") as f:
-            f.writelines(new_lines)
+        _stream_line_edits(abs_fp, [(insert_at, insert_at, content)], durability)
         return f"Success: Inserted at line {insert_at} in {abs_fp}"
     except Exception as e:
         return f"Error: Failed to insert lines: {type(e).__name__}: {e}"
 
 
-def _do_write_file(abs_fp, content, overwrite):
-    mode = "w" if overwrite else "x"
+def _replace_occurrences(text, old_string, new_string, occurrence):
+    """
+    Returns (new_text, replaced_count, error) for an exact-string replacement.
+    """
+    count = text.count(old_string)
+    if count == 0:
+        return None, 0, "Error: old_string not found in file."
+    if occurrence == "unique" and count > 1:
+        return None, 0, (
+            f"Error: old_string occurs {count} times; add surrounding context to make it unique "
+            f"or set occurrence to first, last or all."
+        )
+    if occurrence == "all":
+        return text.replace(old_string, new_string), count, None
+    if occurrence == "last":
+        head, _, tail = text.rpartition(old_string)
+        return head + new_string + tail, 1, None
+    return text.replace(old_string, new_string, 1), 1, None
+
+
+def _write_str_replace(abs_fp, old_string, new_string, occurrence, writer: Writer = _write_output):
     try:
-        with open(abs_fp, mode, encoding="utf-8") as f:
-            f.write(content)
+        if not old_string:
+            return "Error: old_string must not be empty."
+        if occurrence not in OCCURRENCE_POLICIES:
+            return f"Error: Invalid occurrence {occurrence!r}; expected one of {', '.join(OCCURRENCE_POLICIES)}."
+        if not abs_fp.is_file():
+            return f"Error: File does not exist for string replacement: {abs_fp}"
+        with open(abs_fp, "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+        new_text, count, err = _replace_occurrences(text, old_string, new_string, occurrence)
+        if err:
+            return err
+        writer(abs_fp, [new_text])
+        return f"Success: Replaced {count} occurrence(s) in {abs_fp}"
+    except Exception as e:
+        return f"Error: Failed to replace string: {type(e).__name__}: {e}"
+
+
+def _do_write_file(abs_fp, content, overwrite, writer: Writer = _write_output):
+    try:
+        writer(abs_fp, [content], exclusive=not overwrite)
     except FileExistsError:
         return f"Error: File exists and overwrite=False: {abs_fp}"
     except Exception as e:
@@ -134,7 +707,14 @@ def _do_write_file(abs_fp, content, overwrite):
     return f"Success: File written to {abs_fp}"
 
 
-def _validate_write_permissions(abs_fp, content, overwrite):
+def _is_system_path(abs_fp) -> bool:
+    return any(str(abs_fp).startswith(prefix + "/") or str(abs_fp) == prefix for prefix in SYSTEM_PREFIXES)
+
+
+def _validate_write_target(abs_fp):
+    """
+    Guards shared by all writing tools: no symlinks, directories, device nodes or system directories.
+    """
     if abs_fp.exists():
         if abs_fp.is_symlink():
             return f"Error: Target is a symlink: {abs_fp}"
@@ -142,25 +722,54 @@ def _validate_write_permissions(abs_fp, content, overwrite):
             return f"Error: Refusing to write to a directory: {abs_fp}"
         if abs_fp.is_block_device() or abs_fp.is_char_device():
             return f"Error: Refusing to write to device file: {abs_fp}"
-        if not overwrite:
-            return f"Error: File already exists and overwrite=False: {abs_fp}"
-    if len(content.encode("utf-8")) > 10 * 1024 * 1024:
-        return "Error: Content too large (>10MB)."
-    system_prefixes = ["/bin", "/sbin", "/lib", "/etc", "/usr", "/var", "/dev", "/proc", "/sys", "/boot", "/root"]
-    if any(str(abs_fp).startswith(prefix + "/") or str(abs_fp) == prefix for prefix in system_prefixes):
+    if _is_system_path(abs_fp):
         return f"Error: Refusing to write to system directory: {abs_fp}"
     return None
 
 
-def _do_full_replace(abs_fp, content):
+def _validate_write_permissions(abs_fp, content, overwrite):
+    target_err = _validate_write_target(abs_fp)
+    if target_err:
+        return target_err
+    if abs_fp.exists() and not overwrite:
+        return f"Error: File already exists and overwrite=False: {abs_fp}"
+    if len(content.encode("utf-8")) > MAX_WRITE_BYTES:
+        return "Error: Content too large (>10MB)."
+    return None
+
+
+def _do_full_replace(abs_fp, content, writer: Writer = _write_output):
     try:
-        with open(abs_fp, "w", encoding="utf-8") as f:
-            f.write(content)
+        writer(abs_fp, [content])
         return f"Success: File fully replaced in {abs_fp}"
     except Exception as e:
         return f"Error: Failed to replaceAll: {type(e).__name__}: {e}"
 
 
+def _dispatch_write(
+    abs_fp, content, overwrite, replace_lines_start, replace_lines_end, insert_at_line, replaceAll, writer, durability
+):
+    if (
+        replace_lines_start is not None and replace_lines_end is not None
+    ) and insert_at_line is not None:
+        return "Error: Cannot specify both replace_lines and insert_at_line."
+
+    if replace_lines_start is not None and replace_lines_end is not None:
+        if not abs_fp.exists() or not abs_fp.is_file():
+            return f"Error: File does not exist for line replacement: {abs_fp}"
+        return _write_replace_lines(
+            abs_fp, content, replace_lines_start, replace_lines_end, durability
+        )
+
+    if insert_at_line is not None:
+        return _write_insert_at_line(abs_fp, content, insert_at_line, durability)
+
+    if replaceAll:
+        return _do_full_replace(abs_fp, content, writer)
+
+    return _do_write_file(abs_fp, content, overwrite, writer)
+
+
 def write_file(
     file_path: str,
     content: str,
@@ -168,7 +777,12 @@ def write_file(
     replace_lines_start: Optional[int] = None,
     replace_lines_end: Optional[int] = None,
     insert_at_line: Optional[int] = None,
-    replaceAll: bool = False
+    replaceAll: bool = False,
+    expected_hash: Optional[str] = None,
+    atomic: bool = False,
+    durability: str = "none",
+    old_string: Optional[str] = None,
+    occurrence: str = "unique",
 ) -> str:
     """
     Write `content` to the specified `file_path`. Will overwrite by default.
@@ -187,6 +801,25 @@ def write_file(
     - If `content` is an empty string ("") then the specified replace range will be deleted entirely \
       (no replacement lines inserted).
 
+    String replacement:
+    - If `old_string` is given, the server finds it in the existing file and replaces it
+      with `content` (exact match, no regex), so no prior read or line numbers are needed.
+    - `occurrence`: "unique" (default; fails unless exactly one match), "first", "last" or "all".
+    - Cannot be combined with line replacement, insertion or replaceAll.
+
+    Concurrency:
+    - If `expected_hash` is given (the ETag returned by `read_file`), the write is
+      rejected with the current hash when the file changed since it was read.
+    - Writes to the same path are serialized by a per-path lock.
+
+    Crash safety:
+    - If `atomic=True`, content is written to a temp file in the same directory and
+      renamed over the target (permissions preserved), so readers never see a partial file.
+    - `durability` trades latency for safety: "none" (default, no fsync), "file"
+      (fsync the written file) or "dir" (also fsync the containing directory).
+    - Line replacement and insertion always stream the file through a temp file that is
+      renamed over the target, so they are atomic and use constant memory for any file size.
+
     Protections:
     - Canonicalizes/resolves file_path.
       Refuses if writing outside the server's permissions.
@@ -197,29 +830,118 @@ def write_file(
     """
     try:
         abs_fp = pathlib.Path(file_path).expanduser().resolve()
-        validation_err = _validate_write_permissions(abs_fp, content, overwrite)
+        validation_err = _validate_write_permissions(abs_fp, content, overwrite) or _validate_durability(durability)
         if validation_err:
             return validation_err
         abs_fp.parent.mkdir(parents=True, exist_ok=True)
+        writer = functools.partial(_write_journaled, atomic=atomic, durability=durability)
 
-        if (
-            replace_lines_start is not None and replace_lines_end is not None
-        ) and insert_at_line is not None:
-            return "Error: Cannot specify both replace_lines and insert_at_line."
-
-        if replace_lines_start is not None and replace_lines_end is not None:
-            if not abs_fp.exists() or not abs_fp.is_file():
-                return f"Error: File does not exist for line replacement: {abs_fp}"
-            return _write_replace_lines(
-                abs_fp, content, replace_lines_start, replace_lines_end
+        with _path_lock(abs_fp):
+            precondition_err = _check_expected_hash(abs_fp, expected_hash)
+            if precondition_err:
+                return precondition_err
+            if old_string is not None:
+                if replace_lines_start is not None or insert_at_line is not None or replaceAll:
+                    return "Error: Cannot combine old_string with line replacement, insert_at_line or replaceAll."
+                return _write_str_replace(abs_fp, old_string, content, occurrence, writer)
+            return _dispatch_write(
+                abs_fp, content, overwrite, replace_lines_start, replace_lines_end, insert_at_line, replaceAll,
+                writer, durability,
             )
+    except Exception as e:
+        return f"Error: Unexpected error in write_file: {type(e).__name__}: {e}"
 
-        if insert_at_line is not None:
-            return _write_insert_at_line(abs_fp, content, insert_at_line)
 
-        if replaceAll:
-            return _do_full_replace(abs_fp, content)
+def _normalize_edit(edit: dict) -> Union[LineOp, str]:
+    """
+    Converts one edit dict into a (start, end, content) splice; inserts are empty ranges.
+    Returns an error string if the edit is malformed.
+    """
+    if not isinstance(edit, dict):
+        return "expected an object with content and line numbers."
+    content = edit.get("content", "")
+    if not isinstance(content, str):
+        return "content must be a string."
+    try:
+        start, end, insert_at = (
+            None if edit.get(k) is None else int(edit[k])
+            for k in ("replace_lines_start", "replace_lines_end", "insert_at_line")
+        )
+    except (TypeError, ValueError):
+        return "Line numbers must be integers."
+    if insert_at is not None:
+        if start is not None or end is not None:
+            return "Cannot specify both replace_lines and insert_at_line."
+        at = max(0, insert_at)
+        return at, at, content
+    if start is None or end is None:
+        return "Specify replace_lines_start and replace_lines_end, or insert_at_line."
+    if start < 0 or end < start:
+        return "Invalid line range requested."
+    return start, end, content
+
 
-        return _do_write_file(abs_fp, content, overwrite)
+def _normalize_edits(edits: List[dict]) -> Union[List[LineOp], str]:
+    """
+    Validates edits against the original line numbering and sorts them by position.
+    Inserts at the same line keep their given order. Returns an error string on
+    malformed or overlapping edits.
+    """
+    ops = []
+    for idx, edit in enumerate(edits):
+        op = _normalize_edit(edit)
+        if isinstance(op, str):
+            return f"Error: Edit {idx}: {op}"
+        ops.append((op[0], op[1], idx, op[2]))
+    ops.sort()
+    for prev, cur in zip(ops, ops[1:]):
+        if cur[0] < prev[1]:
+            return f"Error: Edits {prev[2]} and {cur[2]} overlap."
+    return [(start, end, content) for start, end, _, content in ops]
+
+
+def _do_edit_file(abs_fp, ops, durability):
+    try:
+        _stream_line_edits(abs_fp, ops, durability)
+        return f"Success: Applied {len(ops)} edits in {abs_fp}"
     except Exception as e:
-        return f"Error: Unexpected error in write_file: {type(e).__name__}: {e}"
+        return f"Error: Failed to apply edits: {type(e).__name__}: {e}"
+
+
+def edit_file(
+    file_path: str,
+    edits: List[dict],
+    expected_hash: Optional[str] = None,
+    durability: str = "none",
+) -> str:
+    """
+    Apply many line edits to one existing file in a single streaming pass and a single atomic write.
+
+    Each edit is a dict with `content` plus either `replace_lines_start`/`replace_lines_end`
+    (0-based, [start:end], empty content deletes) or `insert_at_line` (insert before this line),
+    exactly as in `write_file`. All positions refer to the ORIGINAL file, so callers don't have to
+    account for line shifts between edits. Overlapping ranges are rejected.
+
+    The edit is all-or-nothing: everything is validated first, then the new content is written
+    to a temp file and renamed over the target. `expected_hash` and `durability` behave as in `write_file`.
+    """
+    try:
+        abs_fp = pathlib.Path(file_path).expanduser().resolve()
+        if not edits:
+            return "Error: No edits given."
+        ops = _normalize_edits(edits)
+        if isinstance(ops, str):
+            return ops
+        combined = "".join(content for _, _, content in ops)
+        validation_err = _validate_write_permissions(abs_fp, combined, True) or _validate_durability(durability)
+        if validation_err:
+            return validation_err
+        if not abs_fp.is_file():
+            return f"Error: File does not exist for editing: {abs_fp}"
+        with _path_lock(abs_fp):
+            precondition_err = _check_expected_hash(abs_fp, expected_hash)
+            if precondition_err:
+                return precondition_err
+            return _do_edit_file(abs_fp, ops, durability)
+    except Exception as e:
+        return f"Error: Unexpected error in edit_file: {type(e).__name__}: {e}"
@@ -0,0 +1,249 @@
+import errno
+import fcntl
+import os
+import pathlib
+import shutil
+import stat
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from .file_tools import (
+    _commit_temp,
+    _is_system_path,
+    _locked_paths,
+    _stage_temp_with,
+    _validate_write_target,
+)
+from .line_cache import line_cache
+
+# ioctl(dest_fd, FICLONE, src_fd) shares the source extents (btrfs, XFS, bcachefs, ...).
+_FICLONE = 0x40049409
+_COPY_RANGE_CHUNK = 1 << 30
+# copy_file_range is unavailable or unsupported for this pair of files: fall back to a plain copy.
+_COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.EPERM}
+
+StatResult = Union[Dict[str, Any], str]
+
+
+def _abs_path(path: str) -> pathlib.Path:
+    """Absolute path with the parent resolved but the last component kept, so symlinks are not followed."""
+    p = pathlib.Path(os.path.abspath(os.path.expanduser(path)))
+    return p.parent.resolve() / p.name
+
+
+def _file_type(mode: int) -> str:
+    if stat.S_ISLNK(mode):
+        return "symlink"
+    if stat.S_ISDIR(mode):
+        return "directory"
+    if stat.S_ISREG(mode):
+        return "file"
+    return "other"
+
+
+def _stat_dict(abs_fp: pathlib.Path, st: Optional[os.stat_result] = None, exists: bool = True) -> Dict[str, Any]:
+    st = st or os.lstat(abs_fp)
+    return {
+        "path": str(abs_fp),
+        "exists": exists,
+        "type": _file_type(st.st_mode),
+        "size": st.st_size,
+        "mode": oct(stat.S_IMODE(st.st_mode)),
+        "uid": st.st_uid,
+        "gid": st.st_gid,
+        "mtime_ns": st.st_mtime_ns,
+        "inode": st.st_ino,
+        "nlink": st.st_nlink,
+        "link_target": os.readlink(abs_fp) if exists and stat.S_ISLNK(st.st_mode) else None,
+    }
+
+
+def _guard_modify(abs_fp: pathlib.Path) -> Optional[str]:
+    """Guards for removing or renaming an existing entry (symlinks themselves may be moved/deleted)."""
+    if str(abs_fp) == "/" or _is_system_path(abs_fp):
+        return f"Error: Refusing to modify system path: {abs_fp}"
+    return None
+
+
+def _clone_or_copy_range(src: BinaryIO, dst: BinaryIO):
+    """Copies src into dst inside the kernel: reflink if possible, else copy_file_range, else sendfile/read-write."""
+    try:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return
+    except OSError:
+        pass
+    try:
+        while os.copy_file_range(src.fileno(), dst.fileno(), _COPY_RANGE_CHUNK):
+            pass
+        return
+    except OSError as e:
+        if e.errno not in _COPY_FALLBACK_ERRNOS:
+            raise
+    src.seek(0)
+    dst.seek(0)
+    dst.truncate()
+    shutil.copyfileobj(src, dst)
+
+
+def _copy_file_contents(src_path: str, dst_path: str):
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        _clone_or_copy_range(src, dst)
+    shutil.copymode(src_path, dst_path)
+
+
+def _copy_file_atomic(src: pathlib.Path, dst: pathlib.Path, overwrite: bool):
+    with open(src, "rb") as fsrc:
+        tmp_path = _stage_temp_with(dst, lambda fdst: _clone_or_copy_range(fsrc, fdst))
+    shutil.copymode(src, tmp_path)
+    _commit_temp(tmp_path, dst, exclusive=not overwrite)
+
+
+def _tree_file_copier(root: pathlib.Path):
+    """copytree copy_function: checks each destination file like a single-file write and replaces it via a temp file."""
+    real_root = os.path.realpath(root)
+
+    def copy(src_path: str, dst_path: str):
+        # A symlinked directory already in the destination must not redirect the copy elsewhere.
+        dst = pathlib.Path(os.path.realpath(os.path.dirname(dst_path))) / os.path.basename(dst_path)
+        if os.path.commonpath([real_root, str(dst)]) != real_root:
+            raise PermissionError(f"Destination leaves {root} through a symlink: {dst_path}")
+        target_err = _validate_write_target(dst)
+        if target_err:
+            raise PermissionError(target_err[len("Error: "):])
+        with _locked_paths([dst]):
+            _copy_file_atomic(pathlib.Path(src_path), dst, overwrite=True)
+
+    return copy
+
+
+def _check_destination(dst: pathlib.Path, overwrite: bool, dir_source: bool = False) -> Optional[str]:
+    """Write guards for the destination; an existing directory may only be replaced (or merged) by a directory."""
+    if dir_source and dst.is_dir() and not dst.is_symlink():
+        target_err = f"Error: Refusing to write to system directory: {dst}" if _is_system_path(dst) else None
+    else:
+        target_err = _validate_write_target(dst)
+    if target_err:
+        return target_err
+    if os.path.lexists(dst) and not overwrite:
+        return f"Error: Destination exists and overwrite=False: {dst}"
+    return None
+
+
+def stat_path(path: str) -> StatResult:
+    """Return stat data (type, size, mode, owner, mtime, inode, link target) without following symlinks."""
+    try:
+        abs_fp = _abs_path(path)
+        if not os.path.lexists(abs_fp):
+            return f"Error: Path does not exist: {abs_fp}"
+        return _stat_dict(abs_fp)
+    except Exception as e:
+        return f"Error: Unexpected error in stat_path: {type(e).__name__}: {e}"
+
+
+def copy_path(source: str, destination: str, overwrite: bool = False, recursive: bool = False) -> StatResult:
+    """
+    Copy a file (or, with `recursive=True`, a directory tree) and return the destination's stat data.
+    File data is cloned (reflink) where the filesystem supports it, otherwise copied in the
+    kernel with copy_file_range; a single file lands atomically via a temp file and rename.
+    """
+    try:
+        src, dst = _abs_path(source).resolve(), _abs_path(destination)
+        if not src.exists():
+            return f"Error: Source does not exist: {src}"
+        if src.is_dir() and not recursive:
+            return f"Error: Source is a directory; pass recursive=True: {src}"
+        dest_err = _check_destination(dst, overwrite, dir_source=src.is_dir())
+        if dest_err:
+            return dest_err
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if src.is_dir():
+            shutil.copytree(src, dst, symlinks=True, copy_function=_tree_file_copier(dst), dirs_exist_ok=overwrite)
+            line_cache.invalidate(dst)
+        else:
+            with _locked_paths([dst]):
+                _copy_file_atomic(src, dst, overwrite)
+        return _stat_dict(dst)
+    except Exception as e:
+        return f"Error: Unexpected error in copy_path: {type(e).__name__}: {e}"
+
+
+def _rename(src: pathlib.Path, dst: pathlib.Path, dir_source: bool):
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        if dir_source and dst.is_dir():
+            # Like rename(2), only an empty directory is replaced (shutil.move would nest into it).
+            os.rmdir(dst)
+        shutil.move(str(src), str(dst), copy_function=_copy_file_contents)
+
+
+def move_path(source: str, destination: str, overwrite: bool = False) -> StatResult:
+    """
+    Move or rename a file, symlink or directory and return the destination's stat data.
+    Uses rename(2) (atomic) on the same filesystem and falls back to copy + delete across devices.
+    """
+    try:
+        src, dst = _abs_path(source), _abs_path(destination)
+        if not os.path.lexists(src):
+            return f"Error: Source does not exist: {src}"
+        dir_source = src.is_dir() and not src.is_symlink()
+        guard_err = _guard_modify(src) or _check_destination(dst, overwrite, dir_source)
+        if guard_err:
+            return guard_err
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        with _locked_paths([src, dst]):
+            _rename(src, dst, dir_source)
+            line_cache.invalidate(src)
+            line_cache.invalidate(dst)
+        return _stat_dict(dst)
+    except OSError as e:
+        if e.errno in (errno.ENOTEMPTY, errno.EEXIST):
+            return f"Error: Destination directory is not empty: {destination}"
+        return f"Error: Unexpected error in move_path: {type(e).__name__}: {e}"
+    except Exception as e:
+        return f"Error: Unexpected error in move_path: {type(e).__name__}: {e}"
+
+
+def delete_path(path: str, recursive: bool = False) -> StatResult:
+    """
+    Delete a file, symlink (not its target) or empty directory; non-empty directories need
+    `recursive=True`. Returns the stat data the entry had, with `exists=False`.
+    """
+    try:
+        abs_fp = _abs_path(path)
+        if not os.path.lexists(abs_fp):
+            return f"Error: Path does not exist: {abs_fp}"
+        guard_err = _guard_modify(abs_fp)
+        if guard_err:
+            return guard_err
+        st = os.lstat(abs_fp)
+        with _locked_paths([abs_fp]):
+            if not stat.S_ISDIR(st.st_mode):
+                os.unlink(abs_fp)
+            elif recursive:
+                shutil.rmtree(abs_fp)
+            else:
+                os.rmdir(abs_fp)
+            line_cache.invalidate(abs_fp)
+        return _stat_dict(abs_fp, st, exists=False)
+    except OSError as e:
+        if e.errno == errno.ENOTEMPTY:
+            return f"Error: Directory not empty; pass recursive=True: {path}"
+        return f"Error: Failed to delete: {type(e).__name__}: {e}"
+    except Exception as e:
+        return f"Error: Unexpected error in delete_path: {type(e).__name__}: {e}"
+
+
+def make_dir(path: str, parents: bool = True) -> StatResult:
+    """Create a directory (and, by default, missing parents); succeeds if it already exists."""
+    try:
+        abs_fp = _abs_path(path)
+        if _is_system_path(abs_fp):
+            return f"Error: Refusing to write to system directory: {abs_fp}"
+        if os.path.lexists(abs_fp) and not abs_fp.is_dir():
+            return f"Error: Path exists and is not a directory: {abs_fp}"
+        abs_fp.mkdir(parents=parents, exist_ok=True)
+        return _stat_dict(abs_fp)
+    except Exception as e:
+        return f"Error: Unexpected error in make_dir: {type(e).__name__}: {e}"
@@ -0,0 +1,158 @@
+import fnmatch
+import os
+import re
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Version-control metadata directories are never listed, searched or indexed.
+ALWAYS_IGNORED_DIRS = frozenset({".git", ".hg", ".svn"})
+
+
+def _glob_to_regex(glob: str) -> str:
+    """
+    Translates a gitignore glob to a regex body: `*` and `?` stop at `/`, `**` crosses directories.
+    """
+    out = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[" and "]" in glob[i + 1:]:
+            end = glob.index("]", i + 1)
+            body = glob[i + 1:end]
+            out.append("[" + ("^" + body[1:] if body.startswith("!") else body) + "]")
+            i = end + 1
+        elif c == "\\" and i + 1 < len(glob):
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def _compile_rule(line: str, rel_dir: str) -> Optional[Tuple[re.Pattern, bool, bool]]:
+    """
+    Compiles one .gitignore line found in `rel_dir` into (regex, negate, dir_only).
+    """
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    prefix = re.escape(rel_dir + "/") if rel_dir else ""
+    body = _glob_to_regex(line.lstrip("/"))
+    regex = f"^{prefix}{body}$" if anchored else f"^{prefix}(?:.*/)?{body}$"
+    return re.compile(regex), negate, dir_only
+
+
+class IgnoreRules:
+    """
+    Ordered .gitignore rules collected from a directory and its parents; the last matching rule wins.
+    Paths are relative to the walk root and use `/` separators.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[re.Pattern, bool, bool]] = ()):
+        self._rules = list(rules)
+
+    def child(self, dir_path: str, rel_dir: str) -> "IgnoreRules":
+        """Returns the rules in effect inside `dir_path`, adding its own .gitignore if present."""
+        try:
+            with open(os.path.join(dir_path, ".gitignore"), "r", encoding="utf-8", errors="replace") as f:
+                lines = f.readlines()
+        except OSError:
+            return self
+        return self.with_lines(lines, rel_dir)
+
+    def with_lines(self, lines: Sequence[str], rel_dir: str) -> "IgnoreRules":
+        """Returns these rules extended by already-read .gitignore `lines` of `rel_dir`."""
+        new_rules = [rule for rule in (_compile_rule(line, rel_dir) for line in lines) if rule]
+        return IgnoreRules(self._rules + new_rules) if new_rules else self
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        ignored = False
+        for regex, negate, dir_only in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                ignored = not negate
+        return ignored
+
+
+def matches_any(globs: Optional[Sequence[str]], rel_path: str) -> bool:
+    """True if a glob matches the relative path or its basename."""
+    if not globs:
+        return False
+    name = rel_path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(rel_path, g) or fnmatch.fnmatch(name, g) for g in globs)
+
+
+def is_excluded(
+    rel_path: str,
+    is_dir: bool,
+    rules: Optional[IgnoreRules],
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+) -> bool:
+    """
+    Common filter for walkers: VCS dirs, exclude globs and ignore rules apply to everything,
+    include globs only to files.
+    """
+    if is_dir and rel_path.rsplit("/", 1)[-1] in ALWAYS_IGNORED_DIRS:
+        return True
+    if matches_any(exclude, rel_path):
+        return True
+    if rules is not None and rules.is_ignored(rel_path, is_dir):
+        return True
+    return not is_dir and bool(include) and not matches_any(include, rel_path)
+
+
+def walk_files(
+    root: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    respect_gitignore: bool = True,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (absolute path, relative path) for the regular files below `root` in sorted order,
+    pruning ignored directories. Symlinked directories are not followed.
+    """
+    base_rules = IgnoreRules() if respect_gitignore else None
+    stack: List[Tuple[str, str, Optional[IgnoreRules]]] = [(root, "", base_rules)]
+    while stack:
+        dir_path, rel_dir, rules = stack.pop()
+        if rules is not None:
+            rules = rules.child(dir_path, rel_dir)
+        try:
+            entries = sorted(os.scandir(dir_path), key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if not is_dir and not entry.is_file(follow_symlinks=False):
+                continue
+            if is_excluded(rel_path, is_dir, rules, include, exclude):
+                continue
+            if is_dir:
+                subdirs.append((entry.path, rel_path, rules))
+            else:
+                yield entry.path, rel_path
+        stack.extend(reversed(subdirs))
@@ -0,0 +1,156 @@
+import collections
+import hashlib
+import os
+import sys
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+from .tree_cache import _RACY_WINDOW_NS
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class CachedText(NamedTuple):
+    key: Tuple[int, int, int]
+    lines: Tuple[str, ...]
+    etag: str
+    nbytes: int
+
+
+def decode_lines(data: bytes) -> Tuple[str, ...]:
+    """Splits like iterating a text-mode file (universal newlines), without line endings."""
+    return tuple(split_lines(data.decode("utf-8", errors="replace")))
+
+
+def split_lines(text: str) -> List[str]:
+    """
+    Splits on LF, CRLF and CR only, like read_file; unlike str.splitlines(), form feeds and
+    Unicode line separators stay inside their line, so line numbers agree across tools.
+    """
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _entry_size(lines: Tuple[str, ...]) -> int:
+    return sys.getsizeof(lines) + sum(sys.getsizeof(line) for line in lines)
+
+
+class LineCache:
+    """
+    Memory-bounded LRU cache of decoded text files, validated by inode, size and mtime. Superseded
+    contents stay available by ETag (evicted first) so files can be diffed against what a client saw.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "collections.OrderedDict[str, CachedText]" = collections.OrderedDict()
+        self._versions: "collections.OrderedDict[str, CachedText]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str, st: os.stat_result) -> Optional[CachedText]:
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and cached.key == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            if cached is not None:
+                self._retire(path)
+        return None
+
+    def put(self, path: str, st: os.stat_result, data: bytes) -> CachedText:
+        """
+        Decodes `data` (the file content matching `st`) and caches it if it fits the budget.
+        Content modified within the racy window is only kept as a version (by ETag).
+        """
+        lines = decode_lines(data)
+        entry = CachedText(
+            (st.st_ino, st.st_size, st.st_mtime_ns),
+            lines,
+            hashlib.blake2b(data, digest_size=16).hexdigest(),
+            _entry_size(lines),
+        )
+        if entry.nbytes > self.max_bytes // 2:
+            return entry
+        racy = time.time_ns() - st.st_mtime_ns <= _RACY_WINDOW_NS
+        with self._lock:
+            self._retire(path)
+            self._drop_version(entry.etag)
+            if racy:
+                self._versions[entry.etag] = entry
+            else:
+                self._entries[path] = entry
+            self.bytes += entry.nbytes
+            self._evict()
+        return entry
+
+    def version(self, etag: str) -> Optional[CachedText]:
+        """Content with the given ETag, if it is still cached (current or superseded)."""
+        with self._lock:
+            cached = self._versions.get(etag)
+            if cached is not None:
+                self._versions.move_to_end(etag)
+                return cached
+            return next((c for c in self._entries.values() if c.etag == etag), None)
+
+    def _retire(self, path: str):
+        """Moves the entry of `path` to the superseded versions."""
+        cached = self._entries.pop(path, None)
+        if cached is None:
+            return
+        if cached.etag in self._versions:
+            self.bytes -= cached.nbytes
+        else:
+            self._versions[cached.etag] = cached
+
+    def _drop_version(self, etag: str):
+        cached = self._versions.pop(etag, None)
+        if cached is not None:
+            self.bytes -= cached.nbytes
+
+    def _evict(self):
+        while self.bytes > self.max_bytes:
+            oldest = self._versions if self._versions else self._entries
+            _, cached = oldest.popitem(last=False)
+            self.bytes -= cached.nbytes
+            self.evictions += 1
+
+    def invalidate(self, path) -> None:
+        """Retires `path` and, if it is a directory, everything cached below it."""
+        path = str(path)
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            for cached_path in [p for p in self._entries if p == path or p.startswith(prefix)]:
+                self._retire(cached_path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "files": len(self._entries),
+                "versions": len(self._versions),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+line_cache = LineCache()
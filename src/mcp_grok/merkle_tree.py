@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from .config import Config
+from .file_tools import _file_etag
+from .search_tools import ordered_parallel
+from .tree_cache import _RACY_WINDOW_NS, TreeCache, iter_tree
+
+_MAX_SNAPSHOTS = 16
+
+# A file node is its content hash; a directory node is {"h": hash, "c": {name: node}}.
+Node = Union[str, dict]
+# rel path -> ((inode, mtime_ns, size), content hash)
+FileHashes = Dict[str, Tuple[Tuple[int, int, int], str]]
+
+
+def _dir_hash(children: Dict[str, Node]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for name in sorted(children):
+        child = children[name]
+        kind, value = ("f", child) if isinstance(child, str) else ("d", child["h"])
+        digest.update(f"{kind}\0{name}\0{value}\n".encode("utf-8", errors="surrogateescape"))
+    return digest.hexdigest()
+
+
+def _build_tree(file_hashes: Dict[str, str]) -> dict:
+    """Builds the nested Merkle tree from `rel_path -> hash`, hashing directories bottom-up."""
+    root: dict = {"c": {}}
+    for rel_path, file_hash in file_hashes.items():
+        node = root
+        *dirs, name = rel_path.split("/")
+        for part in dirs:
+            node = node["c"].setdefault(part, {"c": {}})
+        node["c"][name] = file_hash
+
+    def seal(node: dict) -> dict:
+        for child in node["c"].values():
+            if isinstance(child, dict):
+                seal(child)
+        node["h"] = _dir_hash(node["c"])
+        return node
+
+    return seal(root)
+
+
+def _all_files(node: Node, prefix: str) -> List[str]:
+    if isinstance(node, str):
+        return [prefix]
+    return [p for name, child in sorted(node["c"].items()) for p in _all_files(child, f"{prefix}/{name}" if prefix else name)]
+
+
+def diff_trees(old: dict, new: dict, prefix: str = "") -> Tuple[List[str], List[str], List[str]]:
+    """Returns (added, removed, modified) file paths, skipping subtrees whose hashes are equal."""
+    added: List[str] = []
+    removed: List[str] = []
+    modified: List[str] = []
+    if old["h"] == new["h"]:
+        return added, removed, modified
+    for name in sorted(set(old["c"]) | set(new["c"])):
+        path = f"{prefix}/{name}" if prefix else name
+        before, after = old["c"].get(name), new["c"].get(name)
+        if isinstance(before, dict) and isinstance(after, dict):
+            sub = diff_trees(before, after, path)
+            added += sub[0]
+            removed += sub[1]
+            modified += sub[2]
+        elif isinstance(before, str) and isinstance(after, str):
+            if before != after:
+                modified.append(path)
+        else:
+            removed += _all_files(before, path) if before is not None else []
+            added += _all_files(after, path) if after is not None else []
+    return added, removed, modified
+
+
+class MerkleTracker:
+    """Per-project Merkle fingerprints; snapshots are named by their root hash, the token clients pass back."""
+
+    def __init__(self, config: Config, tree_cache: TreeCache):
+        self.config = config
+        self.tree_cache = tree_cache
+        # Per project root: the hashes of its last scan, and a lock serializing its scans.
+        self._hashes: Dict[str, FileHashes] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _project_lock(self, root: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(root, threading.Lock())
+
+    def _snapshot_dir(self, project: str) -> str:
+        return os.path.join(self.config.index_dir, f"{project}.merkle")
+
+    @staticmethod
+    def _hash_one(abs_path: str, cached: Optional[tuple]) -> Optional[tuple]:
+        """Returns (cache key or None if too recent to cache, hash), reusing `cached` if the file is unchanged."""
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return None
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if cached is not None and cached[0] == key:
+            return cached
+        try:
+            file_hash = _file_etag(abs_path)  # type: ignore[arg-type]
+        except OSError:
+            return None
+        return (key if time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS else None), file_hash
+
+    def scan(self, root: str) -> dict:
+        """Hashes the tree under `root` (honouring .gitignore) and returns its Merkle tree; not reentrant per root."""
+        previous = self._hashes.get(root, {})
+        files = [(rel_path,) for rel_path, entry in iter_tree(self.tree_cache, root) if not entry.is_dir]
+        results = ordered_parallel(
+            lambda rel_path: self._hash_one(os.path.join(root, rel_path), previous.get(rel_path)), files
+        )
+        file_hashes: Dict[str, str] = {}
+        kept: FileHashes = {}
+        for (rel_path,), result in zip(files, results):
+            if result is None:
+                continue
+            key, file_hash = result
+            file_hashes[rel_path] = file_hash
+            if key is not None:
+                kept[rel_path] = (key, file_hash)
+        # Only files seen in this scan are kept, so deleted files do not linger in the cache.
+        self._hashes[root] = kept
+        return _build_tree(file_hashes)
+
+    def _save(self, project: str, tree: dict):
+        snap_dir = self._snapshot_dir(project)
+        os.makedirs(snap_dir, exist_ok=True)
+        path = os.path.join(snap_dir, f"{tree['h']}.json")
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(tree, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        snapshots = sorted(
+            (os.path.join(snap_dir, n) for n in os.listdir(snap_dir) if n.endswith(".json")),
+            key=os.path.getmtime,
+        )
+        for old in snapshots[:-_MAX_SNAPSHOTS]:
+            os.remove(old)
+
+    def _load(self, project: str, token: str) -> Optional[dict]:
+        if not all(c in "0123456789abcdef" for c in token):
+            return None
+        try:
+            with open(os.path.join(self._snapshot_dir(project), f"{token}.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def changes_since(self, project: str, token: Optional[str] = None) -> str:
+        """Fingerprints the project; with `token`, also lists files added (A), removed (D) and modified (M) since."""
+        try:
+            root = os.path.join(self.config.projects_dir, project)
+            if not os.path.isdir(root):
+                return f"Error: Project does not exist: {project}"
+            with self._project_lock(root):
+                tree = self.scan(root)
+                self._save(project, tree)
+                previous = self._load(project, token.strip().lower()) if token else None
+            out = [f"Token: {tree['h']}"]
+            if not token:
+                out.append(f"[{len(_all_files(tree, ''))} files]")
+                return "\n".join(out)
+            if previous is None:
+                return f"Error: Unknown or expired token: {token}. Current token: {tree['h']}"
+            added, removed, modified = diff_trees(previous, tree)
+            out += [f"A {p}" for p in added] + [f"D {p}" for p in removed] + [f"M {p}" for p in modified]
+            out.append(f"[{len(added)} added, {len(removed)} removed, {len(modified)} modified]")
+            return "\n".join(out)
+        except Exception as e:
+            return f"Error: Unexpected error in changes_since: {type(e).__name__}: {e}"
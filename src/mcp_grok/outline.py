@@ -0,0 +1,234 @@
+import ast
+import collections
+import itertools
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .line_cache import split_lines
+from .tree_cache import _RACY_WINDOW_NS, TreeCache, iter_tree
+
+MAX_OUTLINE_FILES = 500
+MAX_SYMBOL_RESULTS = 200
+_MAX_CACHED_OUTLINES = 20000
+_MAX_OUTLINE_BYTES = 2 * 1024 * 1024
+
+
+class Symbol(NamedTuple):
+    """A class or function; lines are 0-based [start:end), like write_file's replace range."""
+
+    kind: str
+    name: str
+    start: int
+    end: int
+    children: Tuple["Symbol", ...] = ()
+
+
+Outliner = Callable[[str], List[Symbol]]
+_OUTLINERS: Dict[str, Outliner] = {}
+
+
+def register_outliner(suffixes: Iterable[str], outliner: Outliner):
+    """Registers `outliner(text) -> symbols` for files ending in any of `suffixes`."""
+    for suffix in suffixes:
+        _OUTLINERS[suffix.lower()] = outliner
+
+
+def outliner_for(path: str) -> Optional[Outliner]:
+    name = os.path.basename(path).lower()
+    for suffix, outliner in _OUTLINERS.items():
+        if name.endswith(suffix):
+            return outliner
+    return None
+
+
+def _python_symbol(node: ast.AST) -> Optional[Symbol]:
+    if isinstance(node, ast.ClassDef):
+        kind = "class"
+    elif isinstance(node, ast.AsyncFunctionDef):
+        kind = "async def"
+    elif isinstance(node, ast.FunctionDef):
+        kind = "def"
+    else:
+        return None
+    start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1  # type: ignore[attr-defined]
+    children = tuple(filter(None, map(_python_symbol, node.body))) if kind == "class" else ()  # type: ignore[attr-defined]
+    return Symbol(kind, node.name, start, node.end_lineno or start + 1, children)  # type: ignore[attr-defined]
+
+
+def outline_python(text: str) -> List[Symbol]:
+    """Top-level classes (with their methods) and functions, via `ast`; decorators are included."""
+    return [symbol for symbol in map(_python_symbol, ast.parse(text).body) if symbol is not None]
+
+
+def regex_outliner(patterns: Sequence[Tuple[str, str]]) -> Outliner:
+    """
+    Builds an outliner from (kind, regex) pairs matched against each line; the regex must have
+    a `name` group. A symbol ends where the next one starts (or at the end of the file).
+    """
+    compiled = [(kind, re.compile(regex)) for kind, regex in patterns]
+
+    def outline(text: str) -> List[Symbol]:
+        lines = split_lines(text)
+        found: List[Tuple[str, str, int]] = []
+        for idx, line in enumerate(lines):
+            for kind, regex in compiled:
+                match = regex.match(line)
+                if match:
+                    found.append((kind, match.group("name"), idx))
+                    break
+        ends = [start for _, _, start in found[1:]] + [len(lines)]
+        return [Symbol(kind, name, start, end) for (kind, name, start), end in zip(found, ends)]
+
+    return outline
+
+
+register_outliner([".py", ".pyi"], outline_python)
+register_outliner([".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"], regex_outliner([
+    ("class", r"(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(?P<name>[\w$]+)"),
+    ("function", r"(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>[\w$]+)"),
+    ("function", r"(?:export\s+)?(?:const|let|var)\s+(?P<name>[\w$]+)\s*=\s*(?:async\s+)?(?:\([^)]*\)|[\w$]+)\s*=>"),
+    ("interface", r"(?:export\s+)?interface\s+(?P<name>[\w$]+)"),
+    ("type", r"(?:export\s+)?type\s+(?P<name>[\w$]+)\s*(?:<[^=]*>)?\s*="),
+]))
+register_outliner([".go"], regex_outliner([
+    ("func", r"func\s+(?:\([^)]*\)\s*)?(?P<name>\w+)"),
+    ("type", r"type\s+(?P<name>\w+)\s"),
+]))
+register_outliner([".rs"], regex_outliner([
+    ("fn", r"(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+(?P<name>\w+)"),
+    ("struct", r"(?:pub(?:\([^)]*\))?\s+)?struct\s+(?P<name>\w+)"),
+    ("enum", r"(?:pub(?:\([^)]*\))?\s+)?enum\s+(?P<name>\w+)"),
+    ("trait", r"(?:pub(?:\([^)]*\))?\s+)?trait\s+(?P<name>\w+)"),
+    ("impl", r"impl(?:<[^>]*>)?\s+(?P<name>[\w:<>, ]+?)\s*(?:\{|where|$)"),
+]))
+register_outliner([".sh", ".bash"], regex_outliner([
+    ("function", r"(?:function\s+)?(?P<name>[\w-]+)\s*\(\)\s*\{?"),
+]))
+
+
+class OutlineCache:
+    """Outlines per file, validated by inode, mtime and size (one stat per file on a hit)."""
+
+    def __init__(self, max_files: int = _MAX_CACHED_OUTLINES):
+        self.max_files = max_files
+        self._outlines: "collections.OrderedDict[str, Tuple[Tuple[int, int, int], List[Symbol]]]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def outline(self, path: str) -> List[Symbol]:
+        """Symbols of `path`; raises OSError, SyntaxError or ValueError if it cannot be outlined."""
+        outliner = outliner_for(path)
+        if outliner is None:
+            raise ValueError(f"No outliner for {os.path.basename(path)}")
+        st = os.stat(path)
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._outlines.get(path)
+            if cached is not None and cached[0] == key:
+                self._outlines.move_to_end(path)
+                return cached[1]
+        if st.st_size > _MAX_OUTLINE_BYTES:
+            raise ValueError("File too large to outline")
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            symbols = outliner(f.read())
+        if time.time_ns() - st.st_mtime_ns <= _RACY_WINDOW_NS:
+            return symbols
+        with self._lock:
+            self._outlines[path] = (key, symbols)
+            self._outlines.move_to_end(path)
+            while len(self._outlines) > self.max_files:
+                self._outlines.popitem(last=False)
+        return symbols
+
+
+def _format_symbols(symbols: Sequence[Symbol], indent: str = "") -> Iterator[str]:
+    for symbol in symbols:
+        yield f"{indent}{symbol.kind} {symbol.name} [{symbol.start}:{symbol.end}]"
+        yield from _format_symbols(symbol.children, indent + "  ")
+
+
+def _source_files(tree_cache: TreeCache, root: str, respect_gitignore: bool = True) -> Iterator[str]:
+    for rel_path, entry in iter_tree(tree_cache, root, respect_gitignore=respect_gitignore):
+        if not entry.is_dir and outliner_for(rel_path) is not None:
+            yield rel_path
+
+
+def _outline_dir(cache: OutlineCache, tree_cache: TreeCache, root: str, respect_gitignore: bool) -> List[str]:
+    out: List[str] = []
+    for count, rel_path in enumerate(_source_files(tree_cache, root, respect_gitignore)):
+        if count >= MAX_OUTLINE_FILES:
+            out.append(f"...[stopped at {MAX_OUTLINE_FILES} files]...")
+            break
+        try:
+            symbols = cache.outline(os.path.join(root, rel_path))
+        except (OSError, SyntaxError, ValueError) as e:
+            out.append(f"{rel_path}\n  [not outlined: {type(e).__name__}]")
+            continue
+        if symbols:
+            out.append(rel_path)
+            out.extend(_format_symbols(symbols, "  "))
+    return out
+
+
+def outline(cache: OutlineCache, tree_cache: TreeCache, path: str, respect_gitignore: bool = True) -> str:
+    """Classes and functions with 0-based [start:end) line ranges, for a file or every supported file in a directory."""
+    try:
+        if os.path.isdir(path):
+            lines = _outline_dir(cache, tree_cache, path, respect_gitignore)
+            return "\n".join(lines) if lines else "No symbols found."
+        if not os.path.isfile(path):
+            return f"Error: Path does not exist: {path}"
+        symbols = cache.outline(path)
+        return "\n".join(_format_symbols(symbols)) if symbols else "No symbols found."
+    except SyntaxError as e:
+        return f"Error: Cannot parse {path}: line {e.lineno}: {e.msg}"
+    except ValueError as e:
+        return f"Error: {e}"
+    except Exception as e:
+        return f"Error: Unexpected error in outline: {type(e).__name__}: {e}"
+
+
+def _walk(symbols: Sequence[Symbol], parent: str = "") -> Iterator[Tuple[str, Symbol]]:
+    for symbol in symbols:
+        qualified = f"{parent}.{symbol.name}" if parent else symbol.name
+        yield qualified, symbol
+        yield from _walk(symbol.children, qualified)
+
+
+def _symbol_matches(
+    cache: OutlineCache, tree_cache: TreeCache, root: str, matcher: re.Pattern, kind: Optional[str]
+) -> Iterator[str]:
+    for rel_path in _source_files(tree_cache, root):
+        try:
+            symbols = cache.outline(os.path.join(root, rel_path))
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for qualified, symbol in _walk(symbols):
+            if (kind is None or symbol.kind == kind) and (matcher.match(symbol.name) or matcher.match(qualified)):
+                yield f"{rel_path}:{symbol.start}-{symbol.end} {symbol.kind} {qualified}"
+
+
+def find_symbol(
+    cache: OutlineCache, tree_cache: TreeCache, root: str, name: str, regex: bool = False,
+    kind: Optional[str] = None, max_results: int = MAX_SYMBOL_RESULTS,
+) -> str:
+    """
+    Project-wide symbol lookup from the outline cache: `name` matches the symbol name or its
+    qualified `Class.method` name (exactly, or as a regex with `regex=True`). Returns
+    `path:start-end kind qualified_name` lines.
+    """
+    try:
+        matcher = re.compile(name if regex else re.escape(name) + r"\Z")
+    except re.error as e:
+        return f"Error: Invalid regex: {e}"
+    try:
+        results = list(itertools.islice(_symbol_matches(cache, tree_cache, root, matcher, kind), max_results + 1))
+    except Exception as e:
+        return f"Error: Unexpected error in find_symbol: {type(e).__name__}: {e}"
+    if len(results) > max_results:
+        results[max_results:] = [f"...[stopped at max_results={max_results}]..."]
+    return "\n".join(results) if results else f"No symbols matching {name!r}."
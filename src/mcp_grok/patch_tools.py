@@ -0,0 +1,405 @@
+import dataclasses
+import os
+import pathlib
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .file_tools import (
+    MAX_WRITE_BYTES,
+    _atomic_write,
+    _commit_temp,
+    _discard_temp,
+    _locked_paths,
+    _make_parents,
+    _remove_created_dirs,
+    _stage_temp,
+    _validate_durability,
+    _validate_write_target,
+)
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(ValueError):
+    """Raised for malformed patches and for patches that cannot be applied."""
+
+
+@dataclass
+class Hunk:
+    old_start: int
+    old_len: int
+    new_start: int
+    new_len: int
+    # (tag, text) pairs; tag is " " (context), "-" (removed) or "+" (added)
+    lines: List[Tuple[str, str]] = dataclasses.field(default_factory=list)
+    new_missing_eol: bool = False
+
+
+@dataclass
+class FilePatch:
+    old_path: Optional[str]
+    new_path: Optional[str]
+    hunks: List[Hunk] = dataclasses.field(default_factory=list)
+
+
+@dataclass
+class _FilePlan:
+    target: pathlib.Path
+    # None means the target is deleted
+    new_lines: Optional[List[str]]
+    # content of the patched file before patching; None if the patch creates it
+    original: Optional[List[str]]
+    # source of a rename, removed once the target is written
+    remove: Optional[pathlib.Path] = None
+
+
+# =========================
+# Parsing
+# =========================
+
+
+def _header_path(raw: str) -> Optional[str]:
+    path = raw.split("\t", 1)[0].strip()
+    if len(path) > 1 and path.startswith('"') and path.endswith('"'):
+        path = path[1:-1]
+    return None if path == "/dev/null" else path
+
+
+def _mark_missing_eol(hunk: Hunk):
+    # "\ No newline at end of file" refers to the line before it
+    if hunk.lines and hunk.lines[-1][0] in " +":
+        hunk.new_missing_eol = True
+
+
+def _parse_hunk(lines: List[str], i: int) -> Tuple[Hunk, int]:
+    m = _HUNK_HEADER.match(lines[i])
+    if not m:
+        raise PatchError(f"Malformed hunk header: {lines[i]!r}")
+    old_len = int(m.group(2)) if m.group(2) is not None else 1
+    new_len = int(m.group(4)) if m.group(4) is not None else 1
+    hunk = Hunk(int(m.group(1)), old_len, int(m.group(3)), new_len)
+    old_left, new_left = old_len, new_len
+    i += 1
+    while i < len(lines) and (old_left > 0 or new_left > 0 or lines[i].startswith("\\")):
+        line = lines[i] or " "
+        i += 1
+        if line[0] == "\\":
+            _mark_missing_eol(hunk)
+            continue
+        if line[0] not in " -+":
+            raise PatchError(f"Unexpected line in hunk at line {hunk.old_start}: {line!r}")
+        hunk.lines.append((line[0], line[1:]))
+        old_left -= line[0] in " -"
+        new_left -= line[0] in " +"
+    if old_left > 0 or new_left > 0:
+        raise PatchError(f"Hunk at line {hunk.old_start} is truncated.")
+    return hunk, i
+
+
+def parse_unified_diff(text: str) -> List[FilePatch]:
+    """
+    Parses a (possibly multi-file) unified diff. Lines outside file headers and hunks,
+    such as `diff --git` or `index` lines, are ignored.
+    """
+    # Only LF (or CRLF) ends a patch line; form feeds and the like are line content.
+    lines = [line[:-1] if line.endswith("\r") else line for line in text.split("\n")]
+    patches: List[FilePatch] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            patches.append(FilePatch(_header_path(line[4:]), _header_path(lines[i + 1][4:])))
+            i += 2
+        elif line.startswith("@@"):
+            if not patches:
+                raise PatchError("Hunk found before any ---/+++ file header.")
+            hunk, i = _parse_hunk(lines, i)
+            patches[-1].hunks.append(hunk)
+        else:
+            i += 1
+    if not patches:
+        raise PatchError("No ---/+++ file headers found in patch.")
+    return patches
+
+
+# =========================
+# Hunk matching
+# =========================
+
+
+def _context_counts(hunk: Hunk) -> Tuple[int, int]:
+    tags = [tag for tag, _ in hunk.lines]
+    lead = next((idx for idx, tag in enumerate(tags) if tag != " "), len(tags))
+    trail = next((idx for idx, tag in enumerate(reversed(tags)) if tag != " "), len(tags))
+    return lead, trail
+
+
+def _find_block(keys: List[str], block: List[str], expected: int, lo: int) -> Optional[int]:
+    """
+    Returns the match position of `block` in `keys` (at or after `lo`) closest to `expected`.
+    """
+    last = len(keys) - len(block)
+    if last < lo:
+        return None
+    expected = min(max(expected, lo), last)
+    for delta in range(max(expected - lo, last - expected) + 1):
+        for cand in (expected - delta, expected + delta):
+            if lo <= cand <= last and keys[cand:cand + len(block)] == block:
+                return cand
+    return None
+
+
+def _locate_hunk(keys: List[str], hunk: Hunk, lo: int, offset: int, fuzz: int):
+    """
+    Finds where a hunk applies, tolerating line offsets and, with fuzz, ignoring up to
+    `fuzz` outer context lines. Returns (start, head_trim, tail_trim, fuzz_used) or None.
+    """
+    old_block = [text for tag, text in hunk.lines if tag in " -"]
+    lead, trail = _context_counts(hunk)
+    base = hunk.old_start if hunk.old_len == 0 else hunk.old_start - 1
+    tried = set()
+    for level in range(max(0, fuzz) + 1):
+        head, tail = min(level, lead), min(level, trail)
+        if (head, tail) in tried:
+            continue
+        tried.add((head, tail))
+        block = old_block[head:len(old_block) - tail]
+        start = _find_block(keys, block, base + offset + head, lo)
+        if start is not None:
+            return start, head, tail, level
+    return None
+
+
+def _new_side(hunk: Hunk, old_lines: List[str], start: int, head: int, tail: int, eol: str) -> List[str]:
+    out = []
+    cursor = start
+    for tag, text in hunk.lines[head:len(hunk.lines) - tail]:
+        if tag == "+":
+            out.append(text + eol)
+            continue
+        if tag == " ":
+            out.append(old_lines[cursor])
+        cursor += 1
+    if hunk.new_missing_eol and tail == 0 and out:
+        out[-1] = out[-1].rstrip("\r\n")
+    return out
+
+
+def _hunk_report(label: str, number: int, line: int, drift: int, fuzz_used: int) -> str:
+    report = f"{label}: hunk {number} applied at line {line}"
+    notes = []
+    if drift:
+        notes.append(f"offset {drift:+d} lines")
+    if fuzz_used:
+        notes.append(f"fuzz {fuzz_used}")
+    return report + (f" ({', '.join(notes)})" if notes else "")
+
+
+def _apply_hunks(old_lines: List[str], hunks: List[Hunk], fuzz: int, label: str):
+    """
+    Applies all hunks of one file. Returns (new_lines or None if any hunk failed, reports).
+    """
+    keys = [line.rstrip("\r\n") for line in old_lines]
+    eol = "\r\n" if old_lines and old_lines[0].endswith("\r\n") else "\n"
+    out: List[str] = []
+    reports = []
+    pos = offset = 0
+    failed = False
+    for number, hunk in enumerate(hunks, 1):
+        found = _locate_hunk(keys, hunk, pos, offset, fuzz)
+        if found is None:
+            reports.append(f"{label}: hunk {number} FAILED (expected at line {hunk.old_start})")
+            failed = True
+            continue
+        start, head, tail, fuzz_used = found
+        old_count = sum(1 for tag, _ in hunk.lines if tag in " -") - head - tail
+        out.extend(old_lines[pos:start])
+        out.extend(_new_side(hunk, old_lines, start, head, tail, eol))
+        offset = start - head - (hunk.old_start if hunk.old_len == 0 else hunk.old_start - 1)
+        pos = start + old_count
+        reports.append(_hunk_report(label, number, start + 1, offset, fuzz_used))
+    out.extend(old_lines[pos:])
+    return (None if failed else out), reports
+
+
+# =========================
+# Planning and committing
+# =========================
+
+
+def _auto_strip(file_patches: List[FilePatch]) -> int:
+    paths = [p for fp in file_patches for p in (fp.old_path, fp.new_path) if p is not None]
+    return 1 if paths and all(p.startswith(("a/", "b/")) for p in paths) else 0
+
+
+def _resolve_patch_path(path: Optional[str], base_dir: Optional[pathlib.Path], strip: int) -> Optional[pathlib.Path]:
+    if path is None:
+        return None
+    pure = pathlib.PurePosixPath(path)
+    if pure.is_absolute():
+        return pathlib.Path(path).resolve()
+    if strip >= len(pure.parts):
+        raise PatchError(f"Cannot strip {strip} path components from {path!r}.")
+    if base_dir is None:
+        raise PatchError(f"Relative patch path {path!r} needs a base directory or an active project.")
+    return (base_dir / pathlib.Path(*pure.parts[strip:])).resolve()
+
+
+def _read_lines(abs_fp: pathlib.Path) -> List[str]:
+    with open(abs_fp, "r", encoding="utf-8", newline="") as f:
+        return f.readlines()
+
+
+def _check_paths(source: Optional[pathlib.Path], target: pathlib.Path):
+    for path in {p for p in (source, target) if p is not None}:
+        err = _validate_write_target(path)
+        if err:
+            raise PatchError(err.removeprefix("Error: "))
+    if source is None and target.exists():
+        raise PatchError(f"File to be created already exists: {target}")
+    if source is not None and not source.is_file():
+        raise PatchError(f"File to be patched does not exist: {source}")
+    if source is not None and source != target and target.exists():
+        raise PatchError(f"Rename target already exists: {target}")
+
+
+def _plan_file(fp: FilePatch, source: Optional[pathlib.Path], target: Optional[pathlib.Path], fuzz: int):
+    label = fp.new_path or fp.old_path or "?"
+    if target is None:
+        raise PatchError(f"{label}: both sides of the file header are /dev/null.")
+    _check_paths(source, target)
+    original = _read_lines(source) if source is not None else None
+    new_lines, reports = _apply_hunks(original or [], fp.hunks, fuzz, label)
+    if new_lines is None:
+        return None, reports
+    if fp.new_path is None:
+        if new_lines:
+            return None, reports + [f"{label}: FAILED, file is not empty after removing the deleted lines"]
+        return _FilePlan(target, None, original), reports
+    remove = source if source is not None and source != target else None
+    return _FilePlan(target, new_lines, original, remove), reports
+
+
+def _restore(path: pathlib.Path, original: Optional[List[str]]):
+    if original is None:
+        os.unlink(path)
+    else:
+        _atomic_write(path, original)
+
+
+def _stage_all(plans: List[_FilePlan], durability: str, created: List[pathlib.Path]) -> List[Tuple[_FilePlan, str]]:
+    staged: List[Tuple[_FilePlan, str]] = []
+    try:
+        for plan in plans:
+            if plan.new_lines is not None:
+                _make_parents(plan.target.parent, created)
+                staged.append((plan, _stage_temp(plan.target, plan.new_lines, durability)))
+    except BaseException:
+        for _, tmp_path in staged:
+            _discard_temp(tmp_path)
+        _remove_created_dirs(created)
+        raise
+    return staged
+
+
+def _commit_plans(plans: List[_FilePlan], durability: str):
+    """
+    Two-phase commit: every new file content is staged as a temp file first, then all temp
+    files are renamed into place and deletions run. If any step fails, the completed steps
+    are rolled back from the in-memory originals and the directories created for new files
+    are removed.
+    """
+    created: List[pathlib.Path] = []
+    staged = _stage_all(plans, durability, created)
+    done: List[Tuple[pathlib.Path, Optional[List[str]]]] = []
+    try:
+        for idx, (plan, tmp_path) in enumerate(staged):
+            _commit_temp(tmp_path, plan.target, durability)
+            done.append((plan.target, plan.original if plan.remove is None else None))
+            staged[idx] = (plan, "")
+        for plan in plans:
+            if plan.new_lines is None or plan.remove is not None:
+                removed = plan.target if plan.new_lines is None else plan.remove
+                os.unlink(removed)
+                done.append((removed, plan.original))
+    except BaseException:
+        for _, tmp_path in staged:
+            if tmp_path:
+                _discard_temp(tmp_path)
+        for path, original in reversed(done):
+            _restore(path, original)
+        _remove_created_dirs(created)
+        raise
+
+
+def _check_distinct_targets(resolved):
+    """Each file may appear in one section only: every section is planned against the on-disk file."""
+    seen = set()
+    for pair in resolved:
+        for path in {p for p in pair if p is not None}:
+            if path in seen:
+                raise PatchError(f"{path} is patched by more than one file section; combine them into one.")
+            seen.add(path)
+
+
+def _plan_all(file_patches, resolved, fuzz):
+    plans, reports, failed = [], [], False
+    for fp, (source, target) in zip(file_patches, resolved):
+        plan, file_reports = _plan_file(fp, source, target, fuzz)
+        reports.extend(file_reports)
+        if plan is None:
+            failed = True
+        else:
+            plans.append(plan)
+    return (None if failed else plans), reports
+
+
+def apply_patch(
+    patch: str,
+    base_dir: Optional[str] = None,
+    strip: Optional[int] = None,
+    fuzz: int = 2,
+    dry_run: bool = False,
+    durability: str = "none",
+) -> str:
+    """
+    Apply a unified diff (one or many files) relative to `base_dir`.
+
+    - Hunks may apply at an offset from their recorded line numbers; with `fuzz` > 0, up to
+      `fuzz` outer context lines per side may mismatch.
+    - `strip` removes leading path components like `patch -p`; by default `a/` and `b/`
+      prefixes are stripped when every header uses them.
+    - `/dev/null` headers create or delete files; differing old/new paths rename.
+    - All-or-nothing: every hunk of every file must apply before anything is written, and
+      files are then replaced atomically (temp file + rename), with rollback on failure.
+    - Returns a per-hunk report. `dry_run=True` only checks that the patch applies.
+    """
+    try:
+        if len(patch.encode("utf-8")) > MAX_WRITE_BYTES:
+            return "Error: Patch too large (>10MB)."
+        durability_err = _validate_durability(durability)
+        if durability_err:
+            return durability_err
+        base = pathlib.Path(base_dir).expanduser().resolve() if base_dir else None
+        file_patches = parse_unified_diff(patch)
+        level = _auto_strip(file_patches) if strip is None else max(0, strip)
+        resolved = []
+        for fp in file_patches:
+            source = _resolve_patch_path(fp.old_path, base, level)
+            target = _resolve_patch_path(fp.new_path, base, level) or source
+            resolved.append((source, target))
+        _check_distinct_targets(resolved)
+        lock_paths = [p for pair in resolved for p in pair if p is not None]
+        with _locked_paths(lock_paths):
+            plans, reports = _plan_all(file_patches, resolved, fuzz)
+            if plans is None:
+                return "Error: Patch not applied; no files were changed.\n" + "\n".join(reports)
+            if dry_run:
+                return f"Success: Patch applies to {len(plans)} file(s) (dry run, nothing written)\n" + "\n".join(reports)
+            _commit_plans(plans, durability)
+        return f"Success: Patched {len(plans)} file(s)\n" + "\n".join(reports)
+    except PatchError as e:
+        return f"Error: {e}"
+    except Exception as e:
+        return f"Error: Failed to apply patch: {type(e).__name__}: {e}"
@@ -1,6 +1,8 @@
 import os
 import re
 
+from .config import INDEX_DIR_NAME
+
 
 class ProjectManager:
     def __init__(self, config, shell_manager):
@@ -10,6 +12,10 @@ class ProjectManager:
     def safe_name(self, name: str) -> bool:
         return re.match(r'^[a-zA-Z0-9_.-]+$', name) is not None
 
+    def valid_project_name(self, name: str) -> bool:
+        """safe_name() that also names a directory directly inside projects_dir (not ".", ".." or the index)."""
+        return self.safe_name(name) and name not in (".", "..", INDEX_DIR_NAME)
+
     def project_path(self, name: str) -> str:
         return os.path.join(self.config.projects_dir, name)
 
@@ -20,7 +26,8 @@ class ProjectManager:
         self.ensure_projects_dir()
         return sorted([
             name for name in os.listdir(self.config.projects_dir)
-            if os.path.isdir(os.path.join(self.config.projects_dir, name))
+            if name != INDEX_DIR_NAME
+            and os.path.isdir(os.path.join(self.config.projects_dir, name))
         ])
 
     def create_new(self, name: str) -> str:
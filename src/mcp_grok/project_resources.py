@@ -0,0 +1,78 @@
+import os
+import urllib.parse
+from typing import Any, Dict, NamedTuple, Optional
+
+from mcp.server.fastmcp.resources import ResourceTemplate
+
+from .file_tools import read_file
+
+# `{+path}` is RFC 6570 reserved expansion: the path may contain `/`.
+PROJECT_URI_TEMPLATE = "project://{name}/{+path}"
+
+
+class ProjectUri(NamedTuple):
+    name: str
+    path: str
+    offset: int
+    limit: int
+
+
+def parse_project_uri(uri: str) -> Optional[ProjectUri]:
+    """
+    Parses `project://<name>/<path>[?offset=N&limit=M]`; returns None if `uri` is not a project URI.
+    """
+    parsed = urllib.parse.urlsplit(uri)
+    path = urllib.parse.unquote(parsed.path.lstrip("/"))
+    if parsed.scheme != "project" or not parsed.netloc or not path:
+        return None
+    query = urllib.parse.parse_qs(parsed.query)
+    try:
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", ["2000"])[0])
+    except ValueError:
+        return None
+    return ProjectUri(parsed.netloc, path, offset, limit)
+
+
+def resolve_project_file(project_manager, name: str, path: str) -> str:
+    """Absolute path of `path` inside project `name`; raises ValueError if it escapes the project."""
+    if not project_manager.valid_project_name(name):
+        raise ValueError(f"Invalid project name: {name}")
+    root = os.path.realpath(project_manager.project_path(name))
+    if os.path.dirname(root) != os.path.realpath(project_manager.config.projects_dir):
+        raise ValueError(f"Invalid project name: {name}")
+    abs_path = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, abs_path]) != root:
+        raise ValueError(f"Path escapes project {name}: {path}")
+    return abs_path
+
+
+class ProjectFileTemplate(ResourceTemplate):
+    """Resource template whose `path` parameter spans several URI segments and takes a line range."""
+
+    def matches(self, uri: str) -> Optional[Dict[str, Any]]:
+        parsed = parse_project_uri(uri)
+        return parsed._asdict() if parsed is not None else None
+
+
+def project_file_template(project_manager) -> ProjectFileTemplate:
+    def read_project_file(name: str, path: str, offset: int = 0, limit: int = 2000) -> str:
+        abs_path = resolve_project_file(project_manager, name, path)
+        content = read_file(abs_path, limit, offset)
+        if content.startswith("Error:"):
+            raise ValueError(content)
+        return content
+
+    template = ProjectFileTemplate.from_function(
+        read_project_file,
+        PROJECT_URI_TEMPLATE,
+        name="project_file",
+        title="Project File",
+        description=(
+            "Text of a file inside a project, read like the read_file tool. "
+            "Optional `?offset=N&limit=M` selects a 0-based line range (limit max 5000)."
+        ),
+        mime_type="text/plain",
+    )
+    assert isinstance(template, ProjectFileTemplate)
+    return template
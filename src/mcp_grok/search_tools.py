@@ -0,0 +1,197 @@
+import collections
+import functools
+import os
+import pathlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .ignore_rules import walk_files
+from .line_cache import split_lines
+
+MAX_SEARCH_RESULTS = 10000
+MAX_CONTEXT_LINES = 20
+MAX_LINE_CHARS = 500
+_MAX_SEARCH_FILE_BYTES = 50 * 1024 * 1024
+_BINARY_SNIFF_BYTES = 8192
+
+# (relative path, [(line index, text, is_match)], number of matches)
+FileHits = Tuple[str, List[Tuple[int, str, bool]], int]
+
+
+def compile_pattern(pattern: str, regex: bool = True, ignore_case: bool = False) -> re.Pattern:
+    flags = re.IGNORECASE if ignore_case else 0
+    return re.compile(pattern if regex else re.escape(pattern), flags)
+
+
+def _read_text(abs_path: str) -> Optional[str]:
+    """Returns decoded file text, or None for unreadable, oversized or binary files."""
+    try:
+        if os.path.getsize(abs_path) > _MAX_SEARCH_FILE_BYTES:
+            return None
+        with open(abs_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b"\0" in data[:_BINARY_SNIFF_BYTES]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def _with_context(lines: List[str], match_idx: List[int], context: int) -> List[Tuple[int, str, bool]]:
+    matched = set(match_idx)
+    wanted = sorted({i for m in match_idx for i in range(max(0, m - context), min(len(lines), m + context + 1))})
+    return [(i, lines[i], i in matched) for i in wanted]
+
+
+# \A, \Z and negative lookarounds can match at a line edge but not next to the text's newlines.
+_LINE_EDGE_ASSERTION = re.compile(r"\\[AZ]|\(\?<?!")
+
+
+@functools.lru_cache(maxsize=64)
+def _prefilter(matcher: re.Pattern) -> Optional[re.Pattern]:
+    """
+    `matcher` with ^ and $ matching at every line, for the whole-text check; None if a line can
+    match while the whole text does not.
+    """
+    if _LINE_EDGE_ASSERTION.search(matcher.pattern):
+        return None
+    return re.compile(matcher.pattern, matcher.flags | re.MULTILINE)
+
+
+def search_file(abs_path: str, rel_path: str, matcher: re.Pattern, context: int, limit: int) -> Optional[FileHits]:
+    """
+    Searches one file; returns its matching lines (plus context) or None if nothing matched.
+    The whole-text check lets files without any match be rejected in a single regex pass.
+    Lines are split like read_file, so reported line numbers match its offsets.
+    """
+    text = _read_text(abs_path)
+    if text is None:
+        return None
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    prefilter = _prefilter(matcher)
+    if prefilter is not None and not prefilter.search(text):
+        return None
+    lines = split_lines(text)
+    match_idx = [i for i, line in enumerate(lines) if matcher.search(line)][:limit]
+    if not match_idx:
+        return None
+    return rel_path, _with_context(lines, match_idx, context), len(match_idx)
+
+
+def ordered_parallel(fn: Callable, items: Iterable, workers: Optional[int] = None) -> Iterator:
+    """
+    Maps `fn` over `items` on a thread pool, yielding results in input order as soon as they are
+    ready. Only a bounded window of work is queued, so consumers can stop early cheaply.
+    """
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    pending: collections.deque = collections.deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-grok-search") as pool:
+        try:
+            for item in items:
+                pending.append(pool.submit(fn, *item))
+                if len(pending) >= workers * 4:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _format_hits(hits: FileHits, remaining: int, context: int) -> Tuple[List[str], int]:
+    """Formats grep-style lines (`path:line:text` for matches, `path-line-text` for context)."""
+    rel_path, lines, _ = hits
+    out: List[str] = []
+    shown = 0
+    prev = None
+    for idx, text, is_match in lines:
+        if is_match and shown >= remaining:
+            break
+        if context and prev is not None and idx != prev + 1:
+            out.append("--")
+        sep = ":" if is_match else "-"
+        out.append(f"{rel_path}{sep}{idx}{sep}{text[:MAX_LINE_CHARS]}")
+        shown += is_match
+        prev = idx
+    return out, shown
+
+
+def iter_search_hits(
+    root: str,
+    matcher: re.Pattern,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    respect_gitignore: bool = True,
+    context: int = 0,
+    limit: int = MAX_SEARCH_RESULTS,
+) -> Iterator[FileHits]:
+    """Streams per-file hits for every file under `root` (or `root` itself if it is a file)."""
+    if os.path.isfile(root):
+        files: Iterable[Tuple[str, str]] = [(root, os.path.basename(root))]
+    else:
+        files = walk_files(root, include, exclude, respect_gitignore)
+    jobs = ((abs_path, rel_path, matcher, context, limit) for abs_path, rel_path in files)
+    for hits in ordered_parallel(search_file, jobs):
+        if hits is not None:
+            yield hits
+
+
+def collect_search_output(hits_iter: Iterable[FileHits], max_results: int, context: int) -> str:
+    out: List[str] = []
+    total = files = 0
+    for hits in hits_iter:
+        lines, shown = _format_hits(hits, max_results - total, context)
+        if context and out:
+            out.append("--")
+        out.extend(lines)
+        total += shown
+        files += 1
+        if total >= max_results:
+            out.append(f"...[stopped at max_results={max_results}]...")
+            return "\n".join(out)
+    if not out:
+        return "No matches found."
+    out.append(f"[{total} matches in {files} files]")
+    return "\n".join(out)
+
+
+def search(
+    root: str,
+    pattern: str,
+    regex: bool = True,
+    ignore_case: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    respect_gitignore: bool = True,
+    max_results: int = 200,
+    context: int = 0,
+) -> str:
+    """
+    Search file contents under `root` for `pattern` and return grep-style lines.
+
+    - `regex=False` searches for the literal string. `ignore_case` makes matching case-insensitive.
+    - `include`/`exclude` are glob lists matched against relative paths and basenames
+      (e.g. `*.py`, `build/*`). `.gitignore` files are honoured unless `respect_gitignore=False`;
+      `.git` directories, binary files and files over 50MB are always skipped.
+    - Output lines are `path:line:text` for matches and `path-line-text` for `context` lines;
+      line numbers are 0-based, like read_file offsets and write_file line indices.
+    - Files are scanned by a thread pool and results are streamed in path order; the scan stops
+      as soon as `max_results` matches (hard cap 10000) have been collected.
+    """
+    try:
+        abs_root = pathlib.Path(root).expanduser().resolve()
+        if not abs_root.exists():
+            return f"Error: Search path does not exist: {abs_root}"
+        if not pattern:
+            return "Error: Pattern cannot be empty."
+        try:
+            matcher = compile_pattern(pattern, regex, ignore_case)
+        except re.error as e:
+            return f"Error: Invalid regex: {e}"
+        max_results = min(MAX_SEARCH_RESULTS, max(1, max_results))
+        context = min(MAX_CONTEXT_LINES, max(0, context))
+        hits = iter_search_hits(str(abs_root), matcher, include, exclude, respect_gitignore, context, max_results)
+        return collect_search_output(hits, max_results, context)
+    except Exception as e:
+        return f"Error: Unexpected error in search: {type(e).__name__}: {e}"
@@ -1,13 +1,46 @@
 import os
+import asyncio
 import functools
+import inspect
 import logging
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
 from pydantic import BaseModel
 from mcp.types import ToolAnnotations
 from .file_tools import (
+    edit_file as file_tools_edit_file,
+    read_bytes as file_tools_read_bytes,
     read_file as file_tools_read_file,
     write_file as file_tools_write_file,
 )
+from .bulk_write import write_files as bulk_write_files
+from .change_feed import ChangeFeed, format_changes
+from .diff_tools import diff as diff_tools_diff
+from .download_route import DOWNLOAD_ROUTE, make_download_endpoint
+from .fs_tools import (
+    copy_path as fs_tools_copy_path,
+    delete_path as fs_tools_delete_path,
+    make_dir as fs_tools_make_dir,
+    move_path as fs_tools_move_path,
+    stat_path as fs_tools_stat_path,
+)
+from .line_cache import line_cache
+from .merkle_tree import MerkleTracker
+from .outline import OutlineCache, find_symbol as outline_find_symbol, outline as outline_outline
+from .patch_tools import apply_patch as patch_tools_apply_patch
+from .project_resources import project_file_template
+from .search_tools import search as search_tools_search
+from .tree_cache import TreeCache, list_files as tree_cache_list_files
+from .trigram_index import TrigramIndexManager
+from .undo_tools import redo_edit as undo_tools_redo_edit, undo_edit as undo_tools_undo_edit
+from .upload_tools import (
+    abort_upload as upload_tools_abort_upload,
+    append_chunk as upload_tools_append_chunk,
+    begin_upload as upload_tools_begin_upload,
+    commit_upload as upload_tools_commit_upload,
+)
+from .wait_tools import MAX_CONCURRENT_WAITS, wait_for as wait_tools_wait_for
 
 
 class MCPGrokServer:
@@ -19,6 +52,11 @@ class MCPGrokServer:
         # project_manager is set after importing to avoid circular import
         from .project_manager import ProjectManager
         self.project_manager = ProjectManager(config, self.shell_manager)
+        self.tree_cache = TreeCache()
+        self.outline_cache = OutlineCache()
+        self.merkle_tracker = MerkleTracker(config, self.tree_cache)
+        self.change_feed = ChangeFeed(self.tree_cache)
+        self.index_manager = TrigramIndexManager(config, self.change_feed)
         self.mcp = FastMCP(
             "ConsoleAccessServer",
             instructions=(
@@ -30,21 +68,60 @@ class MCPGrokServer:
         self._register_tools()
 
     def _log_tool_call(self, func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
+        def log_call(args, kwargs):
             logging.getLogger(__name__).info(
                 "Tool called: %s args=%s kwargs=%s",
                 func.__name__, args, kwargs,
             )
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                log_call(args, kwargs)
+                return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            log_call(args, kwargs)
             return func(*args, **kwargs)
 
         return wrapper
 
+    def _abs_tool_path(self, file_path: str) -> Optional[str]:
+        """Resolves a tool path against the active project; None if relative and no project is active."""
+        if os.path.isabs(file_path):
+            return file_path
+        cwd = self.shell_manager.cwd
+        if not cwd:
+            return None
+        return os.path.join(cwd, file_path)
+
+    def _project_name(self, project: Optional[str]) -> Optional[str]:
+        """Returns `project`, or the active project's name; None if neither is a valid project name."""
+        name = project or os.path.basename(self.shell_manager.cwd or "")
+        return name if name and self.project_manager.valid_project_name(name) else None
+
     def _register_tools(self):
         mcp = self.mcp
         self._register_execute_tool(mcp)
         self._register_project_tools(mcp)
         self._register_file_tools(mcp)
+        self._register_bulk_write_tools(mcp)
+        self._register_history_tools(mcp)
+        self._register_diff_tool(mcp)
+        self._register_patch_tools(mcp)
+        self._register_upload_tools(mcp)
+        self._register_fs_tools(mcp)
+        self._register_search_tools(mcp)
+        self._register_listing_tools(mcp)
+        self._register_outline_tools(mcp)
+        self._register_change_tools(mcp)
+        self._register_change_feed(mcp)
+        self._register_wait_tool(mcp)
+        self._register_resources(mcp)
+        self._register_download_route(mcp)
 
     def _register_execute_tool(self, mcp):
         shell_manager = self.shell_manager
@@ -96,7 +173,31 @@ class MCPGrokServer:
         self.project_manager = project_manager
 
     def _register_file_tools(self, mcp):
-        shell_manager = self.shell_manager
+        abs_tool_path = self._abs_tool_path
+
+        class LineEdit(BaseModel):
+            content: str = ""
+            replace_lines_start: Optional[int] = None
+            replace_lines_end: Optional[int] = None
+            insert_at_line: Optional[int] = None
+
+        class ReadCacheStats(BaseModel):
+            files: int
+            versions: int
+            bytes: int
+            max_bytes: int
+            hits: int
+            misses: int
+            hit_rate: float
+            evictions: int
+
+        class ByteChunk(BaseModel):
+            path: str
+            offset: int
+            length: int
+            size: int
+            eof: bool
+            data: str
 
         @mcp.tool(
             title="Read File Anywhere",
@@ -104,18 +205,49 @@ class MCPGrokServer:
         )
         @self._log_tool_call
         def read_file(
-            file_path: str, limit: int = 2000, offset: int = 0
+            file_path: str,
+            limit: int = 2000,
+            offset: int = 0,
+            if_none_match: Optional[str] = None,
+            include_etag: bool = False,
+            pattern: Optional[str] = None,
+            context: int = 0,
         ) -> str:
-            if not os.path.isabs(file_path):
-                cwd = shell_manager.cwd
-                if not cwd:
-                    return (
-                        "Error: No active shell/project for relative path read."
-                    )
-                abs_path = os.path.join(cwd, file_path)
-            else:
-                abs_path = file_path
-            return file_tools_read_file(abs_path, limit, offset)
+            abs_path = abs_tool_path(file_path)
+            if abs_path is None:
+                return "Error: No active shell/project for relative path read."
+            return file_tools_read_file(
+                abs_path, limit, offset, if_none_match, include_etag, pattern, context
+            )
+
+        @mcp.tool(
+            title="Read File Bytes",
+            annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=True),
+        )
+        @self._log_tool_call
+        def read_bytes(file_path: str, offset: int = 0, length: int = 1048576) -> Union[ByteChunk, str]:
+            """
+            Read a byte range (max 4MB) of any file, including binary files, as base64 `data`
+            together with the total file `size` and an `eof` flag. Fetch large files in chunks by
+            advancing `offset`.
+            """
+            abs_path = abs_tool_path(file_path)
+            if abs_path is None:
+                return "Error: No active shell/project for relative path read."
+            result = file_tools_read_bytes(abs_path, offset, length)
+            return result if isinstance(result, str) else ByteChunk(**result)
+
+        @mcp.tool(
+            title="Read Cache Statistics",
+            annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=False),
+        )
+        @self._log_tool_call
+        def read_cache_stats() -> ReadCacheStats:
+            """
+            Statistics of the in-memory cache of decoded files used by read_file: cached files,
+            approximate memory in bytes and its budget, hits, misses, hit rate and evictions.
+            """
+            return ReadCacheStats(**line_cache.stats())
 
         @mcp.tool(
             title="Write File Anywhere",
@@ -130,16 +262,15 @@ class MCPGrokServer:
             replace_lines_end: Optional[int] = None,
             insert_at_line: Optional[int] = None,
             replaceAll: bool = False,
+            expected_hash: Optional[str] = None,
+            atomic: bool = False,
+            durability: str = "none",
+            old_string: Optional[str] = None,
+            occurrence: str = "unique",
         ) -> str:
-            if not os.path.isabs(file_path):
-                cwd = shell_manager.cwd
-                if not cwd:
-                    return (
-                        "Error: No active shell/project for relative path write."
-                    )
-                abs_path = os.path.join(cwd, file_path)
-            else:
-                abs_path = file_path
+            abs_path = abs_tool_path(file_path)
+            if abs_path is None:
+                return "Error: No active shell/project for relative path write."
             return file_tools_write_file(
                 abs_path,
                 content,
@@ -148,10 +279,491 @@ class MCPGrokServer:
                 replace_lines_end,
                 insert_at_line,
                 replaceAll,
+                expected_hash,
+                atomic,
+                durability,
+                old_string,
+                occurrence,
+            )
+
+        @mcp.tool(
+            title="Apply Multiple Line Edits To A File",
+            annotations=ToolAnnotations(readOnlyHint=False, openWorldHint=True),
+        )
+        @self._log_tool_call
+        def edit_file(
+            file_path: str,
+            edits: List[LineEdit],
+            expected_hash: Optional[str] = None,
+            durability: str = "none",
+        ) -> str:
+            """
+            Apply several replace/insert line edits to one file atomically, in one read and one write.
+            All line numbers (0-based, as in write_file) refer to the original file; overlapping edits are rejected.
+            """
+            abs_path = abs_tool_path(file_path)
+            if abs_path is None:
+                return "Error: No active shell/project for relative path edit."
+            return file_tools_edit_file(
+                abs_path,
+                [edit.model_dump() for edit in edits],
+                expected_hash,
+                durability,
+            )
+
+    def _register_bulk_write_tools(self, mcp):
+        abs_tool_path = self._abs_tool_path
+
+        class FileSpec(BaseModel):
+            path: str
+            content: str = ""
+            mode: Optional[str] = None
+
+        @mcp.tool(
+            title="Write Multiple Files",
+            annotations=ToolAnnotations(readOnlyHint=False, openWorldHint=True),
+        )
+        @self._log_tool_call
+        def write_files(
+            files: List[FileSpec],
+            overwrite: bool = True,
+            all_or_nothing: bool = True,
+            durability: str = "none",
+        ) -> str:
+            """
+            Write many files in one call, e.g. to scaffold a project. Each entry has a `path`, its
+            `content` and an optional octal `mode` ("755"). All entries are validated first (10MB
+            total), written in parallel and, with `all_or_nothing`, rolled back together on failure.
+            """
+            specs = []
+            for spec in files:
+                abs_path = abs_tool_path(spec.path)
+                if abs_path is None:
+                    return "Error: No active shell/project for relative path write."
+                specs.append({**spec.model_dump(), "path": abs_path})
+            return bulk_write_files(specs, overwrite, all_or_nothing, durability)
+
+    def _register_history_tools(self, mcp):
+        abs_tool_path = self._abs_tool_path
+        no_project = "Error: No active shell/project for relative path."
+
+        @mcp.tool(title="Undo File Edits", annotations=ToolAnnotations(readOnlyHint=False, openWorldHint=True))
+        @self._log_tool_call
+        def undo_edit(file_path: str, steps: int = 1) -> str:
+            """
+            Revert the last `steps` write_file/edit_file changes to a file from its edit journal
+            (compact reverse deltas, up to 100 edits per file; each step rewrites the whole file).
+            Fails, and drops the history, if the file was changed by other means since.
+            """
+            abs_path = abs_tool_path(file_path)
+            return no_project if abs_path is None else undo_tools_undo_edit(abs_path, steps)
+
+        @mcp.tool(title="Redo File Edits", annotations=ToolAnnotations(readOnlyHint=False, openWorldHint=True))
+        @self._log_tool_call
+        def redo_edit(file_path: str, steps: int = 1) -> str:
+            """Re-apply the last `steps` undone edits to a file; a new edit clears the redo history."""
+            abs_path = abs_tool_path(file_path)
+            return no_project if abs_path is None else undo_tools_redo_edit(abs_path, steps)
+
+    def _register_diff_tool(self, mcp):
+        abs_tool_path = self._abs_tool_path
+
+        @mcp.tool(title="Diff Files", annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=True))
+        @self._log_tool_call
+        def diff(
+            path: str,
+            other_path: Optional[str] = None,
+            base_hash: Optional[str] = None,
+            context: int = 3,
+            max_bytes: int = 65536,
+        ) -> str:
+            """
+            Unified diff of `path` against `other_path`, or against the cached version with ETag `base_hash`,
+            truncated at `max_bytes` (max 1MB). The first line is the current ETag of `path`.
+            """
+            abs_path = abs_tool_path(path)
+            abs_other = abs_tool_path(other_path) if other_path is not None else None
+            if abs_path is None or (other_path is not None and abs_other is None):
+                return "Error: No active shell/project for relative path."
+            return diff_tools_diff(abs_path, abs_other, base_hash, context, max_bytes)
+
+    def _register_patch_tools(self, mcp):
+        abs_tool_path = self._abs_tool_path
+
+        @mcp.tool(
+            title="Apply Unified Diff Patch",
+            annotations=ToolAnnotations(readOnlyHint=False, openWorldHint=True),
+        )
+        @self._log_tool_call
+        def apply_patch(
+            patch: str,
+            base_dir: Optional[str] = None,
+            strip: Optional[int] = None,
+            fuzz: int = 2,
+            dry_run: bool = False,
+            durability: str = "none",
+        ) -> str:
+            """
+            Apply a unified diff to one or many files atomically (all hunks or nothing), tolerating
+            line offsets and up to `fuzz` mismatching context lines. Relative paths resolve against
+            `base_dir` (default: the active project). Returns a per-hunk report.
+            """
+            return patch_tools_apply_patch(
+                patch,
+                abs_tool_path(base_dir or "."),
+                strip,
+                fuzz,
+                dry_run,
+                durability,
+            )
+
+    def _register_upload_tools(self, mcp):
+        abs_tool_path = self._abs_tool_path
+        write_annotations = ToolAnnotations(readOnlyHint=False, openWorldHint=True)
+
+        @mcp.tool(title="Begin Chunked Upload", annotations=write_annotations)
+        @self._log_tool_call
+        def begin_upload(file_path: str, overwrite: bool = True) -> str:
+            """
+            Start a chunked upload for files too large for write_file. Returns an upload id;
+            send data with append_chunk and finish with commit_upload (atomic replace).
+            """
+            abs_path = abs_tool_path(file_path)
+            if abs_path is None:
+                return "Error: No active shell/project for relative path write."
+            return upload_tools_begin_upload(abs_path, overwrite)
+
+        @mcp.tool(title="Append Upload Chunk", annotations=write_annotations)
+        @self._log_tool_call
+        def append_chunk(
+            upload_id: str,
+            data: str,
+            offset: Optional[int] = None,
+            checksum: Optional[str] = None,
+            encoding: str = "base64",
+        ) -> str:
+            """
+            Append a chunk (base64 by default, max 8MB decoded) at `offset` (default: the end) with an
+            optional SHA-256 `checksum`. Resend from the last acknowledged offset to resume an upload.
+            """
+            return upload_tools_append_chunk(upload_id, data, offset, checksum, encoding)
+
+        @mcp.tool(title="Commit Upload", annotations=write_annotations)
+        @self._log_tool_call
+        def commit_upload(
+            upload_id: str,
+            checksum: Optional[str] = None,
+            expected_size: Optional[int] = None,
+            durability: str = "none",
+        ) -> str:
+            """
+            Verify the optional whole-file SHA-256 `checksum` and `expected_size`, then atomically
+            move the uploaded file into place.
+            """
+            return upload_tools_commit_upload(upload_id, checksum, expected_size, durability)
+
+        @mcp.tool(title="Abort Upload", annotations=write_annotations)
+        @self._log_tool_call
+        def abort_upload(upload_id: str) -> str:
+            """Discard an unfinished upload and its temp file."""
+            return upload_tools_abort_upload(upload_id)
+
+    def _register_fs_tools(self, mcp):
+        abs_tool_path = self._abs_tool_path
+        no_project = "Error: No active shell/project for relative path."
+
+        class PathStat(BaseModel):
+            path: str
+            exists: bool
+            type: str
+            size: int
+            mode: str
+            uid: int
+            gid: int
+            mtime_ns: int
+            inode: int
+            nlink: int
+            link_target: Optional[str] = None
+
+        def as_stat(result) -> Union[PathStat, str]:
+            return result if isinstance(result, str) else PathStat(**result)
+
+        @mcp.tool(title="Stat Path", annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=True))
+        @self._log_tool_call
+        def stat_path(path: str) -> Union[PathStat, str]:
+            """Return structured stat data for a file, directory or symlink (symlinks are not followed)."""
+            abs_path = abs_tool_path(path)
+            return no_project if abs_path is None else as_stat(fs_tools_stat_path(abs_path))
+
+        @mcp.tool(title="Copy Path", annotations=ToolAnnotations(readOnlyHint=False, openWorldHint=True))
+        @self._log_tool_call
+        def copy_path(
+            source: str, destination: str, overwrite: bool = False, recursive: bool = False
+        ) -> Union[PathStat, str]:
+            """
+            Copy a file, or a directory tree with `recursive=True`, using reflink/copy_file_range where
+            available; with `overwrite=True` a tree is merged into an existing directory. Returns the
+            destination's stat data.
+            """
+            src, dst = abs_tool_path(source), abs_tool_path(destination)
+            if src is None or dst is None:
+                return no_project
+            return as_stat(fs_tools_copy_path(src, dst, overwrite, recursive))
+
+        @mcp.tool(title="Move Path", annotations=ToolAnnotations(readOnlyHint=False, openWorldHint=True))
+        @self._log_tool_call
+        def move_path(source: str, destination: str, overwrite: bool = False) -> Union[PathStat, str]:
+            """
+            Move or rename a file or directory (atomic rename on the same filesystem); with
+            `overwrite=True` a directory may replace an empty existing one. Returns the destination's
+            stat data.
+            """
+            src, dst = abs_tool_path(source), abs_tool_path(destination)
+            if src is None or dst is None:
+                return no_project
+            return as_stat(fs_tools_move_path(src, dst, overwrite))
+
+        @mcp.tool(
+            title="Delete Path",
+            annotations=ToolAnnotations(readOnlyHint=False, destructiveHint=True, openWorldHint=True),
+        )
+        @self._log_tool_call
+        def delete_path(path: str, recursive: bool = False) -> Union[PathStat, str]:
+            """
+            Delete a file, symlink or directory (non-empty directories need `recursive=True`).
+            Returns the removed entry's stat data.
+            """
+            abs_path = abs_tool_path(path)
+            return no_project if abs_path is None else as_stat(fs_tools_delete_path(abs_path, recursive))
+
+        @mcp.tool(title="Make Directory", annotations=ToolAnnotations(readOnlyHint=False, openWorldHint=True))
+        @self._log_tool_call
+        def make_dir(path: str, parents: bool = True) -> Union[PathStat, str]:
+            """Create a directory (with missing parents by default). Returns its stat data."""
+            abs_path = abs_tool_path(path)
+            return no_project if abs_path is None else as_stat(fs_tools_make_dir(abs_path, parents))
+
+    def _register_search_tools(self, mcp):
+        abs_tool_path = self._abs_tool_path
+
+        @mcp.tool(
+            title="Search File Contents",
+            annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=True),
+        )
+        @self._log_tool_call
+        def search(
+            pattern: str,
+            path: Optional[str] = None,
+            regex: bool = True,
+            ignore_case: bool = False,
+            include: Optional[List[str]] = None,
+            exclude: Optional[List[str]] = None,
+            respect_gitignore: bool = True,
+            max_results: int = 200,
+            context: int = 0,
+        ) -> str:
+            """
+            Search file contents (regex or literal) under `path` (default: the active project),
+            honouring .gitignore and include/exclude globs. Returns grep-style `path:line:text` lines
+            with 0-based line numbers, stopping at `max_results` matches.
+            """
+            root = abs_tool_path(path or ".")
+            if root is None:
+                return "Error: No active shell/project for relative search path."
+            return search_tools_search(
+                root, pattern, regex, ignore_case, include, exclude, respect_gitignore, max_results, context
             )
 
+        self._register_indexed_search_tool(mcp)
+
+    def _register_indexed_search_tool(self, mcp):
+        project_name = self._project_name
+        index_manager = self.index_manager
+
+        @mcp.tool(
+            title="Indexed Project Search",
+            annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=False),
+        )
+        @self._log_tool_call
+        def indexed_search(
+            pattern: str,
+            project: Optional[str] = None,
+            regex: bool = True,
+            ignore_case: bool = False,
+            include: Optional[List[str]] = None,
+            exclude: Optional[List[str]] = None,
+            max_results: int = 200,
+            context: int = 0,
+            refresh: bool = False,
+        ) -> str:
+            """
+            Search a whole project (default: the active one) through its persistent trigram index;
+            output matches the `search` tool. `refresh=True` rescans the whole project first.
+            """
+            name = project_name(project)
+            if name is None:
+                return "Error: No active project and no valid project name given."
+            return index_manager.search(
+                name, pattern, regex, ignore_case, include, exclude, max_results, context, refresh
+            )
+
+    def _register_listing_tools(self, mcp):
+        abs_tool_path = self._abs_tool_path
+        tree_cache = self.tree_cache
+
+        @mcp.tool(
+            title="List Files",
+            annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=True),
+        )
+        @self._log_tool_call
+        def list_files(
+            path: Optional[str] = None,
+            depth: Optional[int] = None,
+            include: Optional[List[str]] = None,
+            exclude: Optional[List[str]] = None,
+            respect_gitignore: bool = True,
+            details: bool = False,
+            max_entries: int = 1000,
+            refresh: bool = False,
+        ) -> str:
+            """
+            List files and directories under `path` (default: the active project), one relative path
+            per line (directories end in `/`), with optional `depth`, include/exclude globs and size/mtime `details`.
+            """
+            root = abs_tool_path(path or ".")
+            if root is None:
+                return "Error: No active shell/project for relative list path."
+            return tree_cache_list_files(
+                tree_cache, root, depth, include, exclude, respect_gitignore, details, max_entries, refresh
+            )
+
+    def _register_outline_tools(self, mcp):
+        abs_tool_path = self._abs_tool_path
+        tree_cache = self.tree_cache
+        outline_cache = self.outline_cache
+
+        @mcp.tool(title="Outline Code", annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=True))
+        @self._log_tool_call
+        def outline(path: Optional[str] = None, respect_gitignore: bool = True) -> str:
+            """
+            List the classes and functions of a source file, or of every supported file under a directory
+            (default: the active project), as `kind name [start:end]` with 0-based line ranges.
+            """
+            root = abs_tool_path(path or ".")
+            if root is None:
+                return "Error: No active shell/project for relative path."
+            return outline_outline(outline_cache, tree_cache, root, respect_gitignore)
+
+        @mcp.tool(title="Find Symbol", annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=True))
+        @self._log_tool_call
+        def find_symbol(
+            name: str,
+            path: Optional[str] = None,
+            regex: bool = False,
+            kind: Optional[str] = None,
+            max_results: int = 200,
+        ) -> str:
+            """
+            Find where a class or function is defined under `path` (default: the active project); `name`
+            matches `name` or `Class.method` exactly or as a regex. Returns `path:start-end kind name` lines.
+            """
+            root = abs_tool_path(path or ".")
+            if root is None:
+                return "Error: No active shell/project for relative path."
+            return outline_find_symbol(outline_cache, tree_cache, root, name, regex, kind, max_results)
+
+    def _register_change_tools(self, mcp):
+        project_name = self._project_name
+        merkle_tracker = self.merkle_tracker
+
+        @mcp.tool(
+            title="Changes Since Token",
+            annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=False),
+        )
+        @self._log_tool_call
+        def changes_since(token: Optional[str] = None, project: Optional[str] = None) -> str:
+            """
+            Fingerprint a project (default: the active one) as a Merkle tree of file hashes and return
+            its token. Pass a token from an earlier call to get only the files added (`A path`),
+            removed (`D path`) and modified (`M path`) since then. Unchanged files are not re-read.
+            """
+            name = project_name(project)
+            if name is None:
+                return "Error: No active project and no valid project name given."
+            return merkle_tracker.changes_since(name, token)
+
+    def _register_change_feed(self, mcp):
+        project_name = self._project_name
+        change_feed = self.change_feed
+        project_manager = self.project_manager
+
+        @mcp.tool(
+            title="Poll File Changes",
+            annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=False),
+        )
+        @self._log_tool_call
+        async def poll_changes(since: int = 0, project: Optional[str] = None, timeout: float = 0.0) -> str:
+            """
+            Return file changes in a project (default: the active one) after cursor `since`, as a `Cursor: N`
+            line plus `created|modified|deleted path` lines. With `timeout` (max 30s) waits for the next change.
+            """
+            name = project_name(project)
+            if name is None:
+                return "Error: No active project and no valid project name given."
+            root = project_manager.project_path(name)
+            if not os.path.isdir(root):
+                return f"Error: Project does not exist: {name}"
+            if not change_feed.available:
+                return f"Error: File change feed unavailable: {change_feed.error}"
+            change_feed.watch(root)
+            cursor, events, dropped = await asyncio.to_thread(change_feed.events_since, since, root, timeout)
+            return format_changes(cursor, events, dropped, root)
+
+    def _register_wait_tool(self, mcp):
+        abs_tool_path = self._abs_tool_path
+        executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WAITS, thread_name_prefix="mcp-grok-wait")
+        slots = threading.BoundedSemaphore(MAX_CONCURRENT_WAITS)
+
+        @mcp.tool(title="Wait For Condition", annotations=ToolAnnotations(readOnlyHint=True, openWorldHint=True))
+        @self._log_tool_call
+        async def wait_for(
+            condition: str,
+            path: Optional[str] = None,
+            pattern: Optional[str] = None,
+            host: str = "127.0.0.1",
+            port: Optional[int] = None,
+            pid: Optional[int] = None,
+            timeout: float = 30.0,
+        ) -> str:
+            """
+            Wait until `condition` holds: `path_exists` (path), `file_contains` (a line of path matches
+            `pattern`), `port_listening` (host, port) or `process_exited` (pid); fails after `timeout` (max 300s).
+            """
+            abs_path = abs_tool_path(path) if path else path
+            if path and abs_path is None:
+                return "Error: No active shell/project for relative path."
+            if not slots.acquire(blocking=False):
+                return f"Error: Too many concurrent wait_for calls (max {MAX_CONCURRENT_WAITS})."
+            try:
+                wait = functools.partial(wait_tools_wait_for, condition, abs_path, pattern, host, port, pid, timeout)
+                return await asyncio.get_running_loop().run_in_executor(executor, wait)
+            finally:
+                slots.release()
+
+    def _register_resources(self, mcp):
+        # FastMCP's own templates only match single path segments, so the project file
+        # template (whose path spans segments) is added to the resource manager directly.
+        template = project_file_template(self.project_manager)
+        mcp._resource_manager._templates[template.uri_template] = template
+
+    def _register_download_route(self, mcp):
+        mcp.custom_route(DOWNLOAD_ROUTE, methods=["GET", "HEAD"], name="download")(
+            make_download_endpoint(self.project_manager)
+        )
+
     def startup(self):
         self.project_manager.ensure_projects_dir()
+        self.change_feed.start()
         default_proj_path = self.project_manager.project_path(
             self.config.default_project
         )
@@ -177,6 +789,8 @@ class MCPGrokServer:
             logging.getLogger(__name__).info(
                 f"Default project activation result: {result}"
             )
+        if self.shell_manager.cwd:
+            self.change_feed.watch(self.shell_manager.cwd)
 
     def run(self):
         self.mcp.settings.port = self.config.port
@@ -0,0 +1,213 @@
+import collections
+import datetime
+import os
+import pathlib
+import threading
+import time
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .ignore_rules import IgnoreRules, is_excluded
+
+MAX_LIST_ENTRIES = 20000
+_MAX_CACHED_DIRS = 50000
+# Directories modified this recently are not cached: a change within the same mtime tick
+# would otherwise go unnoticed (the same rule git uses for its index).
+_RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+class TreeEntry(NamedTuple):
+    name: str
+    is_dir: bool
+    size: int
+    mtime_ns: int
+
+
+class _DirListing(NamedTuple):
+    key: Tuple[int, int]
+    entries: Tuple[TreeEntry, ...]
+
+
+def _scan_dir(dir_path: str) -> Tuple[TreeEntry, ...]:
+    entries = []
+    for entry in os.scandir(dir_path):
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if not is_dir and not entry.is_file(follow_symlinks=False):
+                continue
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        entries.append(TreeEntry(entry.name, is_dir, 0 if is_dir else st.st_size, st.st_mtime_ns))
+    return tuple(sorted(entries))
+
+
+class TreeCache:
+    """
+    LRU cache of directory listings validated by the directory's mtime and inode, plus parsed
+    .gitignore files. Cached file sizes and mtimes may be stale after in-place rewrites.
+    """
+
+    def __init__(self, max_dirs: int = _MAX_CACHED_DIRS):
+        self.max_dirs = max_dirs
+        self._dirs: "collections.OrderedDict[str, _DirListing]" = collections.OrderedDict()
+        self._ignores: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def entries(self, dir_path: str, refresh: bool = False) -> Tuple[TreeEntry, ...]:
+        """Sorted entries of `dir_path`; raises OSError if it cannot be listed."""
+        st = os.stat(dir_path)
+        key = (st.st_mtime_ns, st.st_ino)
+        with self._lock:
+            cached = self._dirs.get(dir_path)
+            if cached is not None and cached.key == key and not refresh:
+                self._dirs.move_to_end(dir_path)
+                self.hits += 1
+                return cached.entries
+            self.misses += 1
+        entries = _scan_dir(dir_path)
+        if time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS:
+            with self._lock:
+                self._dirs[dir_path] = _DirListing(key, entries)
+                self._dirs.move_to_end(dir_path)
+                while len(self._dirs) > self.max_dirs:
+                    self._dirs.popitem(last=False)
+        return entries
+
+    def ignore_rules(self, dir_path: str, rel_dir: str, entries: Sequence[TreeEntry], rules: IgnoreRules) -> IgnoreRules:
+        """Extends `rules` with the directory's .gitignore, if its listing contains one."""
+        if not any(e.name == ".gitignore" and not e.is_dir for e in entries):
+            return rules
+        path = os.path.join(dir_path, ".gitignore")
+        try:
+            st = os.stat(path)
+            key = (st.st_mtime_ns, st.st_size)
+            cached = self._ignores.get(path)
+            if cached is None or cached[0] != key:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    cached = (key, f.readlines())
+                self._ignores[path] = cached
+        except OSError:
+            return rules
+        return rules.with_lines(cached[1], rel_dir)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"dirs": len(self._dirs), "hits": self.hits, "misses": self.misses}
+
+
+def parent_ignore_rules(cache: TreeCache, root: str, rel_path: str) -> IgnoreRules:
+    """The rules that apply to `rel_path`: the .gitignore files of `root` and of every directory above it."""
+    rules = IgnoreRules()
+    if not rel_path:
+        return rules
+    dir_path, rel_dir = root, ""
+    for part in [""] + rel_path.split("/")[:-1]:
+        if part:
+            dir_path, rel_dir = os.path.join(dir_path, part), f"{rel_dir}/{part}" if rel_dir else part
+        rules = cache.ignore_rules(dir_path, rel_dir, cache.entries(dir_path), rules)
+    return rules
+
+
+def iter_tree(
+    cache: TreeCache,
+    root: str,
+    depth: Optional[int] = None,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    respect_gitignore: bool = True,
+    refresh: bool = False,
+    start: str = "",
+) -> Iterator[Tuple[str, TreeEntry]]:
+    """
+    Yields (relative path, entry) in pre-order, pruning ignored directories. `depth=1` lists only
+    direct children; `start` walks just that subtree (paths stay relative to `root`).
+    """
+    base_rules = parent_ignore_rules(cache, root, start) if respect_gitignore else None
+    stack: List[tuple] = [(os.path.join(root, start) if start else root, start, base_rules, 1)]
+    while stack:
+        item = stack.pop()
+        if len(item) == 2:
+            yield item
+            continue
+        dir_path, rel_dir, rules, level = item
+        try:
+            entries = cache.entries(dir_path, refresh)
+        except OSError:
+            continue
+        if rules is not None:
+            rules = cache.ignore_rules(dir_path, rel_dir, entries, rules)
+        children: List[tuple] = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if is_excluded(rel_path, entry.is_dir, rules, include, exclude):
+                continue
+            if not entry.is_dir or not include:
+                children.append((rel_path, entry))
+            if entry.is_dir and (depth is None or level < depth):
+                children.append((os.path.join(dir_path, entry.name), rel_path, rules, level + 1))
+        stack.extend(reversed(children))
+
+
+def _restat(entry: TreeEntry, path: str) -> TreeEntry:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return entry
+    return entry._replace(size=0 if entry.is_dir else st.st_size, mtime_ns=st.st_mtime_ns)
+
+
+def _format_entry(rel_path: str, entry: TreeEntry, details: bool) -> str:
+    name = rel_path + "/" if entry.is_dir else rel_path
+    if not details:
+        return name
+    mtime = datetime.datetime.fromtimestamp(entry.mtime_ns / 1e9, datetime.timezone.utc)
+    size = "-" if entry.is_dir else str(entry.size)
+    return f"{name}\t{size}\t{mtime.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+
+
+def list_files(
+    cache: TreeCache,
+    root: str,
+    depth: Optional[int] = None,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    respect_gitignore: bool = True,
+    details: bool = False,
+    max_entries: int = 1000,
+    refresh: bool = False,
+) -> str:
+    """
+    List the tree under `root`, one relative path per line (directories end with `/`).
+
+    - `depth` limits recursion (1 = direct children only; default unlimited).
+    - `include`/`exclude` are glob lists like in `search`; with `include`, only matching files
+      are listed. `.gitignore` files are honoured unless `respect_gitignore=False`.
+    - `details=True` appends tab-separated size in bytes and UTC mtime to each line, from a
+      fresh stat of each entry.
+    - Listings come from a directory cache validated by directory mtimes; `refresh=True`
+      rescans every directory.
+    """
+    try:
+        abs_root = pathlib.Path(root).expanduser().resolve()
+        if not abs_root.is_dir():
+            return f"Error: Directory does not exist: {abs_root}"
+        if depth is not None and depth < 1:
+            return "Error: depth must be at least 1."
+        max_entries = min(MAX_LIST_ENTRIES, max(1, max_entries))
+        out: List[str] = []
+        files = dirs = 0
+        for rel_path, entry in iter_tree(cache, str(abs_root), depth, include, exclude, respect_gitignore, refresh):
+            if files + dirs >= max_entries:
+                out.append(f"...[stopped at max_entries={max_entries}]...")
+                return "\n".join(out)
+            if details:
+                entry = _restat(entry, os.path.join(abs_root, rel_path))
+            out.append(_format_entry(rel_path, entry, details))
+            dirs += entry.is_dir
+            files += not entry.is_dir
+        out.append(f"[{files} files, {dirs} directories]")
+        return "\n".join(out)
+    except Exception as e:
+        return f"Error: Unexpected error in list_files: {type(e).__name__}: {e}"
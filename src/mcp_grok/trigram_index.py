@@ -0,0 +1,374 @@
+import array
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from re import _constants as sre_constants  # type: ignore[attr-defined]
+from re import _parser as sre_parser  # type: ignore[attr-defined]
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .change_feed import ChangeEvent, ChangeFeed
+from .config import Config
+from .ignore_rules import is_excluded, matches_any, walk_files
+from .search_tools import (
+    MAX_CONTEXT_LINES,
+    MAX_SEARCH_RESULTS,
+    collect_search_output,
+    compile_pattern,
+    ordered_parallel,
+    search_file,
+)
+from .tree_cache import TreeCache, iter_tree, parent_ignore_rules
+
+_MAGIC = b"MGTI"
+_VERSION = 1
+# magic, version, manifest bytes, trigram entries, posting entries, forward entries
+_HEADER = struct.Struct("<4sIQQQQ")
+# trigram key, first posting index, posting count
+_TRIGRAM_ENTRY = struct.Struct("<III")
+# Without a change feed, re-stat the tree at most this often; candidates are always verified against current content.
+_REFRESH_INTERVAL = 2.0
+# With a change feed, still rescan this often in case a directory could not be watched.
+_FULL_RESCAN_INTERVAL = 300.0
+# Up to this many changed files are tracked in memory before the on-disk index is rebuilt.
+_OVERLAY_LIMIT = 256
+_MAX_INDEXED_FILE_BYTES = 50 * 1024 * 1024
+
+# rel path -> (abs path, mtime_ns, size, inode)
+FileStats = Dict[str, Tuple[str, int, int, int]]
+
+
+def file_trigrams(data: bytes) -> array.array:
+    """Sorted, distinct trigram keys of ASCII-lowercased file content (empty for binary files)."""
+    if b"\0" in data[:8192]:
+        return array.array("I")
+    data = data.lower()
+    grams = set(zip(data, data[1:], data[2:]))
+    return array.array("I", sorted((a << 16) | (b << 8) | c for a, b, c in grams))
+
+
+def _literal_runs(parsed) -> List[str]:
+    """Literal strings every match of a parsed regex must contain (top-level concatenation only)."""
+    runs, current = [], []
+    for op, arg in parsed:
+        if op is sre_constants.LITERAL:
+            current.append(chr(arg))
+            continue
+        runs.append("".join(current))
+        current = []
+        if op is sre_constants.SUBPATTERN:
+            runs.extend(_literal_runs(arg[-1]))
+    runs.append("".join(current))
+    return runs
+
+
+def query_trigrams(pattern: str, regex: bool, ignore_case: bool) -> Optional[Set[int]]:
+    """Trigram keys a matching line must contain, or None if the pattern gives no usable constraint."""
+    if regex:
+        try:
+            parsed = sre_parser.parse(pattern)
+        except Exception:
+            return None
+        ignore_case = ignore_case or bool(parsed.state.flags & re.IGNORECASE)
+        literals = _literal_runs(parsed)
+    else:
+        literals = [pattern]
+    keys: Set[int] = set()
+    for literal in literals:
+        if ignore_case and not literal.isascii():
+            continue
+        raw = literal.encode("utf-8").lower()
+        keys.update(int.from_bytes(raw[i:i + 3], "big") for i in range(len(raw) - 2))
+    return keys or None
+
+
+def _read_for_index(abs_path: str) -> array.array:
+    try:
+        if os.path.getsize(abs_path) > _MAX_INDEXED_FILE_BYTES:
+            return array.array("I")
+        with open(abs_path, "rb") as f:
+            return file_trigrams(f.read())
+    except OSError:
+        return array.array("I")
+
+
+class TrigramIndex:
+    """Persistent trigram index of one directory tree (file table, postings, per-file trigrams) in one mmapped file."""
+
+    def __init__(self, root: str, index_path: str, change_feed: Optional[ChangeFeed] = None):
+        self.root = root
+        self.index_path = index_path
+        self.change_feed = change_feed
+        self.lock = threading.Lock()
+        self._mm: Optional[mmap.mmap] = None
+        self._files: List[list] = []
+        self._by_path: Dict[str, int] = {}
+        self._tri_base = self._post_base = self._fwd_base = 0
+        self._n_trigrams = 0
+        self._trigram_keys: Optional[array.array] = None
+        self._overlay: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._last_refresh = 0.0
+        self._stats: Optional[FileStats] = None
+        self._last_scan = 0.0
+        self._cursor = 0
+
+    # ---- on-disk format ----
+
+    def _load(self) -> bool:
+        try:
+            with open(self.index_path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+        try:
+            magic, version, manifest_len, n_tri, n_post, _ = _HEADER.unpack_from(mm, 0)
+            valid = magic == _MAGIC and version == _VERSION
+            manifest = json.loads(bytes(mm[_HEADER.size:_HEADER.size + manifest_len])) if valid else {}
+        except (struct.error, ValueError):
+            manifest = {}
+        if manifest.get("root") != self.root:
+            mm.close()
+            return False
+        self._install(mm, manifest["files"], manifest_len, n_tri, n_post)
+        return True
+
+    def _install(self, mm: mmap.mmap, files: List[list], manifest_len: int, n_tri: int, n_post: int):
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mm
+        self._files = files
+        self._by_path = {entry[0]: idx for idx, entry in enumerate(files)}
+        self._tri_base = _align4(_HEADER.size + manifest_len)
+        self._n_trigrams = n_tri
+        self._post_base = self._tri_base + n_tri * _TRIGRAM_ENTRY.size
+        self._fwd_base = self._post_base + n_post * 4
+        self._trigram_keys = array.array(
+            "I", (_TRIGRAM_ENTRY.unpack_from(mm, self._tri_base + i * _TRIGRAM_ENTRY.size)[0] for i in range(n_tri))
+        )
+
+    def _forward(self, file_id: int) -> array.array:
+        assert self._mm is not None
+        _, _, _, _, offset, count = self._files[file_id]
+        start = self._fwd_base + offset * 4
+        return array.array("I", self._mm[start:start + count * 4])
+
+    def _postings(self, key: int) -> array.array:
+        keys = self._trigram_keys
+        if self._mm is None or keys is None:
+            return array.array("I")
+        idx = bisect.bisect_left(keys, key)
+        if idx >= len(keys) or keys[idx] != key:
+            return array.array("I")
+        _, first, count = _TRIGRAM_ENTRY.unpack_from(self._mm, self._tri_base + idx * _TRIGRAM_ENTRY.size)
+        start = self._post_base + first * 4
+        return array.array("I", self._mm[start:start + count * 4])
+
+    # ---- building ----
+
+    def _scan(self) -> FileStats:
+        stats: FileStats = {}
+        for abs_path, rel_path in walk_files(self.root):
+            _stat_into(stats, abs_path, rel_path)
+        return stats
+
+    def _apply_event(self, stats: FileStats, event: ChangeEvent, cache: TreeCache):
+        """Updates `stats` for one created, modified or deleted path (a file or a whole directory)."""
+        rel_path = os.path.relpath(event.path, self.root).replace(os.sep, "/")
+        if stats.pop(rel_path, None) is None:
+            prefix = rel_path + "/"
+            for stale in [p for p in stats if p.startswith(prefix)]:
+                del stats[stale]
+        if event.kind == "deleted" or not os.path.lexists(event.path):
+            return
+        if os.path.isdir(event.path) and not os.path.islink(event.path):
+            if is_excluded(rel_path, True, parent_ignore_rules(cache, self.root, rel_path)):
+                return
+            for sub_path, entry in iter_tree(cache, self.root, start=rel_path):
+                if not entry.is_dir:
+                    _stat_into(stats, os.path.join(self.root, sub_path), sub_path)
+        elif not is_excluded(rel_path, False, parent_ignore_rules(cache, self.root, rel_path)):
+            _stat_into(stats, event.path, rel_path)
+
+    def _current_stats(self, force: bool) -> Optional[FileStats]:
+        """File stats of the tree, updated from the change feed when possible; None if nothing changed."""
+        feed = self.change_feed
+        if feed is None or not feed.available:
+            return self._scan()
+        feed.watch(self.root)
+        cursor, events, dropped = feed.events_since(self._cursor, self.root)
+        self._cursor = cursor
+        stats = self._stats
+        if (
+            stats is None or force or dropped or time.monotonic() - self._last_scan > _FULL_RESCAN_INTERVAL
+            or any(e.kind == "overflow" or os.path.basename(e.path) == ".gitignore" for e in events)
+        ):
+            stats = self._stats = self._scan()
+            self._last_scan = time.monotonic()
+            return stats
+        if not events:
+            return None
+        for event in events:
+            self._apply_event(stats, event, feed.tree_cache)
+        return stats
+
+    def _is_current(self, rel_path: str, stat_entry) -> bool:
+        file_id = self._by_path.get(rel_path)
+        if file_id is None:
+            return False
+        _, mtime_ns, size, ino, _, _ = self._files[file_id]
+        return (mtime_ns, size, ino) == stat_entry[1:]
+
+    def _forward_lists(self, stats: FileStats, rel_paths: List[str]) -> Iterable[array.array]:
+        def forward_for(rel_path):
+            if self._is_current(rel_path, stats[rel_path]):
+                return self._forward(self._by_path[rel_path])
+            return _read_for_index(stats[rel_path][0])
+
+        return ordered_parallel(forward_for, ((rel_path,) for rel_path in rel_paths))
+
+    def _rebuild(self, stats: FileStats):
+        rel_paths = sorted(stats)
+        files: List[list] = []
+        postings: Dict[int, array.array] = {}
+        forward = array.array("I")
+        for file_id, (rel_path, grams) in enumerate(zip(rel_paths, self._forward_lists(stats, rel_paths))):
+            _, mtime_ns, size, ino = stats[rel_path]
+            files.append([rel_path, mtime_ns, size, ino, len(forward), len(grams)])
+            forward.extend(grams)
+            for key in grams:
+                postings.setdefault(key, array.array("I")).append(file_id)
+        self._write(files, postings, forward)
+        self._overlay, self._deleted = set(), set()
+        if not self._load():
+            raise RuntimeError(f"Index written but could not be loaded: {self.index_path}")
+
+    def _write(self, files: List[list], postings: Dict[int, array.array], forward: array.array):
+        manifest = json.dumps({"root": self.root, "files": files}).encode("utf-8")
+        keys = sorted(postings)
+        n_post = sum(len(postings[k]) for k in keys)
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(manifest), len(keys), n_post, len(forward)))
+            f.write(manifest)
+            f.write(b"\0" * (_align4(_HEADER.size + len(manifest)) - _HEADER.size - len(manifest)))
+            first = 0
+            for key in keys:
+                f.write(_TRIGRAM_ENTRY.pack(key, first, len(postings[key])))
+                first += len(postings[key])
+            for key in keys:
+                postings[key].tofile(f)
+            forward.tofile(f)
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self, force: bool = False):
+        """Brings the index up to date: small change sets become an overlay, larger ones a rebuild."""
+        watched = self.change_feed is not None and self.change_feed.available
+        if not force and not watched and time.monotonic() - self._last_refresh < _REFRESH_INTERVAL:
+            return
+        if self._mm is None:
+            self._load()
+        stats = self._current_stats(force)
+        if stats is None:
+            return
+        changed = {rel for rel, entry in stats.items() if not self._is_current(rel, entry)}
+        deleted = set(self._by_path) - set(stats)
+        if self._mm is None or len(changed) + len(deleted) > _OVERLAY_LIMIT:
+            self._rebuild(stats)
+        else:
+            self._overlay, self._deleted = changed, deleted
+        self._last_refresh = time.monotonic()
+
+    # ---- querying ----
+
+    def candidates(self, keys: Optional[Set[int]]) -> List[str]:
+        """Relative paths of files that may contain all `keys` (every file if keys is None)."""
+        if keys is None:
+            ids: Iterable[int] = range(len(self._files))
+        else:
+            lists = sorted((self._postings(k) for k in keys), key=len)
+            found = set(lists[0]) if lists else set()
+            for other in lists[1:]:
+                if not found:
+                    break
+                found.intersection_update(other)
+            ids = found
+        stale = self._overlay | self._deleted
+        paths = {self._files[i][0] for i in ids} - stale
+        return sorted(paths | self._overlay)
+
+    @property
+    def file_count(self) -> int:
+        return len(self._files)
+
+
+def _align4(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def _stat_into(stats: FileStats, abs_path: str, rel_path: str):
+    try:
+        st = os.stat(abs_path)
+    except OSError:
+        return
+    stats[rel_path] = (abs_path, st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class TrigramIndexManager:
+    """Keeps one TrigramIndex per project, stored under `<projects_dir>/.mcp-grok-index/`."""
+
+    def __init__(self, config: Config, change_feed: Optional[ChangeFeed] = None):
+        self.config = config
+        self.change_feed = change_feed
+        self._indexes: Dict[str, TrigramIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, project: str) -> TrigramIndex:
+        root = os.path.realpath(os.path.join(self.config.projects_dir, project))
+        index_path = os.path.join(self.config.index_dir, f"{project}.trigrams")
+        with self._lock:
+            index = self._indexes.get(project)
+            if index is None or index.root != root or index.index_path != index_path:
+                index = TrigramIndex(root, index_path, self.change_feed)
+                self._indexes[project] = index
+            return index
+
+    def search(
+        self,
+        project: str,
+        pattern: str,
+        regex: bool = True,
+        ignore_case: bool = False,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        max_results: int = 200,
+        context: int = 0,
+        refresh: bool = False,
+    ) -> str:
+        """Search a project, reading only files that contain the pattern's literal trigrams."""
+        try:
+            if not os.path.isdir(os.path.join(self.config.projects_dir, project)):
+                return f"Error: Project does not exist: {project}"
+            if not pattern:
+                return "Error: Pattern cannot be empty."
+            try:
+                matcher = compile_pattern(pattern, regex, ignore_case)
+            except re.error as e:
+                return f"Error: Invalid regex: {e}"
+            max_results = min(MAX_SEARCH_RESULTS, max(1, max_results))
+            context = min(MAX_CONTEXT_LINES, max(0, context))
+            index = self.get(project)
+            with index.lock:
+                index.refresh(force=refresh)
+                paths = index.candidates(query_trigrams(pattern, regex, ignore_case))
+            paths = [p for p in paths if (not include or matches_any(include, p)) and not matches_any(exclude, p)]
+            jobs = ((os.path.join(index.root, p), p, matcher, context, max_results) for p in paths)
+            hits = (h for h in ordered_parallel(search_file, jobs) if h is not None)
+            return collect_search_output(hits, max_results, context)
+        except Exception as e:
+            return f"Error: Unexpected error in indexed search: {type(e).__name__}: {e}"
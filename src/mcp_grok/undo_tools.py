@@ -0,0 +1,109 @@
+import contextlib
+import io
+import os
+import pathlib
+import shutil
+from typing import BinaryIO, List, Tuple
+
+from .edit_journal import Revision, Splice, edit_journal, fingerprint
+from .file_tools import _COPY_CHUNK, _commit_temp, _path_lock, _stage_temp_with
+from .line_cache import line_cache
+
+
+class _StaleRevision(Exception):
+    pass
+
+
+def _copy_exact(src: BinaryIO, dst: BinaryIO, count: int):
+    while count > 0:
+        chunk = src.read(min(_COPY_CHUNK, count))
+        if not chunk:
+            raise _StaleRevision()
+        dst.write(chunk)
+        count -= len(chunk)
+
+
+def _apply_splices(src: BinaryIO, dst: BinaryIO, splices: Tuple[Splice, ...]) -> Tuple[Splice, ...]:
+    """
+    Copies `src` to `dst` with every splice's `inserted` bytes replaced by its `removed` bytes,
+    checking that `inserted` is really there. Returns the inverse splices (offsets in `dst`).
+    """
+    pos = 0
+    inverse: List[Splice] = []
+    for splice in splices:
+        _copy_exact(src, dst, splice.offset - pos)
+        if src.read(len(splice.inserted)) != splice.inserted:
+            raise _StaleRevision()
+        inverse.append(Splice(dst.tell(), splice.inserted, splice.removed))
+        dst.write(splice.removed)
+        pos = splice.offset + len(splice.inserted)
+    shutil.copyfileobj(src, dst, _COPY_CHUNK)
+    return tuple(inverse)
+
+
+def _apply_revision(abs_fp: pathlib.Path, revision: Revision) -> Revision:
+    """Applies `revision` to the file (streaming, via temp file + rename) and returns its inverse."""
+    existed = revision.source_exists
+    with contextlib.ExitStack() as stack:
+        src = stack.enter_context(open(abs_fp, "rb")) if existed else io.BytesIO(b"")
+        if not revision.target_exists:
+            rest = io.BytesIO()
+            inverse = _apply_splices(src, rest, revision.splices)
+            if rest.tell():
+                raise _StaleRevision()
+            os.unlink(abs_fp)
+            line_cache.invalidate(abs_fp)
+            return Revision(inverse, False, existed)
+        abs_fp.parent.mkdir(parents=True, exist_ok=True)
+        result: List[Tuple[Splice, ...]] = []
+        tmp_path = _stage_temp_with(abs_fp, lambda dst: result.append(_apply_splices(src, dst, revision.splices)))
+    _commit_temp(tmp_path, abs_fp)
+    return Revision(result[0], True, existed)
+
+
+def _step(file_path: str, steps: int, redo: bool) -> str:
+    action = "redo" if redo else "undo"
+    abs_fp = pathlib.Path(file_path).expanduser().resolve()
+    if steps < 1:
+        return "Error: steps must be >= 1."
+    done = 0
+    with _path_lock(abs_fp):
+        for _ in range(steps):
+            revision, state = edit_journal.peek(abs_fp, redo)
+            if revision is None:
+                break
+            try:
+                if fingerprint(abs_fp) != state:
+                    raise _StaleRevision()
+                inverse = _apply_revision(abs_fp, revision)
+            except _StaleRevision:
+                edit_journal.discard(abs_fp)
+                return (
+                    f"Error: {abs_fp} was changed outside write_file/edit_file after {done} {action} step(s); "
+                    f"its edit history was discarded."
+                )
+            edit_journal.replace_top(abs_fp, revision, inverse, fingerprint(abs_fp), redo)
+            done += 1
+    if not done:
+        return f"Error: Nothing to {action} for {abs_fp}"
+    undo_depth, redo_depth = edit_journal.depth(abs_fp)
+    return f"Success: {'Redid' if redo else 'Undid'} {done} edit(s) in {abs_fp} ({undo_depth} undo, {redo_depth} redo left)"
+
+
+def undo_edit(file_path: str, steps: int = 1) -> str:
+    """
+    Revert the last `steps` write_file/edit_file edits to `file_path` from its journal of reverse
+    deltas. Each step rewrites the whole file (O(file size)); undoing a creation deletes the file.
+    """
+    try:
+        return _step(file_path, steps, redo=False)
+    except Exception as e:
+        return f"Error: Unexpected error in undo_edit: {type(e).__name__}: {e}"
+
+
+def redo_edit(file_path: str, steps: int = 1) -> str:
+    """Re-apply the last `steps` undone edits; any new edit to the file clears the redo history."""
+    try:
+        return _step(file_path, steps, redo=True)
+    except Exception as e:
+        return f"Error: Unexpected error in redo_edit: {type(e).__name__}: {e}"
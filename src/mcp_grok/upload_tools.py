@@ -0,0 +1,214 @@
+import base64
+import binascii
+import hashlib
+import os
+import pathlib
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from .file_tools import (
+    _commit_temp,
+    _copy_file_attributes,
+    _discard_temp,
+    _path_lock,
+    _validate_durability,
+    _validate_write_target,
+)
+
+MAX_CHUNK_BYTES = 8 * 1024 * 1024
+CHUNK_ENCODINGS = ("base64", "utf-8")
+# Uploads without activity for this long are aborted and their temp files removed.
+UPLOAD_IDLE_TIMEOUT = 60 * 60
+_HASH_CHUNK = 1024 * 1024
+
+
+@dataclass
+class UploadSession:
+    upload_id: str
+    target: pathlib.Path
+    tmp_path: str
+    overwrite: bool
+    size: int = 0
+    last_active: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_sessions: Dict[str, UploadSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def _expire_idle_sessions():
+    now = time.monotonic()
+    with _sessions_lock:
+        expired = [s for s in _sessions.values() if now - s.last_active > UPLOAD_IDLE_TIMEOUT]
+        for session in expired:
+            del _sessions[session.upload_id]
+    for session in expired:
+        _discard_temp(session.tmp_path)
+
+
+def _get_session(upload_id: str) -> Optional[UploadSession]:
+    with _sessions_lock:
+        return _sessions.get(upload_id)
+
+
+def _decode_chunk(data: str, encoding: str) -> Tuple[Optional[bytes], Optional[str]]:
+    if encoding not in CHUNK_ENCODINGS:
+        return None, f"Error: Invalid encoding {encoding!r}; expected one of {', '.join(CHUNK_ENCODINGS)}."
+    try:
+        chunk = base64.b64decode(data, validate=True) if encoding == "base64" else data.encode("utf-8")
+    except (binascii.Error, ValueError) as e:
+        return None, f"Error: Invalid base64 chunk: {e}"
+    if len(chunk) > MAX_CHUNK_BYTES:
+        return None, f"Error: Chunk too large (>{MAX_CHUNK_BYTES} bytes)."
+    return chunk, None
+
+
+def _sha256_of_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def begin_upload(file_path: str, overwrite: bool = True) -> str:
+    """
+    Start a chunked upload to `file_path`, streamed into a temp file that replaces the target
+    atomically on commit_upload. Returns the upload id.
+    """
+    try:
+        _expire_idle_sessions()
+        abs_fp = pathlib.Path(file_path).expanduser().resolve()
+        target_err = _validate_write_target(abs_fp)
+        if target_err:
+            return target_err
+        if abs_fp.exists() and not overwrite:
+            return f"Error: File already exists and overwrite=False: {abs_fp}"
+        abs_fp.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{abs_fp.name}.", suffix=".upload", dir=abs_fp.parent)
+        os.close(fd)
+        session = UploadSession(uuid.uuid4().hex, abs_fp, tmp_path, overwrite)
+        with _sessions_lock:
+            _sessions[session.upload_id] = session
+        return f"Success: Upload {session.upload_id} started for {abs_fp}. Next offset: 0"
+    except Exception as e:
+        return f"Error: Unexpected error in begin_upload: {type(e).__name__}: {e}"
+
+
+def _write_chunk(session: UploadSession, chunk: bytes, offset: int) -> str:
+    if offset < 0:
+        return f"Error: Offset must be >= 0. Next offset: {session.size}"
+    if offset > session.size:
+        return f"Error: Offset {offset} is past the received data. Next offset: {session.size}"
+    with open(session.tmp_path, "r+b") as f:
+        f.seek(offset)
+        f.write(chunk)
+        if offset + len(chunk) < session.size:
+            f.truncate()
+    session.size = offset + len(chunk)
+    session.last_active = time.monotonic()
+    return f"Success: Received {len(chunk)} bytes. Next offset: {session.size}"
+
+
+def append_chunk(
+    upload_id: str,
+    data: str,
+    offset: Optional[int] = None,
+    checksum: Optional[str] = None,
+    encoding: str = "base64",
+) -> str:
+    """
+    Append one chunk (base64, or `encoding="utf-8"` text; at most 8MB) at `offset` (default: the end);
+    resending from an earlier offset replaces what follows. `checksum` is the chunk's SHA-256 hex.
+    """
+    try:
+        session = _get_session(upload_id)
+        if session is None:
+            return f"Error: Unknown or expired upload: {upload_id}"
+        chunk, decode_err = _decode_chunk(data, encoding)
+        if decode_err or chunk is None:
+            return decode_err or "Error: Empty chunk."
+        if checksum is not None and hashlib.sha256(chunk).hexdigest() != checksum.strip().lower():
+            return f"Error: Chunk checksum mismatch. Next offset: {session.size}"
+        with session.lock:
+            return _write_chunk(session, chunk, session.size if offset is None else offset)
+    except Exception as e:
+        return f"Error: Unexpected error in append_chunk: {type(e).__name__}: {e}"
+
+
+def _drop_session(session: UploadSession):
+    with _sessions_lock:
+        _sessions.pop(session.upload_id, None)
+    _discard_temp(session.tmp_path)
+
+
+def _finish_upload(
+    session: UploadSession, checksum: Optional[str], expected_size: Optional[int], durability: str
+) -> Tuple[Optional[str], str]:
+    """Verifies and commits the temp file; returns (error, sha256 of the data)."""
+    if expected_size is not None and expected_size != session.size:
+        return f"Error: Size mismatch: received {session.size} bytes, expected {expected_size}.", ""
+    digest = _sha256_of_file(session.tmp_path)
+    if checksum is not None and digest != checksum.strip().lower():
+        return f"Error: Checksum mismatch: uploaded data has sha256 {digest}.", digest
+    target_err = _validate_write_target(session.target)
+    if target_err:
+        return target_err, digest
+    if durability != "none":
+        with open(session.tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+    _copy_file_attributes(session.target, session.tmp_path)
+    with _path_lock(session.target):
+        if not session.overwrite and session.target.exists():
+            return f"Error: File already exists and overwrite=False: {session.target}", digest
+        _commit_temp(session.tmp_path, session.target, durability, exclusive=not session.overwrite)
+    return None, digest
+
+
+def commit_upload(
+    upload_id: str,
+    checksum: Optional[str] = None,
+    expected_size: Optional[int] = None,
+    durability: str = "none",
+) -> str:
+    """
+    Atomically move the uploaded data into place after checking `checksum` (SHA-256 hex) and
+    `expected_size`; on a mismatch the upload stays open. `durability` works as in write_file.
+    """
+    try:
+        durability_err = _validate_durability(durability)
+        if durability_err:
+            return durability_err
+        session = _get_session(upload_id)
+        if session is None:
+            return f"Error: Unknown or expired upload: {upload_id}"
+        with session.lock:
+            try:
+                error, digest = _finish_upload(session, checksum, expected_size, durability)
+            except Exception as e:
+                # The temp file may already be gone (_commit_temp removes it on failure).
+                _drop_session(session)
+                return f"Error: Commit failed and upload {upload_id} was discarded: {type(e).__name__}: {e}"
+            if error:
+                return error
+            with _sessions_lock:
+                _sessions.pop(upload_id, None)
+        return f"Success: Committed {session.size} bytes to {session.target} (sha256 {digest})"
+    except Exception as e:
+        return f"Error: Unexpected error in commit_upload: {type(e).__name__}: {e}"
+
+
+def abort_upload(upload_id: str) -> str:
+    """Discard an upload and its temp file."""
+    with _sessions_lock:
+        session = _sessions.pop(upload_id, None)
+    if session is None:
+        return f"Error: Unknown or expired upload: {upload_id}"
+    with session.lock:
+        _discard_temp(session.tmp_path)
+    return f"Success: Upload {upload_id} aborted."
@@ -0,0 +1,287 @@
+import os
+import re
+import select
+import socket
+import time
+from typing import Optional, Union
+
+from .change_feed import (
+    IN_CLOSE_WRITE,
+    IN_CREATE,
+    IN_DELETE,
+    IN_DELETE_SELF,
+    IN_IGNORED,
+    IN_MODIFY,
+    IN_MOVE_SELF,
+    IN_MOVED_FROM,
+    IN_MOVED_TO,
+    _Inotify,
+)
+
+CONDITIONS = ("path_exists", "file_contains", "port_listening", "process_exited")
+DEFAULT_WAIT_TIMEOUT = 30.0
+MAX_WAIT_TIMEOUT = 300.0
+# Waits block a thread each; the server runs them on a pool of this size, apart from other tools.
+MAX_CONCURRENT_WAITS = 16
+# Pause between connection attempts: nothing signals that a port started listening.
+_PORT_RETRY_SECONDS = 0.05
+_PORT_CONNECT_TIMEOUT = 1.0
+# Polling interval used when inotify or pidfd is unavailable.
+_FALLBACK_POLL_SECONDS = 0.25
+_READ_CHUNK = 64 * 1024
+_MAX_LINE_BYTES = 1024 * 1024
+_MAX_REPORTED_LINE = 200
+
+_DIR_WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+
+def _nearest_dir(path: str) -> str:
+    while not os.path.isdir(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return path
+
+
+class _PathWatch:
+    """
+    Base for path conditions: wakes up on inotify events in the directory that holds `path`, or
+    in its nearest existing ancestor until that directory is created.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._inotify: Optional[_Inotify] = None
+        self._wd: Optional[int] = None
+        self._dir: Optional[str] = None
+        try:
+            self._inotify = _Inotify()
+        except (OSError, AttributeError):
+            pass
+        self._arm()
+
+    def _arm(self):
+        if self._inotify is None:
+            return
+        dir_path = _nearest_dir(os.path.dirname(self.path))
+        if dir_path == self._dir:
+            return
+        if self._wd is not None:
+            self._inotify.rm_watch(self._wd)
+        try:
+            self._wd, self._dir = self._inotify.add_watch(dir_path, _DIR_WATCH_MASK), dir_path
+        except OSError:
+            self._wd = self._dir = None
+
+    def _drop_dead_watch(self, events):
+        """Forgets the watch once its directory is deleted or moved, so _arm() watches whatever is at the path now."""
+        masks = [mask for wd, mask, _ in events if wd == self._wd]
+        if not any(mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF) for mask in masks):
+            return
+        if self._inotify is not None and self._wd is not None and not any(mask & IN_IGNORED for mask in masks):
+            self._inotify.rm_watch(self._wd)
+        self._wd = self._dir = None
+
+    def wait(self, timeout: float):
+        if self._inotify is None or self._wd is None:
+            time.sleep(min(timeout, _FALLBACK_POLL_SECONDS))
+        elif select.select([self._inotify.fd], [], [], timeout)[0]:
+            self._drop_dead_watch(self._inotify.read_events())
+        # Re-arm before the next check so nothing between the check and the wait is missed.
+        self._arm()
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+class _PathExists(_PathWatch):
+    def describe(self) -> str:
+        return f"{self.path} to exist"
+
+    def check(self) -> Optional[str]:
+        return f"{self.path} exists" if os.path.exists(self.path) else None
+
+
+class _FileContains(_PathWatch):
+    """Scans the file once, then only what was appended; a replaced or truncated file is rescanned."""
+
+    def __init__(self, path: str, regex: "re.Pattern[str]"):
+        super().__init__(path)
+        self.regex = regex
+        self._identity = None
+        self._offset = 0
+        self._lineno = 0
+        self._partial = b""
+
+    def describe(self) -> str:
+        return f"{self.path} to contain /{self.regex.pattern}/"
+
+    def _match(self, line: bytes) -> Optional[str]:
+        text = line.rstrip(b"\r").decode("utf-8", errors="replace")
+        if not self.regex.search(text):
+            return None
+        return f"{self.path} line {self._lineno} matches: {text[:_MAX_REPORTED_LINE]}"
+
+    def _scan(self, f) -> Optional[str]:
+        f.seek(self._offset)
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                break
+            self._offset += len(chunk)
+            *lines, self._partial = (self._partial + chunk).split(b"\n")
+            for line in lines:
+                found = self._match(line)
+                if found:
+                    return found
+                self._lineno += 1
+            self._partial = self._partial[-_MAX_LINE_BYTES:]
+        # An unterminated last line counts too (e.g. a prompt that has no newline yet).
+        return self._match(self._partial) if self._partial else None
+
+    def check(self) -> Optional[str]:
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return None
+        with f:
+            st = os.fstat(f.fileno())
+            identity = (st.st_dev, st.st_ino)
+            if identity != self._identity or st.st_size < self._offset:
+                self._identity, self._offset, self._lineno, self._partial = identity, 0, 0, b""
+            return self._scan(f)
+
+
+class _PortListening:
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+
+    def describe(self) -> str:
+        return f"{self.host}:{self.port} to accept connections"
+
+    def check(self) -> Optional[str]:
+        try:
+            with socket.create_connection((self.host, self.port), timeout=_PORT_CONNECT_TIMEOUT):
+                return f"{self.host}:{self.port} is accepting connections"
+        except OSError:
+            return None
+
+    def wait(self, timeout: float):
+        time.sleep(min(timeout, _PORT_RETRY_SECONDS))
+
+    def close(self):
+        pass
+
+
+class _ProcessExited:
+    """Waits on a pidfd (Linux 5.3+); elsewhere polls with signal 0."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self._fd: Optional[int] = None
+        self._gone = False
+        try:
+            self._fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            self._gone = True
+        except (AttributeError, OSError):
+            pass
+
+    def describe(self) -> str:
+        return f"process {self.pid} to exit"
+
+    def _exited(self) -> bool:
+        if self._fd is not None:
+            return bool(select.select([self._fd], [], [], 0)[0])
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    def check(self) -> Optional[str]:
+        return f"process {self.pid} exited" if self._gone or self._exited() else None
+
+    def wait(self, timeout: float):
+        if self._fd is not None:
+            select.select([self._fd], [], [], timeout)
+        else:
+            time.sleep(min(timeout, _FALLBACK_POLL_SECONDS))
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+_Condition = Union[_PathExists, _FileContains, _PortListening, _ProcessExited]
+
+
+def _path_condition(condition: str, path: Optional[str], pattern: Optional[str]) -> Union[_Condition, str]:
+    if not path:
+        return f"Error: path is required for {condition}."
+    if condition == "path_exists":
+        return _PathExists(path)
+    if not pattern:
+        return "Error: pattern is required for file_contains."
+    try:
+        regex = re.compile(pattern)
+    except re.error as e:
+        return f"Error: Invalid regex: {e}"
+    return _FileContains(path, regex)
+
+
+def _make_condition(
+    condition: str, path: Optional[str], pattern: Optional[str], host: str, port: Optional[int], pid: Optional[int]
+) -> Union[_Condition, str]:
+    """Returns the condition to wait for, or an error string for missing/invalid arguments."""
+    if condition not in CONDITIONS:
+        return f"Error: Unknown condition {condition!r}; expected one of: {', '.join(CONDITIONS)}."
+    if condition in ("path_exists", "file_contains"):
+        return _path_condition(condition, path, pattern)
+    if condition == "port_listening":
+        if port is None or not 0 < port < 65536:
+            return "Error: port must be between 1 and 65535."
+        return _PortListening(host, port)
+    if pid is None or pid <= 0:
+        return "Error: pid must be a positive integer."
+    return _ProcessExited(pid)
+
+
+def wait_for(
+    condition: str,
+    path: Optional[str] = None,
+    pattern: Optional[str] = None,
+    host: str = "127.0.0.1",
+    port: Optional[int] = None,
+    pid: Optional[int] = None,
+    timeout: float = DEFAULT_WAIT_TIMEOUT,
+) -> str:
+    """
+    Block until `condition` holds or `timeout` seconds (max 300) pass: `path_exists`, `file_contains`
+    (0-based line numbers), `port_listening` or `process_exited`.
+    """
+    try:
+        cond = _make_condition(condition, path, pattern, host, port, pid)
+        if isinstance(cond, str):
+            return cond
+        timeout = min(MAX_WAIT_TIMEOUT, max(0.0, timeout))
+        start = time.monotonic()
+        try:
+            while True:
+                met = cond.check()
+                if met is not None:
+                    return f"Success: {met} (after {time.monotonic() - start:.2f}s)"
+                remaining = start + timeout - time.monotonic()
+                if remaining <= 0:
+                    return f"Error: Timed out after {timeout:g}s waiting for {cond.describe()}"
+                cond.wait(remaining)
+        finally:
+            cond.close()
+    except Exception as e:
+        return f"Error: Unexpected error in wait_for: {type(e).__name__}: {e}"
@@ -0,0 +1,110 @@
+from pathlib import Path
+from tests.test_utils import api_call_tool
+
+NUMBERED = "".join(f"line{i}\n" for i in range(1, 21))
+
+
+def _apply(server_url, patch, base_dir, **extra_args):
+    return api_call_tool(server_url, "apply_patch", patch=patch, base_dir=str(base_dir), **extra_args)
+
+
+def test_apply_patch_multi_hunk_with_offset(tmp_path, mcp_server):
+    target = tmp_path / "numbers.txt"
+    target.write_text("inserted above\n" + NUMBERED)
+    patch = (
+        "--- a/numbers.txt\n"
+        "+++ b/numbers.txt\n"
+        "@@ -2,3 +2,3 @@\n"
+        " line2\n"
+        "-line3\n"
+        "+LINE3\n"
+        " line4\n"
+        "@@ -17,3 +17,4 @@\n"
+        " line17\n"
+        " line18\n"
+        "+line18.5\n"
+        " line19\n"
+    )
+    out = _apply(mcp_server["url"], patch, tmp_path)
+    assert out.startswith("Success: Patched 1 file(s)"), out
+    assert "hunk 1 applied at line 3 (offset +1 lines)" in out
+    assert "hunk 2 applied" in out
+    lines = target.read_text().splitlines()
+    assert lines[3] == "LINE3"
+    assert lines[19] == "line18.5"
+
+
+def test_apply_patch_with_fuzz(tmp_path, mcp_server):
+    target = tmp_path / "fuzzy.txt"
+    target.write_text(NUMBERED.replace("line5\n", "line five\n"))
+    patch = (
+        "--- a/fuzzy.txt\n"
+        "+++ b/fuzzy.txt\n"
+        "@@ -5,3 +5,3 @@\n"
+        " line5\n"
+        "-line6\n"
+        "+LINE6\n"
+        " line7\n"
+    )
+    assert "FAILED" in _apply(mcp_server["url"], patch, tmp_path, fuzz=0)
+    out = _apply(mcp_server["url"], patch, tmp_path, fuzz=1)
+    assert "fuzz 1" in out, out
+    assert "LINE6\n" in target.read_text()
+
+
+def test_apply_patch_all_or_nothing(tmp_path, mcp_server):
+    good = tmp_path / "good.txt"
+    bad = tmp_path / "bad.txt"
+    good.write_text("a\nb\nc\n")
+    bad.write_text("x\ny\nz\n")
+    patch = (
+        "--- a/good.txt\n+++ b/good.txt\n@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n"
+        "--- a/bad.txt\n+++ b/bad.txt\n@@ -1,3 +1,3 @@\n nope\n-nothing\n+matches\n here\n"
+    )
+    out = _apply(mcp_server["url"], patch, tmp_path)
+    assert out.startswith("Error: Patch not applied")
+    assert "good.txt: hunk 1 applied" in out
+    assert "bad.txt: hunk 1 FAILED" in out
+    assert good.read_text() == "a\nb\nc\n"
+    assert bad.read_text() == "x\ny\nz\n"
+
+
+def test_apply_patch_create_delete_and_dry_run(tmp_path, mcp_server):
+    doomed = tmp_path / "doomed.txt"
+    doomed.write_text("bye\n")
+    patch = (
+        "--- /dev/null\n+++ b/sub/created.txt\n@@ -0,0 +1,2 @@\n+hello\n+world\n"
+        "--- a/doomed.txt\n+++ /dev/null\n@@ -1 +0,0 @@\n-bye\n"
+    )
+    out = _apply(mcp_server["url"], patch, tmp_path, dry_run=True)
+    assert "dry run" in out
+    assert doomed.exists() and not (tmp_path / "sub").exists()
+    out = _apply(mcp_server["url"], patch, tmp_path)
+    assert out.startswith("Success: Patched 2 file(s)")
+    assert Path(tmp_path / "sub" / "created.txt").read_text() == "hello\nworld\n"
+    assert not doomed.exists()
+
+    (tmp_path / "blocker").write_text("a file, not a directory\n")
+    patch = (
+        "--- /dev/null\n+++ b/new/deep/x.txt\n@@ -0,0 +1 @@\n+x\n"
+        "--- /dev/null\n+++ b/blocker/y.txt\n@@ -0,0 +1 @@\n+y\n"
+    )
+    out = _apply(mcp_server["url"], patch, tmp_path)
+    assert out.startswith("Error: "), out
+    assert not (tmp_path / "new").exists()
+
+
+def test_apply_patch_form_feed_and_duplicate_sections(tmp_path, mcp_server):
+    target = tmp_path / "ff.txt"
+    target.write_text("a\x0cb\nend\n")
+    patch = "--- a/ff.txt\n+++ b/ff.txt\n@@ -1,2 +1,2 @@\n-a\x0cb\n+a\x0cc\n end\n"
+    out = _apply(mcp_server["url"], patch, tmp_path)
+    assert out.startswith("Success: Patched 1 file(s)"), out
+    assert target.read_text() == "a\x0cc\nend\n"
+    twice = (
+        "--- a/ff.txt\n+++ b/ff.txt\n@@ -1 +1 @@\n-a\x0cc\n+first\n"
+        "--- a/ff.txt\n+++ b/ff.txt\n@@ -2 +2 @@\n-end\n+second\n"
+    )
+    out = _apply(mcp_server["url"], twice, tmp_path)
+    assert out.startswith("Error: ") and "ff.txt is patched by more than one file section" in out, out
+    assert target.read_text() == "a\x0cc\nend\n"
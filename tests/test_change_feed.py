@@ -0,0 +1,82 @@
+import os
+import uuid
+
+from mcp_grok.change_feed import ChangeFeed
+from mcp_grok.tree_cache import TreeCache
+from tests.test_utils import api_call_tool
+
+
+def _wait_for_events(feed, since, root, predicate):
+    for _ in range(20):
+        _, events, _ = feed.events_since(since, root, timeout=0.5)
+        if predicate(events):
+            return events
+    raise AssertionError("expected change events did not arrive")
+
+
+def test_change_feed_coalesces_events(tmp_path):
+    (tmp_path / "sub").mkdir()
+    feed = ChangeFeed(TreeCache())
+    assert feed.start(), feed.error
+    try:
+        feed.watch(str(tmp_path))
+        path = tmp_path / "sub" / "a.txt"
+        for i in range(5):
+            path.write_text(f"v{i}\n")
+        (tmp_path / "tmp.txt").write_text("x")
+        (tmp_path / "tmp.txt").unlink()
+        events = _wait_for_events(feed, 0, str(tmp_path), lambda evs: evs)
+        kinds = [(e.kind, os.path.relpath(e.path, tmp_path)) for e in events]
+        assert kinds == [("created", "sub/a.txt")]
+        cursor = events[-1].seq
+        (tmp_path / "newdir").mkdir()
+        events = _wait_for_events(feed, cursor, str(tmp_path), lambda evs: evs)
+        (tmp_path / "newdir" / "b.txt").write_text("b")
+        events = _wait_for_events(
+            feed, events[-1].seq, str(tmp_path), lambda evs: any(e.path.endswith("newdir/b.txt") for e in evs)
+        )
+    finally:
+        feed.stop()
+
+
+def test_change_feed_skips_ignored_new_directories(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / ".gitignore").write_text("build/\n")
+    (tmp_path / "sub" / ".gitignore").write_text("node_modules/\n")
+    feed = ChangeFeed(TreeCache())
+    assert feed.start(), feed.error
+    try:
+        feed.watch(str(tmp_path))
+        for rel in ("build/out", "sub/node_modules/pkg", "sub/src"):
+            (tmp_path / rel).mkdir(parents=True)
+        events = _wait_for_events(feed, 0, str(tmp_path), lambda evs: any(e.path.endswith("sub/src") for e in evs))
+        for rel in ("build/out", "sub/node_modules/pkg", "sub/src"):
+            (tmp_path / rel / "f.txt").write_text("x")
+        events = _wait_for_events(
+            feed, events[-1].seq, str(tmp_path), lambda evs: any(e.path.endswith("sub/src/f.txt") for e in evs)
+        )
+        assert [os.path.relpath(e.path, tmp_path) for e in events] == ["sub/src/f.txt"]
+    finally:
+        feed.stop()
+
+
+def test_poll_changes_tool(mcp_server):
+    name = f"feed-{uuid.uuid4().hex[:8]}"
+    root = os.path.join(mcp_server["projects_dir"], name)
+    os.makedirs(root)
+    url = mcp_server["url"]
+    first = api_call_tool(url, "poll_changes", project=name)
+    assert first.startswith("Cursor: ")
+    cursor = int(first.splitlines()[0].split()[1])
+    with open(os.path.join(root, "notes.txt"), "w") as f:
+        f.write("hello\n")
+    out = api_call_tool(url, "poll_changes", project=name, since=cursor, timeout=5)
+    for _ in range(10):
+        if "notes.txt" in out:
+            break
+        out = api_call_tool(url, "poll_changes", project=name, since=cursor, timeout=1)
+    assert "created notes.txt" in out.splitlines()
+    assert "Project does not exist" in api_call_tool(url, "poll_changes", project="no-such-feed-proj")
+    for bad in ("..", ".", ".mcp-grok-index"):
+        out = api_call_tool(url, "poll_changes", project=bad)
+        assert out == "Error: No active project and no valid project name given.", bad
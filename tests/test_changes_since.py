@@ -0,0 +1,74 @@
+import os
+import re
+import types
+import uuid
+
+from mcp_grok.merkle_tree import MerkleTracker, _build_tree, diff_trees
+from mcp_grok.tree_cache import TreeCache
+from tests.test_utils import api_call_tool
+
+
+def _token(out):
+    match = re.match(r"Token: ([0-9a-f]+)", out)
+    assert match, out
+    return match.group(1)
+
+
+def test_diff_trees_skips_equal_subtrees():
+    old = _build_tree({"a.txt": "1", "src/b.py": "2", "src/deep/c.py": "3", "gone/x": "4"})
+    new = _build_tree({"a.txt": "1", "src/b.py": "9", "src/deep/c.py": "3", "new.txt": "5"})
+    assert diff_trees(old, new) == (["new.txt"], ["gone/x"], ["src/b.py"])
+    assert diff_trees(new, new) == ([], [], [])
+    assert old["c"]["src"]["c"]["deep"]["h"] == new["c"]["src"]["c"]["deep"]["h"]
+
+
+def test_scan_cache_only_keeps_files_of_the_last_scan(tmp_path):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text(name)
+        os.utime(tmp_path / name, (1_000_000_000, 1_000_000_000))
+    tracker = MerkleTracker(types.SimpleNamespace(), TreeCache())
+    first = tracker.scan(str(tmp_path))
+    assert sorted(tracker._hashes[str(tmp_path)]) == ["a.txt", "b.txt"]
+    (tmp_path / "b.txt").unlink()
+    second = tracker.scan(str(tmp_path))
+    assert sorted(tracker._hashes[str(tmp_path)]) == ["a.txt"]
+    assert diff_trees(first, second) == ([], ["b.txt"], [])
+
+
+def test_changes_since_reports_added_removed_modified(mcp_server):
+    name = f"merkle-{uuid.uuid4().hex[:8]}"
+    root = os.path.join(mcp_server["projects_dir"], name)
+    os.makedirs(os.path.join(root, "src"))
+    for rel, text in {"src/a.py": "a\n", "src/b.py": "b\n", "README": "r\n", "x.log": "l\n"}.items():
+        with open(os.path.join(root, rel), "w") as f:
+            f.write(text)
+    with open(os.path.join(root, ".gitignore"), "w") as f:
+        f.write("*.log\n")
+    url = mcp_server["url"]
+    first = api_call_tool(url, "changes_since", project=name)
+    assert first.endswith("[4 files]")
+    token = _token(first)
+    assert api_call_tool(url, "changes_since", token=token, project=name).endswith("[0 added, 0 removed, 0 modified]")
+
+    with open(os.path.join(root, "src", "a.py"), "w") as f:
+        f.write("changed\n")
+    os.remove(os.path.join(root, "README"))
+    with open(os.path.join(root, "src", "c.py"), "w") as f:
+        f.write("c\n")
+    with open(os.path.join(root, "y.log"), "w") as f:
+        f.write("ignored\n")
+    out = api_call_tool(url, "changes_since", token=token, project=name)
+    assert out.splitlines()[1:] == ["A src/c.py", "D README", "M src/a.py", "[1 added, 1 removed, 1 modified]"]
+    assert _token(out) != token
+
+
+def test_changes_since_errors(mcp_server):
+    url = mcp_server["url"]
+    assert "Project does not exist" in api_call_tool(url, "changes_since", project="no-such-merkle-proj")
+    for bad in ("..", ".", ".mcp-grok-index"):
+        out = api_call_tool(url, "changes_since", project=bad)
+        assert out == "Error: No active project and no valid project name given.", bad
+    name = f"merkle-{uuid.uuid4().hex[:8]}"
+    os.makedirs(os.path.join(mcp_server["projects_dir"], name))
+    out = api_call_tool(url, "changes_since", token="deadbeef", project=name)
+    assert out.startswith("Error: Unknown or expired token: deadbeef. Current token: ")
@@ -0,0 +1,58 @@
+import re
+
+from mcp_grok.diff_tools import unified_diff
+from tests.test_utils import api_call_tool, api_read_file
+
+
+def test_diff_two_paths(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    old, new = tmp_path / "old.py", tmp_path / "new.py"
+    old.write_text("".join(f"x{i} = {i}\n" for i in range(100)))
+    new.write_text(old.read_text().replace("x10 = 10\n", "x10 = 'ten'\n").replace("x90 = 90\n", ""))
+    out = api_call_tool(url, "diff", path=str(new), other_path=str(old), context=1)
+    assert out.split("\n")[1:] == [
+        f"--- {old}", f"+++ {new}",
+        "@@ -10,3 +10,3 @@", " x9 = 9", "-x10 = 10", "+x10 = 'ten'", " x11 = 11",
+        "@@ -90,3 +90,2 @@", " x89 = 89", "-x90 = 90", " x91 = 91",
+    ]
+    assert api_call_tool(url, "diff", path=str(old), other_path=str(old)).endswith("\nNo differences.")
+
+
+def test_diff_against_cached_hash(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    path = tmp_path / "build.cfg"
+    path.write_text("mode = debug\nlevel = 1\n")
+    etag = api_read_file(url, str(path), include_etag=True).split("\n")[0].removeprefix("ETag: ")
+    path.write_text("mode = release\nlevel = 1\n")
+    out = api_call_tool(url, "diff", path=str(path), base_hash=etag)
+    lines = out.split("\n")
+    assert re.fullmatch(r"ETag: [0-9a-f]{32}", lines[0]) and lines[0] != f"ETag: {etag}"
+    assert lines[1:] == [f"--- {path}@{etag}", f"+++ {path}", "@@ -1,2 +1,2 @@", "-mode = debug", "+mode = release",
+                         " level = 1"]
+    out = api_call_tool(url, "diff", path=str(path), base_hash="0" * 32)
+    assert out.startswith("Error: Content") and "no longer cached" in out
+
+
+def test_unified_diff_streams_with_budget():
+    def lines():
+        for i in range(1_000_000):
+            yield f"line {i}"
+
+    changed = (f"LINE {i}" if i % 1000 == 0 else f"line {i}" for i in range(1_000_000))
+    text, truncated = unified_diff(lines(), changed, "a", "b", context=0, max_bytes=2048)
+    assert truncated and len(text) < 2048 + 100
+    assert text.split("\n")[2:5] == ["@@ -1 +1 @@", "-line 0", "+LINE 0"]
+
+
+def test_unified_diff_budget_covers_open_hunk():
+    consumed = []
+
+    def lines(prefix):
+        for i in range(100_000):
+            consumed.append(prefix)
+            yield f"{prefix} {i}"
+
+    text, truncated = unified_diff(lines("old"), lines("new"), "a", "b", max_bytes=4096)
+    assert truncated and len(text.encode()) <= 4096
+    assert text.split("\n")[3] == "-old 0"
+    assert len(consumed) < 20_000
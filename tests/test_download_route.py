@@ -0,0 +1,66 @@
+import os
+import uuid
+
+import pytest
+import requests
+
+from mcp_grok.download_route import RangeNotSatisfiable, parse_range
+
+
+def _download_url(mcp_server, project, path):
+    return mcp_server["url"].rsplit("/mcp", 1)[0] + f"/download/{project}/{path}"
+
+
+def _make_project(projects_dir, data):
+    name = f"dl-{uuid.uuid4().hex[:8]}"
+    os.makedirs(os.path.join(projects_dir, name, "out"))
+    with open(os.path.join(projects_dir, name, "out", "artifact.bin"), "wb") as f:
+        f.write(data)
+    return name
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-5", 100) == (95, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+
+
+def test_download_full_and_range(mcp_server):
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    name = _make_project(mcp_server["projects_dir"], data)
+    url = _download_url(mcp_server, name, "out/artifact.bin")
+    resp = requests.get(url)
+    assert resp.status_code == 200
+    assert resp.headers["accept-ranges"] == "bytes"
+    assert resp.content == data
+    resp = requests.get(url, headers={"Range": "bytes=1048570-1048589"})
+    assert resp.status_code == 206
+    assert resp.headers["content-range"] == f"bytes 1048570-1048589/{len(data)}"
+    assert resp.content == data[1048570:1048590]
+    resp = requests.head(url)
+    assert resp.status_code == 200 and resp.headers["content-length"] == str(len(data))
+    resp = requests.get(url, headers={"Range": f"bytes={len(data)}-"})
+    assert resp.status_code == 416
+    assert resp.headers["content-range"] == f"bytes */{len(data)}"
+
+
+def test_download_rejects_missing_and_escaping_paths(mcp_server):
+    name = _make_project(mcp_server["projects_dir"], b"x")
+    assert requests.get(_download_url(mcp_server, name, "out/missing.bin")).status_code == 404
+    assert requests.get(_download_url(mcp_server, name, "out")).status_code == 404
+    assert requests.get(_download_url(mcp_server, name, "%2E%2E/%2E%2E/etc/passwd")).status_code == 404
+    assert requests.get(_download_url(mcp_server, "no-such-dl-proj", "x")).status_code == 404
+    with open(os.path.join(mcp_server["projects_dir"], "..", "secret.txt"), "w") as f:
+        f.write("secret")
+    for project in ("%2E%2E", "..", "%2E", ".mcp-grok-index"):
+        resp = requests.get(_download_url(mcp_server, project, "secret.txt"))
+        assert resp.status_code == 404 and "secret" != resp.text, project
+    os.mkfifo(os.path.join(mcp_server["projects_dir"], name, "out", "pipe"))
+    assert requests.get(_download_url(mcp_server, name, "out/pipe"), timeout=10).status_code == 404
+    assert requests.get(_download_url(mcp_server, name, "out/artifact.bin"), timeout=10).content == b"x"
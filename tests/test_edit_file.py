@@ -0,0 +1,78 @@
+from pathlib import Path
+
+from mcp_grok.file_tools import edit_file
+from tests.test_utils import api_call_tool, api_read_file
+
+
+def test_edit_file_multiple_edits_original_numbering(tmp_path, mcp_server):
+    test_file = tmp_path / "multi.txt"
+    Path(test_file).write_text("l0\nl1\nl2\nl3\nl4\nl5\n")
+    out = api_call_tool(
+        mcp_server["url"],
+        "edit_file",
+        file_path=str(test_file),
+        edits=[
+            {"replace_lines_start": 4, "replace_lines_end": 6, "content": "L4\n"},
+            {"insert_at_line": 0, "content": "head\n"},
+            {"replace_lines_start": 1, "replace_lines_end": 3, "content": ""},
+            {"insert_at_line": 3, "content": "mid\n"},
+        ],
+    )
+    assert "Success: Applied 4 edits" in out
+    assert Path(test_file).read_text() == "head\nl0\nmid\nl3\nL4\n"
+
+
+def test_edit_file_rejects_overlap(tmp_path, mcp_server):
+    test_file = tmp_path / "overlap.txt"
+    original = "a\nb\nc\nd\n"
+    Path(test_file).write_text(original)
+    out = api_call_tool(
+        mcp_server["url"],
+        "edit_file",
+        file_path=str(test_file),
+        edits=[
+            {"replace_lines_start": 0, "replace_lines_end": 2, "content": "X\n"},
+            {"insert_at_line": 1, "content": "Y\n"},
+        ],
+    )
+    assert "overlap" in out
+    assert Path(test_file).read_text() == original
+
+
+def test_edit_file_invalid_edit_is_atomic(tmp_path, mcp_server):
+    test_file = tmp_path / "invalid.txt"
+    original = "a\nb\n"
+    Path(test_file).write_text(original)
+    out = api_call_tool(
+        mcp_server["url"],
+        "edit_file",
+        file_path=str(test_file),
+        edits=[
+            {"insert_at_line": 0, "content": "ok\n"},
+            {"replace_lines_start": 2, "replace_lines_end": 1, "content": "bad\n"},
+        ],
+    )
+    assert "Edit 1" in out and "Invalid line range" in out
+    assert Path(test_file).read_text() == original
+    assert edit_file(str(test_file), ["x"]).startswith("Error: Edit 0: expected an object")
+    out = edit_file(str(test_file), [{"insert_at_line": 0, "content": 5}])
+    assert out == "Error: Edit 0: content must be a string.", out
+    out = edit_file(str(test_file), [{"insert_at_line": 0}, {"insert_at_line": "one", "content": ""}])
+    assert out == "Error: Edit 1: Line numbers must be integers.", out
+    assert Path(test_file).read_text() == original
+
+
+def test_edit_file_expected_hash(tmp_path, mcp_server):
+    test_file = tmp_path / "hash.txt"
+    Path(test_file).write_text("a\nb\n")
+    etag = api_read_file(mcp_server["url"], str(test_file), include_etag=True).splitlines()[0][len("ETag: "):]
+    Path(test_file).write_text("a\nb\nc\n")
+    out = api_call_tool(
+        mcp_server["url"],
+        "edit_file",
+        file_path=str(test_file),
+        edits=[{"insert_at_line": 0, "content": "x\n"}],
+        expected_hash=etag,
+    )
+    assert "Precondition failed" in out
+    assert Path(test_file).read_text() == "a\nb\nc\n"
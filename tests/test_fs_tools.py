@@ -0,0 +1,96 @@
+import os
+
+from tests.test_utils import api_call_tool
+
+
+def test_stat_copy_and_move(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    src = tmp_path / "a.txt"
+    src.write_text("hello")
+    os.chmod(src, 0o640)
+    info = api_call_tool(url, "stat_path", path=str(src))
+    assert (info["type"], info["size"], info["mode"], info["exists"]) == ("file", 5, "0o640", True)
+
+    copied = api_call_tool(url, "copy_path", source=str(src), destination=str(tmp_path / "sub" / "b.txt"))
+    assert copied["path"] == str(tmp_path / "sub" / "b.txt") and copied["mode"] == "0o640"
+    assert (tmp_path / "sub" / "b.txt").read_text() == "hello"
+    again = api_call_tool(url, "copy_path", source=str(src), destination=str(tmp_path / "sub" / "b.txt"))
+    assert again.startswith("Error: Destination exists")
+    assert not [p for p in (tmp_path / "sub").iterdir() if p.name.endswith(".tmp")]
+
+    moved = api_call_tool(url, "move_path", source=str(tmp_path / "sub"), destination=str(tmp_path / "moved"))
+    assert moved["type"] == "directory"
+    assert (tmp_path / "moved" / "b.txt").read_text() == "hello" and not (tmp_path / "sub").exists()
+
+
+def test_copy_tree_symlinks_and_delete(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    (tmp_path / "tree" / "inner").mkdir(parents=True)
+    (tmp_path / "tree" / "inner" / "f.txt").write_text("x")
+    os.symlink("inner/f.txt", tmp_path / "tree" / "link")
+    assert api_call_tool(url, "copy_path", source=str(tmp_path / "tree"),
+                         destination=str(tmp_path / "copy")).startswith("Error: Source is a directory")
+    api_call_tool(url, "copy_path", source=str(tmp_path / "tree"), destination=str(tmp_path / "copy"), recursive=True)
+    assert os.readlink(tmp_path / "copy" / "link") == "inner/f.txt"
+    link = api_call_tool(url, "stat_path", path=str(tmp_path / "copy" / "link"))
+    assert (link["type"], link["link_target"]) == ("symlink", "inner/f.txt")
+
+    removed = api_call_tool(url, "delete_path", path=str(tmp_path / "copy" / "link"))
+    assert (removed["type"], removed["exists"]) == ("symlink", False)
+    assert (tmp_path / "copy" / "inner" / "f.txt").exists()
+    assert "not empty" in api_call_tool(url, "delete_path", path=str(tmp_path / "copy"))
+    assert api_call_tool(url, "delete_path", path=str(tmp_path / "copy"), recursive=True)["exists"] is False
+    assert not (tmp_path / "copy").exists()
+
+
+def test_make_dir_and_guards(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    made = api_call_tool(url, "make_dir", path=str(tmp_path / "x" / "y"))
+    assert made["type"] == "directory" and (tmp_path / "x" / "y").is_dir()
+    assert api_call_tool(url, "make_dir", path=str(tmp_path / "x" / "y"))["type"] == "directory"
+    assert api_call_tool(url, "delete_path", path="/etc/hostname").startswith("Error: Refusing")
+    assert api_call_tool(url, "make_dir", path="/usr/mcp-grok-test").startswith("Error: Refusing")
+    assert api_call_tool(url, "stat_path", path=str(tmp_path / "nope")).startswith("Error: Path does not exist")
+
+
+def test_copy_and_move_onto_existing_directory(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    (tmp_path / "src" / "sub").mkdir(parents=True)
+    (tmp_path / "src" / "sub" / "new.txt").write_text("new")
+    (tmp_path / "dst").mkdir()
+    (tmp_path / "dst" / "keep.txt").write_text("keep")
+    args = dict(source=str(tmp_path / "src"), destination=str(tmp_path / "dst"), recursive=True)
+    assert api_call_tool(url, "copy_path", **args).startswith("Error: Destination exists and overwrite=False")
+    assert api_call_tool(url, "copy_path", overwrite=True, **args)["type"] == "directory"
+    assert (tmp_path / "dst" / "sub" / "new.txt").read_text() == "new"
+    assert (tmp_path / "dst" / "keep.txt").exists()
+    (tmp_path / "file.txt").write_text("f")
+    out = api_call_tool(url, "copy_path", source=str(tmp_path / "file.txt"), destination=str(tmp_path / "dst"),
+                        overwrite=True)
+    assert out.startswith("Error: Refusing to write to a directory"), out
+
+    (tmp_path / "empty").mkdir()
+    moved = api_call_tool(url, "move_path", source=str(tmp_path / "src"), destination=str(tmp_path / "empty"),
+                          overwrite=True)
+    assert moved["type"] == "directory" and (tmp_path / "empty" / "sub" / "new.txt").exists()
+    out = api_call_tool(url, "move_path", source=str(tmp_path / "empty"), destination=str(tmp_path / "dst"),
+                        overwrite=True)
+    assert out.startswith("Error: Destination directory is not empty"), out
+
+
+def test_recursive_copy_does_not_write_through_destination_symlinks(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    (tmp_path / "src" / "sub").mkdir(parents=True)
+    (tmp_path / "src" / "a.txt").write_text("new a")
+    (tmp_path / "src" / "sub" / "b.txt").write_text("new b")
+    (tmp_path / "outside").mkdir()
+    (tmp_path / "outside" / "b.txt").write_text("outside b")
+    (tmp_path / "victim.txt").write_text("victim")
+    (tmp_path / "dst").mkdir()
+    os.symlink(tmp_path / "victim.txt", tmp_path / "dst" / "a.txt")
+    os.symlink(tmp_path / "outside", tmp_path / "dst" / "sub")
+    out = api_call_tool(url, "copy_path", source=str(tmp_path / "src"), destination=str(tmp_path / "dst"),
+                        recursive=True, overwrite=True)
+    assert out.startswith("Error: ") and "Target is a symlink" in out and "through a symlink" in out, out
+    assert (tmp_path / "victim.txt").read_text() == "victim"
+    assert (tmp_path / "outside" / "b.txt").read_text() == "outside b"
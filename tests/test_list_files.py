@@ -0,0 +1,64 @@
+import os
+
+from mcp_grok.tree_cache import TreeCache, list_files
+from tests.test_utils import api_call_tool
+
+
+def _make_tree(root):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "build").mkdir()
+    (root / "src" / "app.py").write_text("print('hi')\n")
+    (root / "src" / "pkg" / "mod.py").write_text("x = 1\n")
+    (root / "src" / "util.js").write_text("//\n")
+    (root / "build" / "out.o").write_text("obj")
+    (root / "debug.log").write_text("log")
+    (root / ".gitignore").write_text("build/\n*.log\n")
+
+
+def _age(root):
+    """Backdates every directory so the cache does not treat them as racily modified."""
+    past = 1_000_000_000
+    for dir_path, _, _ in os.walk(root):
+        os.utime(dir_path, (past, past))
+
+
+def test_list_files_tree_depth_and_globs(tmp_path, mcp_server):
+    _make_tree(tmp_path)
+    url = mcp_server["url"]
+    out = api_call_tool(url, "list_files", path=str(tmp_path))
+    assert out.splitlines() == [".gitignore", "src/", "src/app.py", "src/pkg/", "src/pkg/mod.py", "src/util.js",
+                                "[4 files, 2 directories]"]
+    out = api_call_tool(url, "list_files", path=str(tmp_path), depth=1, respect_gitignore=False)
+    assert out.splitlines() == [".gitignore", "build/", "debug.log", "src/", "[2 files, 2 directories]"]
+    out = api_call_tool(url, "list_files", path=str(tmp_path), include=["*.py"], details=True)
+    lines = out.splitlines()
+    assert lines[0].startswith("src/app.py\t12\t") and lines[0].endswith("Z")
+    assert lines[1].startswith("src/pkg/mod.py\t6\t")
+    assert lines[-1] == "[2 files, 0 directories]"
+
+
+def test_list_files_max_entries_and_errors(tmp_path, mcp_server):
+    _make_tree(tmp_path)
+    url = mcp_server["url"]
+    out = api_call_tool(url, "list_files", path=str(tmp_path), max_entries=2)
+    assert out.splitlines() == [".gitignore", "src/", "...[stopped at max_entries=2]..."]
+    assert "Directory does not exist" in api_call_tool(url, "list_files", path=str(tmp_path / "missing"))
+    assert "depth must be at least 1" in api_call_tool(url, "list_files", path=str(tmp_path), depth=0)
+
+
+def test_tree_cache_revalidates_by_directory_mtime(tmp_path):
+    _make_tree(tmp_path)
+    _age(tmp_path)
+    cache = TreeCache()
+    first = list_files(cache, str(tmp_path))
+    misses = cache.misses
+    assert list_files(cache, str(tmp_path)) == first
+    assert cache.misses == misses and cache.hits >= 3
+    (tmp_path / "src" / "new.py").write_text("")
+    out = list_files(cache, str(tmp_path))
+    assert "src/new.py" in out
+    assert cache.misses == misses + 1
+    with open(tmp_path / "src" / "app.py", "a") as f:
+        f.write("print('more')\n")
+    _age(tmp_path)
+    assert "src/app.py\t26\t" in list_files(cache, str(tmp_path), details=True)
@@ -0,0 +1,84 @@
+import os
+
+from mcp_grok.outline import OutlineCache, regex_outliner, register_outliner
+from tests.test_utils import api_call_tool
+
+PY_SOURCE = '''import os
+
+
+@decorator
+class Greeter:
+    """Says hello."""
+
+    def greet(self, name):
+        return f"hi {name}"
+
+    async def wait(self):
+        pass
+
+
+def main():
+    Greeter().greet("x")
+'''
+
+
+def test_outline_python_file_and_directory(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "app.py").write_text(PY_SOURCE)
+    (tmp_path / "web.ts").write_text("export class View {\n  render() {}\n}\n\nexport const load = async (id) => {\n};\n")
+    (tmp_path / "notes.txt").write_text("def not_code():\n")
+    out = api_call_tool(url, "outline", path=str(tmp_path / "pkg" / "app.py"))
+    assert out.split("\n") == [
+        "class Greeter [3:12]", "  def greet [7:9]", "  async def wait [10:12]", "def main [14:16]",
+    ]
+    lines = PY_SOURCE.split("\n")
+    assert lines[3] == "@decorator" and lines[15].strip() == 'Greeter().greet("x")'
+    out = api_call_tool(url, "outline", path=str(tmp_path))
+    assert out.split("\n") == [
+        "pkg/app.py", "  class Greeter [3:12]", "    def greet [7:9]", "    async def wait [10:12]", "  def main [14:16]",
+        "web.ts", "  class View [0:4]", "  function load [4:6]",
+    ]
+
+
+def test_find_symbol_across_project(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    (tmp_path / "a.py").write_text(PY_SOURCE)
+    (tmp_path / "b.py").write_text("def greet():\n    pass\n")
+    (tmp_path / "broken.py").write_text("def oops(:\n")
+    out = api_call_tool(url, "find_symbol", name="greet", path=str(tmp_path))
+    assert out.split("\n") == ["a.py:7-9 def Greeter.greet", "b.py:0-2 def greet"]
+    out = api_call_tool(url, "find_symbol", name="Greeter.greet", path=str(tmp_path))
+    assert out == "a.py:7-9 def Greeter.greet"
+    out = api_call_tool(url, "find_symbol", name="^(main|Gre)", regex=True, kind="class", path=str(tmp_path))
+    assert out == "a.py:3-12 class Greeter"
+    assert api_call_tool(url, "outline", path=str(tmp_path / "broken.py")).startswith("Error: Cannot parse")
+    assert api_call_tool(url, "find_symbol", name="nothing", path=str(tmp_path)) == "No symbols matching 'nothing'."
+
+
+def test_outline_cache_and_custom_outliner(tmp_path):
+    register_outliner([".mk"], regex_outliner([("target", r"(?P<name>[\w.-]+):")]))
+    path = tmp_path / "rules.mk"
+    old = 10**18
+    path.write_text("build:\n\tcc x.c\ntest: build\n\t./x\n")
+    os.utime(path, ns=(old, old))
+    cache = OutlineCache()
+    first = cache.outline(str(path))
+    assert [(s.name, s.start, s.end) for s in first] == [("build", 0, 2), ("test", 2, 4)]
+    assert cache.outline(str(path)) is first
+    # Same size and mtime, but replaced by another file.
+    other = tmp_path / "other.mk"
+    other.write_text("trial:\n\tcc x.c\ntest: build\n\t./x\n")
+    os.utime(other, ns=(old, old))
+    os.replace(other, path)
+    assert [s.name for s in cache.outline(str(path))] == ["trial", "test"]
+    # Recently modified files are not cached: a same-size rewrite within one mtime tick is still seen.
+    path.write_text("clean:\n\trm x\n")
+    st = os.stat(path)
+    assert [s.name for s in cache.outline(str(path))] == ["clean"]
+    path.write_text("purge:\n\trm x\n")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert [s.name for s in cache.outline(str(path))] == ["purge"]
+    js = tmp_path / "min.js"
+    js.write_bytes("const s = 'a\u2028b\x0cc';\nfunction f() {}\nfunction g() {}\n".encode())
+    assert [(s.name, s.start, s.end) for s in cache.outline(str(js))] == [("f", 1, 2), ("g", 2, 3)]
@@ -0,0 +1,65 @@
+import os
+import types
+import uuid
+
+import pytest
+
+from mcp_grok.config import INDEX_DIR_NAME
+from mcp_grok.project_manager import ProjectManager
+from mcp_grok.project_resources import parse_project_uri, resolve_project_file
+from tests.test_utils import api_mcp_request
+
+
+def _make_project(projects_dir):
+    name = f"res-{uuid.uuid4().hex[:8]}"
+    os.makedirs(os.path.join(projects_dir, name, "src"))
+    with open(os.path.join(projects_dir, name, "src", "lines.txt"), "w") as f:
+        f.write("".join(f"line {i}\n" for i in range(10)))
+    return name
+
+
+def test_parse_project_uri():
+    assert parse_project_uri("project://demo/src/a%20b.py?offset=3&limit=4") == ("demo", "src/a b.py", 3, 4)
+    assert parse_project_uri("project://demo/README") == ("demo", "README", 0, 2000)
+    assert parse_project_uri("file:///etc/hosts") is None
+    assert parse_project_uri("project://demo/x?offset=abc") is None
+
+
+@pytest.mark.parametrize("name", ["..", ".", INDEX_DIR_NAME])
+def test_resolve_project_file_rejects_non_project_names(tmp_path, name):
+    projects_dir = tmp_path / "projects"
+    (projects_dir / INDEX_DIR_NAME).mkdir(parents=True)
+    (tmp_path / "secret.txt").write_text("secret")
+    (projects_dir / "secret.txt").write_text("secret")
+    manager = ProjectManager(types.SimpleNamespace(projects_dir=str(projects_dir)), None)
+    with pytest.raises(ValueError, match="Invalid project name"):
+        resolve_project_file(manager, name, "secret.txt")
+
+
+def test_read_project_resource_with_line_range(mcp_server):
+    name = _make_project(mcp_server["projects_dir"])
+    url = mcp_server["url"]
+    data = api_mcp_request(url, "resources/read", uri=f"project://{name}/src/lines.txt?offset=2&limit=3")
+    contents = data["result"]["contents"]
+    assert contents[0]["text"] == "line 2\nline 3\nline 4\n...[output truncated]..."
+    assert contents[0]["mimeType"] == "text/plain"
+    data = api_mcp_request(url, "resources/read", uri=f"project://{name}/src/lines.txt")
+    assert data["result"]["contents"][0]["text"].endswith("line 9")
+
+
+def test_project_resource_errors_and_listing(mcp_server):
+    name = _make_project(mcp_server["projects_dir"])
+    url = mcp_server["url"]
+    assert "error" in api_mcp_request(url, "resources/read", uri=f"project://{name}/missing.txt")
+    assert "error" in api_mcp_request(url, "resources/read", uri=f"project://{name}/../../etc/passwd")
+    with open(os.path.join(mcp_server["projects_dir"], "..", "outside.txt"), "w") as f:
+        f.write("outside")
+    assert "error" in api_mcp_request(url, "resources/read", uri="project://../outside.txt")
+    templates = api_mcp_request(url, "resources/templates/list")["result"]["resourceTemplates"]
+    assert any(t["uriTemplate"] == "project://{name}/{+path}" for t in templates)
+    # Sessions do not outlive a request under stateless HTTP, so subscriptions are neither offered nor accepted.
+    init = api_mcp_request(
+        url, "initialize", protocolVersion="2025-06-18", capabilities={}, clientInfo={"name": "test", "version": "0"}
+    )
+    assert not init["result"]["capabilities"]["resources"].get("subscribe")
+    assert "error" in api_mcp_request(url, "resources/subscribe", uri=f"project://{name}/src/lines.txt")
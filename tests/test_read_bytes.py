@@ -0,0 +1,34 @@
+import base64
+import os
+
+from tests.test_utils import api_call_tool, api_read_file
+
+
+def test_read_bytes_binary_ranges(tmp_path, mcp_server):
+    data = b"\0\x01binary\xff" + os.urandom(5000)
+    test_file = tmp_path / "blob.bin"
+    test_file.write_bytes(data)
+    url = mcp_server["url"]
+    assert api_read_file(url, str(test_file)) == "Error: File appears to be binary."
+    chunk = api_call_tool(url, "read_bytes", file_path=str(test_file), offset=2, length=6)
+    assert base64.b64decode(chunk["data"]) == b"binary"
+    assert (chunk["offset"], chunk["length"], chunk["size"], chunk["eof"]) == (2, 6, len(data), False)
+    collected = b""
+    offset = 0
+    while True:
+        chunk = api_call_tool(url, "read_bytes", file_path=str(test_file), offset=offset, length=2048)
+        collected += base64.b64decode(chunk["data"])
+        offset += chunk["length"]
+        if chunk["eof"]:
+            break
+    assert collected == data
+
+
+def test_read_bytes_past_end_and_errors(tmp_path, mcp_server):
+    test_file = tmp_path / "small.bin"
+    test_file.write_bytes(b"abc")
+    url = mcp_server["url"]
+    chunk = api_call_tool(url, "read_bytes", file_path=str(test_file), offset=10)
+    assert (chunk["length"], chunk["size"], chunk["eof"], chunk["data"]) == (0, 3, True, "")
+    assert api_call_tool(url, "read_bytes", file_path=str(tmp_path)).startswith("Error: File does not exist")
+    assert api_call_tool(url, "read_bytes", file_path=str(test_file), offset=-1).startswith("Error: offset")
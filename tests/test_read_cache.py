@@ -0,0 +1,60 @@
+import os
+
+from mcp_grok.line_cache import LineCache, decode_lines
+from tests.test_utils import api_call_tool, api_read_file
+
+
+def _age(path, seconds=60):
+    """Moves the mtime out of the racy window so the file is cacheable."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 10**9))
+
+
+def test_decode_lines_matches_text_mode(tmp_path):
+    data = b"a\r\nb\rc\n\nd\xff\n"
+    path = tmp_path / "mixed.txt"
+    path.write_bytes(data)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        expected = tuple(line.rstrip("\n\r") for line in f)
+    assert decode_lines(data) == expected
+    assert decode_lines(b"") == ()
+    assert decode_lines(b"no newline") == ("no newline",)
+
+
+def test_line_cache_validation_and_budget(tmp_path):
+    cache = LineCache(max_bytes=12_000)
+    paths = []
+    for name in "abc":
+        path = tmp_path / f"{name}.txt"
+        path.write_text(f"{name}\n" * 100)
+        _age(path)
+        paths.append(path)
+        cache.put(str(path), os.stat(path), path.read_bytes())
+    stats = cache.stats()
+    assert stats["evictions"] >= 1 and stats["bytes"] <= 12_000
+    assert cache.get(str(paths[0]), os.stat(paths[0])) is None
+    old = cache.get(str(paths[2]), os.stat(paths[2]))
+    assert old.lines[:2] == ("c", "c")
+    paths[2].write_text("c\n" * 99 + "x\n")
+    _age(paths[2], 30)
+    assert cache.get(str(paths[2]), os.stat(paths[2])) is None
+    cache.invalidate(tmp_path)
+    stats = cache.stats()
+    assert (stats["files"], stats["versions"], stats["hits"], stats["misses"]) == (0, 2, 1, 2)
+    # Superseded content stays addressable by its ETag until evicted.
+    assert cache.version(old.etag) is old
+
+
+def test_read_file_served_from_cache(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    path = tmp_path / "hot.txt"
+    path.write_text("one\ntwo\nthree\n")
+    _age(path)
+    assert api_read_file(url, str(path)) == "one\ntwo\nthree"
+    before = api_call_tool(url, "read_cache_stats")
+    assert api_read_file(url, str(path), offset=1, limit=1).startswith("two")
+    after = api_call_tool(url, "read_cache_stats")
+    assert after["hits"] == before["hits"] + 1 and after["files"] >= 1
+    out = api_call_tool(url, "write_file", file_path=str(path), old_string="one", content="ONE")
+    assert out.startswith("Success"), out
+    assert api_read_file(url, str(path)) == "ONE\ntwo\nthree"
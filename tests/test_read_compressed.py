@@ -0,0 +1,48 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from tests.test_utils import api_read_file
+
+LOG = "".join(f"2024-01-01 request {i} status={200 if i % 7 else 500}\n" for i in range(20000))
+
+
+@pytest.mark.parametrize("compress,suffix", [(gzip.compress, "gz"), (bz2.compress, "bz2"), (lzma.compress, "xz")])
+def test_read_compressed_window_and_pattern(tmp_path, mcp_server, compress, suffix):
+    url = mcp_server["url"]
+    path = tmp_path / f"app.log.1.{suffix}"
+    path.write_bytes(compress(LOG.encode()))
+    out = api_read_file(url, str(path), offset=19998, limit=5)
+    assert out == "2024-01-01 request 19998 status=200\n2024-01-01 request 19999 status=500"
+    out = api_read_file(url, str(path), offset=100, limit=2, pattern="status=500")
+    assert out.split("\n") == [
+        "105:2024-01-01 request 105 status=500", "--", "112:2024-01-01 request 112 status=500", "...[output truncated]..."
+    ]
+
+
+def test_read_compressed_stops_at_window(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    path = tmp_path / "truncated.log.gz"
+    data = gzip.compress(LOG.encode())
+    # The stream is cut off: reading the head works because the tail is never inflated.
+    path.write_bytes(data[:len(data) // 2])
+    assert api_read_file(url, str(path), limit=1) == "2024-01-01 request 0 status=500\n...[output truncated]..."
+    assert api_read_file(url, str(path), offset=19990).startswith("Error: Could not decompress file: EOFError")
+
+
+def test_read_compressed_binary_payload(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    path = tmp_path / "image.gz"
+    path.write_bytes(gzip.compress(b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR"))
+    assert api_read_file(url, str(path)) == "Error: File appears to be binary (after decompression)."
+    plain = tmp_path / "BZh.txt"
+    plain.write_text("BZ is not enough\n")
+    assert api_read_file(url, str(plain)) == "BZ is not enough"
+    bee = tmp_path / "bee.txt"
+    bee.write_text("BZh, said the bee\n")
+    assert api_read_file(url, str(bee)) == "BZh, said the bee"
+    fake = tmp_path / "fake.txt"
+    fake.write_text("\x1f\x8b is only a header\nsecond\n")
+    assert api_read_file(url, str(fake), offset=1) == "second"
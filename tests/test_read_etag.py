@@ -0,0 +1,44 @@
+from pathlib import Path
+from tests.test_utils import api_read_file
+
+
+def _etag_of(result):
+    first_line = result.splitlines()[0]
+    assert first_line.startswith("ETag: "), result
+    return first_line[len("ETag: "):]
+
+
+def test_read_include_etag(tmp_path, mcp_server):
+    test_file = tmp_path / "etag.txt"
+    Path(test_file).write_text("alpha\nbeta\n")
+    result = api_read_file(mcp_server["url"], str(test_file), include_etag=True)
+    etag = _etag_of(result)
+    assert result.splitlines()[1:] == ["alpha", "beta"]
+    windowed = api_read_file(mcp_server["url"], str(test_file), limit=1, offset=1, include_etag=True)
+    assert _etag_of(windowed) == etag
+
+
+def test_read_if_none_match_unchanged(tmp_path, mcp_server):
+    test_file = tmp_path / "etag-unchanged.txt"
+    Path(test_file).write_text("same\n")
+    etag = _etag_of(api_read_file(mcp_server["url"], str(test_file), include_etag=True))
+    result = api_read_file(mcp_server["url"], str(test_file), if_none_match=etag)
+    assert result == f"Not Modified: ETag {etag}"
+    quoted = api_read_file(mcp_server["url"], str(test_file), if_none_match=f'"{etag}"')
+    assert quoted.startswith("Not Modified")
+
+
+def test_read_if_none_match_changed(tmp_path, mcp_server):
+    test_file = tmp_path / "etag-changed.txt"
+    Path(test_file).write_text("before\n")
+    etag = _etag_of(api_read_file(mcp_server["url"], str(test_file), include_etag=True))
+    Path(test_file).write_text("after\n")
+    result = api_read_file(mcp_server["url"], str(test_file), if_none_match=etag)
+    assert _etag_of(result) != etag
+    assert result.splitlines()[1] == "after"
+
+
+def test_read_without_etag_unchanged_output(tmp_path, mcp_server):
+    test_file = tmp_path / "plain.txt"
+    Path(test_file).write_text("plain\n")
+    assert api_read_file(mcp_server["url"], str(test_file)) == "plain"
@@ -0,0 +1,40 @@
+from pathlib import Path
+from tests.test_utils import api_read_file
+
+
+def _write_log(path):
+    lines = [f"INFO step {i}" for i in range(30)]
+    lines[5] = "ERROR disk full"
+    lines[7] = "ERROR retry failed"
+    lines[20] = "ERROR gave up"
+    Path(path).write_text("\n".join(lines) + "\n")
+
+
+def test_read_pattern_with_context(tmp_path, mcp_server):
+    test_file = tmp_path / "app.log"
+    _write_log(test_file)
+    result = api_read_file(mcp_server["url"], str(test_file), pattern="^ERROR", context=1)
+    assert result.splitlines() == [
+        "4-INFO step 4",
+        "5:ERROR disk full",
+        "6-INFO step 6",
+        "7:ERROR retry failed",
+        "8-INFO step 8",
+        "--",
+        "19-INFO step 19",
+        "20:ERROR gave up",
+        "21-INFO step 21",
+    ]
+
+
+def test_read_pattern_offset_limit_and_no_match(tmp_path, mcp_server):
+    test_file = tmp_path / "app.log"
+    _write_log(test_file)
+    url = mcp_server["url"]
+    assert api_read_file(url, str(test_file), pattern="ERROR", offset=6).splitlines() == [
+        "7:ERROR retry failed", "--", "20:ERROR gave up"
+    ]
+    limited = api_read_file(url, str(test_file), pattern="ERROR", limit=1)
+    assert limited.splitlines() == ["5:ERROR disk full", "...[output truncated]..."]
+    assert api_read_file(url, str(test_file), pattern="FATAL") == "No matches found."
+    assert api_read_file(url, str(test_file), pattern="(").startswith("Error: Invalid regex")
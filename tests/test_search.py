@@ -0,0 +1,59 @@
+from tests.test_utils import api_call_tool
+
+
+def _make_tree(root):
+    (root / "src").mkdir()
+    (root / "build").mkdir()
+    (root / "src" / "app.py").write_text("import os\n\ndef main():\n    return os.getcwd()\n")
+    (root / "src" / "util.js").write_text("function main() {}\n")
+    (root / "build" / "app.py").write_text("def main(): pass\n")
+    (root / "notes.log").write_text("main entry\n")
+    (root / "blob.bin").write_bytes(b"\0main\0")
+    (root / ".gitignore").write_text("build/\n*.log\n")
+
+
+def test_search_respects_gitignore(tmp_path, mcp_server):
+    _make_tree(tmp_path)
+    out = api_call_tool(mcp_server["url"], "search", pattern=r"def main", path=str(tmp_path))
+    assert "src/app.py:2:def main():" in out
+    assert "build/" not in out
+    out = api_call_tool(mcp_server["url"], "search", pattern="main", path=str(tmp_path), respect_gitignore=False)
+    assert "build/app.py:0:" in out and "notes.log:0:" in out
+    assert "blob.bin" not in out
+
+
+def test_search_literal_include_and_context(tmp_path, mcp_server):
+    _make_tree(tmp_path)
+    out = api_call_tool(
+        mcp_server["url"], "search", pattern="main()", regex=False, path=str(tmp_path), include=["*.py"], context=1
+    )
+    assert "src/app.py-1-" in out
+    assert "src/app.py:2:def main():" in out
+    assert "src/app.py-3-    return os.getcwd()" in out
+    assert "util.js" not in out
+    out = api_call_tool(mcp_server["url"], "search", pattern="MAIN", path=str(tmp_path), ignore_case=True,
+                        exclude=["*.js"])
+    assert "util.js" not in out and "src/app.py:2:" in out
+
+
+def test_search_max_results_and_errors(tmp_path, mcp_server):
+    (tmp_path / "many.txt").write_text("hit\n" * 50)
+    out = api_call_tool(mcp_server["url"], "search", pattern="hit", path=str(tmp_path), max_results=5)
+    assert out.count("many.txt:") == 5
+    assert "stopped at max_results=5" in out
+    assert api_call_tool(mcp_server["url"], "search", pattern="zzz", path=str(tmp_path)) == "No matches found."
+    assert "Invalid regex" in api_call_tool(mcp_server["url"], "search", pattern="(", path=str(tmp_path))
+
+
+def test_search_anchors_and_line_numbers_match_read_file(tmp_path, mcp_server):
+    _make_tree(tmp_path)
+    out = api_call_tool(mcp_server["url"], "search", pattern=r"^def main", path=str(tmp_path))
+    assert "src/app.py:2:def main():" in out
+    (tmp_path / "ff.txt").write_bytes("a\x0cb\u2028c\r\nTARGET\rend\n".encode())
+    out = api_call_tool(mcp_server["url"], "search", pattern="TARGET$", path=str(tmp_path / "ff.txt"))
+    assert "ff.txt:1:TARGET" in out and "ff.txt:2:" not in out
+    # Per-line semantics: these assertions hold at line edges, which sit next to newlines in the whole text.
+    (tmp_path / "edges.txt").write_text(" foo\nfoo bar\n")
+    for pattern in (r"\Afoo", r"(?<!\s)foo", r"bar(?!\s)"):
+        out = api_call_tool(mcp_server["url"], "search", pattern=pattern, path=str(tmp_path / "edges.txt"))
+        assert "edges.txt:1:foo bar" in out and "edges.txt:0:" not in out, (pattern, out)
@@ -0,0 +1,115 @@
+import os
+import time
+import uuid
+
+from mcp_grok.change_feed import ChangeFeed
+from mcp_grok.tree_cache import TreeCache
+from mcp_grok.trigram_index import TrigramIndex, file_trigrams, query_trigrams
+from tests.test_utils import api_call_tool
+
+
+def _make_project(projects_dir):
+    name = f"idx-{uuid.uuid4().hex[:8]}"
+    root = os.path.join(projects_dir, name)
+    os.makedirs(os.path.join(root, "src"))
+    with open(os.path.join(root, "src", "app.py"), "w") as f:
+        f.write("import os\n\ndef handle_request(req):\n    return req\n")
+    with open(os.path.join(root, "src", "other.py"), "w") as f:
+        f.write("def unrelated():\n    pass\n")
+    with open(os.path.join(root, ".gitignore"), "w") as f:
+        f.write("*.log\n")
+    with open(os.path.join(root, "debug.log"), "w") as f:
+        f.write("handle_request\n")
+    return name, root
+
+
+def test_query_trigrams_from_regex_literals():
+    assert query_trigrams("abcd", regex=False, ignore_case=False) == {
+        int.from_bytes(b"abc", "big"), int.from_bytes(b"bcd", "big")
+    }
+    keys = query_trigrams(r"def\s+handle_(\w+)", regex=True, ignore_case=False)
+    assert keys is not None and int.from_bytes(b"han", "big") in keys
+    assert query_trigrams(r"a|b", regex=True, ignore_case=False) is None
+
+
+def test_file_trigrams():
+    assert list(file_trigrams(b"ABcab")) == sorted(int.from_bytes(g, "big") for g in (b"abc", b"bca", b"cab"))
+    assert list(file_trigrams(b"ab")) == []
+    assert list(file_trigrams(b"abc\0def")) == []
+
+
+def test_index_candidates_and_incremental_refresh(tmp_path):
+    root = tmp_path / "proj"
+    root.mkdir()
+    (root / "a.txt").write_text("needle here\n")
+    (root / "b.txt").write_text("nothing\n")
+    index = TrigramIndex(str(root), str(tmp_path / "idx" / "proj.trigrams"))
+    index.refresh(force=True)
+    assert index.file_count == 2
+    assert index.candidates(query_trigrams("needle", False, False)) == ["a.txt"]
+    (root / "c.txt").write_text("another needle\n")
+    index.refresh(force=True)
+    assert index.candidates(query_trigrams("needle", False, False)) == ["a.txt", "c.txt"]
+    # A fresh instance reads the persisted index back; files changed since it was written stay candidates.
+    reloaded = TrigramIndex(str(root), str(tmp_path / "idx" / "proj.trigrams"))
+    reloaded.refresh(force=True)
+    assert reloaded.file_count == 2
+    assert reloaded.candidates(query_trigrams("nothing", False, False)) == ["b.txt", "c.txt"]
+
+
+def test_index_follows_change_feed_without_rescanning(tmp_path):
+    root = tmp_path / "proj"
+    (root / "old").mkdir(parents=True)
+    (root / ".gitignore").write_text("*.log\n")
+    (root / "a.txt").write_text("needle\n")
+    (root / "old" / "b.txt").write_text("needle\n")
+    feed = ChangeFeed(TreeCache())
+    assert feed.start(), feed.error
+    try:
+        index = TrigramIndex(str(root), str(tmp_path / "idx" / "proj.trigrams"), feed)
+        index.refresh()
+        assert index.candidates(query_trigrams("needle", False, False)) == ["a.txt", "old/b.txt"]
+        scans = []
+        index._scan = lambda: scans.append(1) or {}
+        (root / "a.txt").write_text("nothing\n")
+        (root / "new").mkdir()
+        (root / "new" / "c.txt").write_text("needle\n")
+        (root / "skip.log").write_text("needle\n")
+        os.rename(root / "old", tmp_path / "moved-out")
+        # Changed files stay candidates (they are verified when searched) until the next rebuild.
+        expected = ["a.txt", "new/c.txt"]
+        for _ in range(50):
+            index.refresh()
+            if index.candidates(query_trigrams("needle", False, False)) == expected:
+                break
+            time.sleep(0.1)
+        assert index.candidates(query_trigrams("needle", False, False)) == expected
+        assert not scans
+    finally:
+        feed.stop()
+
+
+def test_indexed_search_tool(mcp_server):
+    name, root = _make_project(mcp_server["projects_dir"])
+    url = mcp_server["url"]
+    out = api_call_tool(url, "indexed_search", pattern=r"def handle_\w+", project=name)
+    assert "src/app.py:2:def handle_request(req):" in out
+    assert "debug.log" not in out and "other.py" not in out
+    with open(os.path.join(root, "src", "other.py"), "a") as f:
+        f.write("handle_request()\n")
+    out = api_call_tool(url, "indexed_search", pattern="HANDLE_REQUEST", project=name, ignore_case=True, refresh=True)
+    assert "src/other.py:2:handle_request()" in out
+    assert "[2 matches in 2 files]" in out
+    assert name in api_call_tool(url, "list_all_projects")
+    assert ".mcp-grok-index" not in api_call_tool(url, "list_all_projects")
+
+
+def test_indexed_search_errors(mcp_server):
+    url = mcp_server["url"]
+    assert "Project does not exist" in api_call_tool(url, "indexed_search", pattern="x", project="no-such-proj-zz")
+    for bad in ("..", ".", ".mcp-grok-index"):
+        out = api_call_tool(url, "indexed_search", pattern="x", project=bad)
+        assert out == "Error: No active project and no valid project name given.", bad
+    name, _ = _make_project(mcp_server["projects_dir"])
+    assert "Invalid regex" in api_call_tool(url, "indexed_search", pattern="(", project=name)
+    assert api_call_tool(url, "indexed_search", pattern="zzzqqq", project=name) == "No matches found."
@@ -0,0 +1,70 @@
+from mcp_grok.edit_journal import EditJournal, Splice
+from tests.test_utils import api_call_tool, api_read_file
+
+
+def _write(url, path, content, **kwargs):
+    out = api_call_tool(url, "write_file", file_path=str(path), content=content, **kwargs)
+    assert out.startswith("Success"), out
+
+
+def test_undo_redo_line_and_string_edits(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    path = tmp_path / "notes.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1000)))
+    original = path.read_text()
+    _write(url, path, "first\n", replace_lines_start=10, replace_lines_end=12)
+    _write(url, path, "inserted\n", insert_at_line=0)
+    _write(url, path, "LINE 500", old_string="line 500")
+    edited = path.read_text()
+    out = api_call_tool(url, "undo_edit", file_path=str(path), steps=2)
+    assert out == f"Success: Undid 2 edit(s) in {path} (1 undo, 2 redo left)"
+    assert api_read_file(url, str(path), offset=9, limit=3) == "line 9\nfirst\nline 12\n...[output truncated]..."
+    assert api_call_tool(url, "undo_edit", file_path=str(path)).startswith("Success: Undid 1")
+    assert path.read_text() == original
+    assert api_call_tool(url, "undo_edit", file_path=str(path)) == f"Error: Nothing to undo for {path}"
+    assert api_call_tool(url, "redo_edit", file_path=str(path), steps=5).startswith("Success: Redid 3 edit(s)")
+    assert path.read_text() == edited
+
+
+def test_undo_file_creation_and_edit_file(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    path = tmp_path / "new" / "made.py"
+    _write(url, path, "a = 1\nb = 2\n")
+    edits = [{"content": "A = 1\n", "replace_lines_start": 0, "replace_lines_end": 1},
+             {"content": "c = 3\n", "insert_at_line": 2}]
+    assert api_call_tool(url, "edit_file", file_path=str(path), edits=edits).startswith("Success")
+    assert path.read_text() == "A = 1\nb = 2\nc = 3\n"
+    assert api_call_tool(url, "undo_edit", file_path=str(path)).startswith("Success")
+    assert path.read_text() == "a = 1\nb = 2\n"
+    assert api_call_tool(url, "undo_edit", file_path=str(path)).startswith("Success")
+    assert not path.exists()
+    assert api_call_tool(url, "redo_edit", file_path=str(path), steps=2).startswith("Success: Redid 2")
+    assert path.read_text() == "A = 1\nb = 2\nc = 3\n"
+
+
+def test_external_change_discards_history(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    path = tmp_path / "config.ini"
+    path.write_text("x=1\n")
+    _write(url, path, "x=2\n", replaceAll=True)
+    path.write_text("x=3\n")
+    out = api_call_tool(url, "undo_edit", file_path=str(path))
+    assert out.startswith("Error:") and "history was discarded" in out, out
+    assert path.read_text() == "x=3\n"
+    assert api_call_tool(url, "undo_edit", file_path=str(path)).startswith("Error: Nothing to undo")
+    # A new edit starts a fresh history from the externally changed content.
+    _write(url, path, "x=4\n", replaceAll=True)
+    assert api_call_tool(url, "undo_edit", file_path=str(path)).startswith("Success")
+    assert path.read_text() == "x=3\n"
+
+
+def test_journal_byte_budget_evicts_least_recently_edited_files(tmp_path):
+    journal = EditJournal(max_total_bytes=2500)
+    paths = [tmp_path / f"{i}.txt" for i in range(3)]
+    for path in paths:
+        path.write_bytes(b"x")
+        journal.record(path, [Splice(0, b"", b"y" * 1000)], None, existed=True)
+    assert journal.nbytes == 2000
+    assert journal.depth(paths[0]) == (0, 0) and journal.depth(paths[2]) == (1, 0)
+    journal.discard(paths[2])
+    assert journal.nbytes == 1000
@@ -0,0 +1,84 @@
+import base64
+import hashlib
+import re
+
+from tests.test_utils import api_call_tool
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _begin(url, path, **kwargs):
+    out = api_call_tool(url, "begin_upload", file_path=str(path), **kwargs)
+    match = re.match(r"Success: Upload ([0-9a-f]+) started", out)
+    assert match, out
+    return match.group(1)
+
+
+def test_chunked_upload_commit(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    target = tmp_path / "data" / "blob.bin"
+    payload = bytes(range(256)) * 1000
+    upload_id = _begin(url, target)
+    assert not target.exists()
+    for start in range(0, len(payload), 100_000):
+        chunk = payload[start:start + 100_000]
+        out = api_call_tool(url, "append_chunk", upload_id=upload_id, data=_b64(chunk),
+                            checksum=hashlib.sha256(chunk).hexdigest())
+        assert out.endswith(f"Next offset: {start + len(chunk)}"), out
+    digest = hashlib.sha256(payload).hexdigest()
+    out = api_call_tool(url, "commit_upload", upload_id=upload_id, checksum=digest, expected_size=len(payload))
+    assert out == f"Success: Committed {len(payload)} bytes to {target} (sha256 {digest})"
+    assert target.read_bytes() == payload
+    assert not [p for p in target.parent.iterdir() if p.name.endswith(".upload")]
+    assert "Unknown or expired upload" in api_call_tool(url, "commit_upload", upload_id=upload_id)
+
+
+def test_upload_resume_and_checksum_errors(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    target = tmp_path / "notes.txt"
+    target.write_text("old")
+    upload_id = _begin(url, target)
+    api_call_tool(url, "append_chunk", upload_id=upload_id, data="hello ", encoding="utf-8")
+    api_call_tool(url, "append_chunk", upload_id=upload_id, data="wrld", encoding="utf-8")
+    # Resend from the last acknowledged offset, replacing the bad tail.
+    out = api_call_tool(url, "append_chunk", upload_id=upload_id, data="world", offset=6, encoding="utf-8")
+    assert out == "Success: Received 5 bytes. Next offset: 11"
+    out = api_call_tool(url, "append_chunk", upload_id=upload_id, data="!", offset=50, encoding="utf-8")
+    assert out == "Error: Offset 50 is past the received data. Next offset: 11"
+    out = api_call_tool(url, "append_chunk", upload_id=upload_id, data=_b64(b"!"), checksum="00")
+    assert out == "Error: Chunk checksum mismatch. Next offset: 11"
+    assert "Checksum mismatch" in api_call_tool(url, "commit_upload", upload_id=upload_id, checksum="00")
+    assert "Size mismatch" in api_call_tool(url, "commit_upload", upload_id=upload_id, expected_size=3)
+    assert target.read_text() == "old"
+    assert api_call_tool(url, "commit_upload", upload_id=upload_id).startswith("Success")
+    assert target.read_text() == "hello world"
+
+
+def test_upload_guards_and_abort(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    existing = tmp_path / "keep.txt"
+    existing.write_text("keep")
+    out = api_call_tool(url, "begin_upload", file_path=str(existing), overwrite=False)
+    assert out.startswith("Error: File already exists")
+    assert api_call_tool(url, "begin_upload", file_path="/etc/mcp-grok-upload").startswith("Error: Refusing")
+    upload_id = _begin(url, tmp_path / "gone.txt")
+    assert "Invalid base64" in api_call_tool(url, "append_chunk", upload_id=upload_id, data="***")
+    assert api_call_tool(url, "abort_upload", upload_id=upload_id) == f"Success: Upload {upload_id} aborted."
+    assert list(tmp_path.iterdir()) == [existing]
+
+
+def test_upload_failed_commit_discards_session(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    upload_id = _begin(url, tmp_path / "out.bin")
+    out = api_call_tool(url, "append_chunk", upload_id=upload_id, data=_b64(b"abc"), offset=-1)
+    assert out == "Error: Offset must be >= 0. Next offset: 0"
+    assert api_call_tool(url, "append_chunk", upload_id=upload_id, data=_b64(b"abc")).endswith("Next offset: 3")
+    (tmp_target,) = tmp_path.glob(".out.bin.*.upload")
+    tmp_target.unlink()
+    out = api_call_tool(url, "commit_upload", upload_id=upload_id)
+    assert out.startswith(f"Error: Commit failed and upload {upload_id} was discarded"), out
+    out = api_call_tool(url, "append_chunk", upload_id=upload_id, data=_b64(b"abc"))
+    assert out == f"Error: Unknown or expired upload: {upload_id}"
+    assert list(tmp_path.iterdir()) == []
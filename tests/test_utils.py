@@ -53,8 +53,35 @@ def api_write_file(server_url, file_path, content, **extra_args):
     return str(result)
 
 
-def api_read_file(server_url, file_path, limit=None, offset=None):
-    payload = _build_read_file_payload(file_path, limit, offset)
+def api_call_tool(server_url, tool_name, **arguments):
+    """Call any MCP tool; returns its structured result (or text content)."""
+    payload = _build_tool_call_payload(tool_name, arguments)
+    resp = requests.post(server_url, json=payload, headers=_json_headers())
+    assert resp.status_code == 200, f"HTTP failure: {resp.text}"
+    data = resp.json()
+    assert "result" in data, f"No result: {data}"
+    result = data["result"]
+    if isinstance(result, dict):
+        structured = result.get("structuredContent")
+        if isinstance(structured, dict):
+            return structured.get("result", structured)
+        if isinstance(result.get("content"), list):
+            return "\n".join(
+                str(item.get("text", str(item))) for item in result["content"] if isinstance(item, dict)
+            )
+    return result
+
+
+def api_mcp_request(server_url, method, **params):
+    """Send any MCP JSON-RPC request; returns the decoded response (with `result` or `error`)."""
+    payload = {"jsonrpc": "2.0", "id": 8811, "method": method, "params": params}
+    resp = requests.post(server_url, json=payload, headers=_json_headers())
+    assert resp.status_code == 200, f"HTTP failure: {resp.text}"
+    return resp.json()
+
+
+def api_read_file(server_url, file_path, limit=None, offset=None, **extra_args):
+    payload = _build_read_file_payload(file_path, limit, offset, **extra_args)
     resp = requests.post(server_url, json=payload, headers=_json_headers())
     assert resp.status_code == 200, f"HTTP failure: {resp.text}"
     data = resp.json()
@@ -93,12 +120,13 @@ def _build_write_file_payload(file_path, content, **extra_args):
     }
 
 
-def _build_read_file_payload(file_path, limit=None, offset=None):
+def _build_read_file_payload(file_path, limit=None, offset=None, **extra_args):
     args = {"file_path": file_path}
     if limit is not None:
         args["limit"] = limit
     if offset is not None:
         args["offset"] = offset
+    args.update(extra_args)
     return {
         "jsonrpc": "2.0",
         "id": 8809,
@@ -107,6 +135,15 @@ def _build_read_file_payload(file_path, limit=None, offset=None):
     }
 
 
+def _build_tool_call_payload(tool_name, arguments):
+    return {
+        "jsonrpc": "2.0",
+        "id": 8810,
+        "method": "tools/call",
+        "params": {"name": tool_name, "arguments": arguments},
+    }
+
+
 def _build_create_project_payload(project_name):
     return {
         "jsonrpc": "2.0",
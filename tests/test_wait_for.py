@@ -0,0 +1,115 @@
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mcp_grok.wait_tools import MAX_CONCURRENT_WAITS, wait_for
+from tests.test_utils import api_call_tool
+
+
+def _later(delay, action):
+    timer = threading.Timer(delay, action)
+    timer.start()
+    return timer
+
+
+def test_wait_for_path_and_file_contents(tmp_path):
+    target = tmp_path / "a" / "b" / "ready.flag"
+
+    def create():
+        target.parent.mkdir(parents=True)
+        target.write_text("")
+
+    _later(0.2, create)
+    start = time.monotonic()
+    out = wait_for("path_exists", path=str(target), timeout=10)
+    assert out.startswith("Success: ") and "exists" in out, out
+    assert time.monotonic() - start < 5
+
+    build = tmp_path / "build"
+    build.mkdir()
+
+    def rebuild():
+        shutil.rmtree(build)
+        build.mkdir()
+        time.sleep(0.1)
+        (build / "out.bin").write_bytes(b"")
+
+    _later(0.2, rebuild)
+    start = time.monotonic()
+    out = wait_for("path_exists", path=str(build / "out.bin"), timeout=10)
+    assert out.startswith("Success: "), out
+    assert time.monotonic() - start < 5
+
+    log = tmp_path / "server.log"
+    log.write_text("booting\n")
+
+    def append():
+        with open(log, "a") as f:
+            f.write("still booting\n")
+            f.flush()
+            time.sleep(0.1)
+            f.write("Listening on port 8080")
+
+    _later(0.2, append)
+    out = wait_for("file_contains", path=str(log), pattern=r"port \d+", timeout=10)
+    assert out.startswith("Success: ") and "line 2 matches: Listening on port 8080" in out, out
+    out = wait_for("file_contains", path=str(log), pattern="never", timeout=0.3)
+    assert out.startswith("Error: Timed out after 0.3s"), out
+
+
+def test_wait_for_port_and_process(tmp_path):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = socket.socket()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    def listen():
+        server.bind(("127.0.0.1", port))
+        server.listen()
+
+    _later(0.2, listen)
+    try:
+        out = wait_for("port_listening", port=port, timeout=10)
+        assert out.startswith("Success: ") and f"127.0.0.1:{port}" in out, out
+    finally:
+        server.close()
+
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.3)"])
+    try:
+        assert wait_for("process_exited", pid=proc.pid, timeout=0.05).startswith("Error: Timed out")
+        out = wait_for("process_exited", pid=proc.pid, timeout=10)
+        assert out.startswith("Success: ") and f"process {proc.pid} exited" in out, out
+    finally:
+        proc.wait()
+
+
+def test_wait_for_tool(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    flag = tmp_path / "done"
+    _later(0.2, lambda: flag.write_text("ok\n"))
+    out = api_call_tool(url, "wait_for", condition="file_contains", path=str(flag), pattern="^ok$", timeout=10)
+    assert out.startswith("Success: ") and "line 0 matches: ok" in out, out
+    out = api_call_tool(url, "wait_for", condition="port_listening")
+    assert out == "Error: port must be between 1 and 65535.", out
+    out = api_call_tool(url, "wait_for", condition="socket")
+    assert out.startswith("Error: Unknown condition 'socket'"), out
+
+
+def test_wait_for_tool_limits_concurrent_waits(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    missing = str(tmp_path / "never")
+
+    def wait(timeout):
+        return api_call_tool(url, "wait_for", condition="path_exists", path=missing, timeout=timeout)
+
+    with ThreadPoolExecutor(MAX_CONCURRENT_WAITS) as pool:
+        waits = [pool.submit(wait, 3) for _ in range(MAX_CONCURRENT_WAITS)]
+        time.sleep(1)
+        assert wait(0.1).startswith("Error: Too many concurrent wait_for calls")
+        assert all(w.result().startswith("Error: Timed out") for w in waits)
+    assert wait(0.1).startswith("Error: Timed out")
@@ -0,0 +1,59 @@
+import os
+import stat
+from pathlib import Path
+
+from mcp_grok.file_tools import _probe_umask, _process_umask
+from tests.test_utils import api_write_file
+
+
+def test_atomic_full_replace_preserves_mode(tmp_path, mcp_server):
+    test_file = tmp_path / "atomic.txt"
+    Path(test_file).write_text("old\n")
+    os.chmod(test_file, 0o640)
+    old_inode = test_file.stat().st_ino
+    out = api_write_file(
+        mcp_server["url"], str(test_file), "new\n", replaceAll=True, atomic=True, durability="dir"
+    )
+    assert "Success" in out
+    assert Path(test_file).read_text() == "new\n"
+    assert stat.S_IMODE(test_file.stat().st_mode) == 0o640
+    assert test_file.stat().st_ino != old_inode
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["atomic.txt"]
+
+
+def test_atomic_line_edit(tmp_path, mcp_server):
+    test_file = tmp_path / "atomic-lines.txt"
+    Path(test_file).write_text("a\nb\nc\n")
+    out = api_write_file(
+        mcp_server["url"], str(test_file), "B\n", replace_lines_start=1, replace_lines_end=2,
+        atomic=True, durability="file",
+    )
+    assert "Success" in out
+    assert Path(test_file).read_text() == "a\nB\nc\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["atomic-lines.txt"]
+
+
+def test_atomic_no_overwrite(tmp_path, mcp_server):
+    test_file = tmp_path / "atomic-new.txt"
+    out = api_write_file(mcp_server["url"], str(test_file), "fresh\n", overwrite=False, atomic=True)
+    assert "Success" in out
+    assert Path(test_file).read_text() == "fresh\n"
+    out = api_write_file(mcp_server["url"], str(test_file), "again\n", overwrite=False, atomic=True)
+    assert "overwrite=False" in out
+    assert Path(test_file).read_text() == "fresh\n"
+
+
+def test_invalid_durability(tmp_path, mcp_server):
+    test_file = tmp_path / "durability.txt"
+    out = api_write_file(mcp_server["url"], str(test_file), "x\n", durability="always")
+    assert "Invalid durability" in out
+    assert not test_file.exists()
+
+
+def test_process_umask_matches_os_umask():
+    previous = os.umask(0o027)
+    try:
+        assert _process_umask() == 0o027
+    finally:
+        os.umask(previous)
+    assert _probe_umask() == previous
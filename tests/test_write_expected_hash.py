@@ -0,0 +1,70 @@
+import threading
+from pathlib import Path
+from tests.test_utils import api_write_file, api_read_file
+
+
+def _read_etag(server_url, path):
+    result = api_read_file(server_url, path, include_etag=True)
+    return result.splitlines()[0][len("ETag: "):]
+
+
+def test_write_with_matching_hash(tmp_path, mcp_server):
+    test_file = tmp_path / "hash-match.txt"
+    Path(test_file).write_text("a\nb\nc\n")
+    etag = _read_etag(mcp_server["url"], str(test_file))
+    out = api_write_file(
+        mcp_server["url"],
+        str(test_file),
+        "B\n",
+        replace_lines_start=1,
+        replace_lines_end=2,
+        expected_hash=etag,
+    )
+    assert "Success" in out
+    assert Path(test_file).read_text() == "a\nB\nc\n"
+
+
+def test_write_with_stale_hash_rejected(tmp_path, mcp_server):
+    test_file = tmp_path / "hash-stale.txt"
+    Path(test_file).write_text("a\nb\nc\n")
+    etag = _read_etag(mcp_server["url"], str(test_file))
+    Path(test_file).write_text("x\na\nb\nc\n")
+    out = api_write_file(
+        mcp_server["url"],
+        str(test_file),
+        "INSERTED\n",
+        insert_at_line=1,
+        expected_hash=etag,
+    )
+    assert "Precondition failed" in out
+    current = _read_etag(mcp_server["url"], str(test_file))
+    assert current in out
+    assert Path(test_file).read_text() == "x\na\nb\nc\n"
+
+
+def test_write_expected_hash_missing_file(tmp_path, mcp_server):
+    test_file = tmp_path / "hash-missing.txt"
+    out = api_write_file(mcp_server["url"], str(test_file), "data\n", expected_hash="0" * 32)
+    assert "Precondition failed" in out
+    assert not test_file.exists()
+
+
+def test_concurrent_inserts_are_serialized(tmp_path, mcp_server):
+    test_file = tmp_path / "concurrent.txt"
+    Path(test_file).write_text("")
+    errors = []
+
+    def insert(i):
+        try:
+            api_write_file(mcp_server["url"], str(test_file), f"line{i}\n", insert_at_line=0)
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=insert, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    lines = Path(test_file).read_text().splitlines()
+    assert sorted(lines) == sorted(f"line{i}" for i in range(8))
@@ -0,0 +1,58 @@
+import os
+import stat
+
+from mcp_grok.bulk_write import write_files
+from tests.test_utils import api_call_tool
+
+
+def test_write_files_scaffold(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    (tmp_path / "README.md").write_text("old")
+    files = [
+        {"path": str(tmp_path / "README.md"), "content": "# Demo\n"},
+        {"path": str(tmp_path / "src" / "app.py"), "content": "print('hi')\n"},
+        {"path": str(tmp_path / "bin" / "run.sh"), "content": "#!/bin/sh\n", "mode": "755"},
+    ]
+    out = api_call_tool(url, "write_files", files=files)
+    assert out == "Success: Wrote 3 files (29 bytes)."
+    assert (tmp_path / "README.md").read_text() == "# Demo\n"
+    assert (tmp_path / "src" / "app.py").read_text() == "print('hi')\n"
+    assert stat.S_IMODE(os.stat(tmp_path / "bin" / "run.sh").st_mode) == 0o755
+    assert not [p for p in tmp_path.rglob(".*")]
+
+
+def test_write_files_validates_before_writing(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    good = {"path": str(tmp_path / "a.txt"), "content": "a"}
+    out = api_call_tool(url, "write_files", files=[good, {"path": "/etc/mcp-grok-bulk", "content": "x"}])
+    assert out.startswith("Error: File 1: Refusing"), out
+    out = api_call_tool(url, "write_files", files=[good, dict(good)])
+    assert out.startswith("Error: File 1: Duplicate path"), out
+    out = api_call_tool(url, "write_files", files=[{**good, "mode": "9z"}])
+    assert out.startswith("Error: File 0: Invalid mode"), out
+    # Larger than the HTTP request limit, so the budget is checked on the library function.
+    big = "x" * (6 * 1024 * 1024)
+    out = write_files([{**good, "content": big}, {"path": str(tmp_path / "b"), "content": big}])
+    assert out == "Error: Total content too large (>10MB)."
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_write_files_all_or_nothing_rollback(tmp_path, mcp_server):
+    url = mcp_server["url"]
+    existing = tmp_path / "keep.txt"
+    existing.write_text("original")
+    files = [
+        {"path": str(existing), "content": "changed"},
+        {"path": str(tmp_path / "new.txt"), "content": "new"},
+        {"path": str(tmp_path / "deep" / "er" / "x.txt"), "content": "x"},
+        # The parent is a regular file, so this entry fails while staging.
+        {"path": str(existing / "sub.txt"), "content": "clash"},
+    ]
+    out = api_call_tool(url, "write_files", files=files)
+    assert out.startswith("Error: No files written"), out
+    assert existing.read_text() == "original"
+    assert [p.name for p in tmp_path.iterdir()] == ["keep.txt"]
+    out = api_call_tool(url, "write_files", files=files, all_or_nothing=False)
+    assert out.startswith("Error: Wrote 3 of 4 files. Failed:\n- " + str(existing / "sub.txt")), out
+    assert existing.read_text() == "changed"
+    assert (tmp_path / "new.txt").read_text() == "new"
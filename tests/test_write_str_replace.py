@@ -0,0 +1,41 @@
+from pathlib import Path
+from tests.test_utils import api_write_file
+
+
+def test_str_replace_unique(tmp_path, mcp_server):
+    test_file = tmp_path / "str-replace.py"
+    Path(test_file).write_text("def foo():\n    return 1\n")
+    out = api_write_file(mcp_server["url"], str(test_file), "    return 2\n", old_string="    return 1\n")
+    assert "Replaced 1 occurrence" in out
+    assert Path(test_file).read_text() == "def foo():\n    return 2\n"
+
+
+def test_str_replace_ambiguous_rejected(tmp_path, mcp_server):
+    test_file = tmp_path / "str-ambiguous.txt"
+    Path(test_file).write_text("x = 1\ny = 1\n")
+    out = api_write_file(mcp_server["url"], str(test_file), "2", old_string="1")
+    assert "occurs 2 times" in out
+    assert Path(test_file).read_text() == "x = 1\ny = 1\n"
+
+
+def test_str_replace_occurrence_policies(tmp_path, mcp_server):
+    test_file = tmp_path / "str-policies.txt"
+    Path(test_file).write_text("a-a-a")
+    out = api_write_file(mcp_server["url"], str(test_file), "b", old_string="a", occurrence="first")
+    assert "Success" in out
+    assert Path(test_file).read_text() == "b-a-a"
+    api_write_file(mcp_server["url"], str(test_file), "c", old_string="a", occurrence="last")
+    assert Path(test_file).read_text() == "b-a-c"
+    out = api_write_file(mcp_server["url"], str(test_file), "z", old_string="-", occurrence="all")
+    assert "Replaced 2 occurrence" in out
+    assert Path(test_file).read_text() == "bzazc"
+
+
+def test_str_replace_not_found_and_conflicts(tmp_path, mcp_server):
+    test_file = tmp_path / "str-missing.txt"
+    Path(test_file).write_text("hello\n")
+    out = api_write_file(mcp_server["url"], str(test_file), "bye", old_string="absent")
+    assert "not found" in out
+    out = api_write_file(mcp_server["url"], str(test_file), "bye", old_string="hello", insert_at_line=0)
+    assert "Cannot combine old_string" in out
+    assert Path(test_file).read_text() == "hello\n"
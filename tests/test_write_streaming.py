@@ -0,0 +1,33 @@
+from pathlib import Path
+from tests.test_utils import api_write_file
+
+
+def test_replace_line_in_large_file(tmp_path, mcp_server):
+    test_file = tmp_path / "large.txt"
+    with open(test_file, "w") as f:
+        for i in range(300_000):
+            f.write(f"line {i:08d} " + "x" * 32 + "\n")
+    size_before = test_file.stat().st_size
+    assert size_before > 10 * 1024 * 1024
+    out = api_write_file(
+        mcp_server["url"], str(test_file), "REPLACED\n", replace_lines_start=150_000, replace_lines_end=150_001
+    )
+    assert "Success: Lines 150000:150001" in out
+    with open(test_file) as f:
+        for i, line in enumerate(f):
+            if i == 149_999:
+                assert line.startswith("line 00149999")
+            elif i == 150_000:
+                assert line == "REPLACED\n"
+            elif i == 150_001:
+                assert line.startswith("line 00150001")
+                break
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["large.txt"]
+
+
+def test_line_edit_preserves_crlf(tmp_path, mcp_server):
+    test_file = tmp_path / "crlf.txt"
+    Path(test_file).write_bytes(b"a\r\nb\r\nc\r\n")
+    out = api_write_file(mcp_server["url"], str(test_file), "X\r\n", insert_at_line=1)
+    assert "Inserted at line 1" in out
+    assert Path(test_file).read_bytes() == b"a\r\nX\r\nb\r\nc\r\n"